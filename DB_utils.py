@@ -1,11 +1,20 @@
+import sys
+import time
+import math
 import psycopg2
+import psycopg2.extras
 import psycopg2.pool
 from contextlib import contextmanager
 import pymongo
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from config import *
-from services import reference_service
+from services import reference_service, inventory_service, anomaly_service, schedule_service, enrichment_service, mongo_indexes
+from services import request_timing
+from services.pg_pool import BlockingConnectionPool
+from services.cache import TTLCache
+from services.log_writer import BufferedMongoWriter
+from services.pagination import Page, mongo_page
 
 class ZooBackend:
     def __init__(self):
@@ -13,17 +22,25 @@ class ZooBackend:
         self.pg_pool = None
         self.mongo_client = None
         self.mongo_db = None
+        self.login_log_writer = None
+        # 參考資料快取，寫入路徑以資料表名稱清除 (見 services/reference_service.py)
+        self.reference_cache = TTLCache(maxsize=REFERENCE_CACHE_SIZE, ttl=REFERENCE_CACHE_TTL)
+        # 值班/證照權限快取，排班或授證時依員工清除 (見 services/schedule_service.py)
+        self.permission_cache = schedule_service.ShiftPermissionCache(ttl=PERMISSION_CACHE_TTL)
 
         # 1. Connect to PostgreSQL (Connection Pool)
         try:
-            self.pg_pool = psycopg2.pool.ThreadedConnectionPool(
-                minconn=1,
-                maxconn=10,
+            self.pg_pool = BlockingConnectionPool(
+                minconn=PG_POOL_MIN,
+                maxconn=PG_POOL_MAX,
+                timeout=PG_POOL_TIMEOUT,
+                validate_idle_after=PG_POOL_VALIDATE_IDLE,
                 host=PG_HOST,
                 port=PG_PORT,
                 database=PG_DB,
                 user=PG_USER,
-                password=PG_PASSWORD
+                password=PG_PASSWORD,
+                cursor_factory=request_timing.TimedCursor  # SQL 執行時間計入請求統計
             )
             print("[SUCCESS] Connected to PostgreSQL (Connection Pool Initialized).")
         except Exception as e:
@@ -31,7 +48,9 @@ class ZooBackend:
 
         # 2. Connect to MongoDB
         try:
-            self.mongo_client = pymongo.MongoClient(MONGO_URI)
+            self.mongo_client = pymongo.MongoClient(
+                MONGO_URI, event_listeners=[request_timing.MongoCommandTimer()]
+            )
             # Force a connection check
             self.mongo_client.admin.command('ping')
             self.mongo_db = self.mongo_client[MONGO_DB]
@@ -40,17 +59,40 @@ class ZooBackend:
             print(f"[ERROR] MongoDB connection error: {e}")
             self.mongo_client = None
 
+        # 3. Ensure MongoDB indexes (見 services/mongo_indexes.py)
+        if self.mongo_client is not None:
+            try:
+                mongo_indexes.ensure_indexes(self.mongo_db)
+            except Exception as e:
+                print(f"[WARNING] MongoDB index bootstrap failed: {e}")
+
+            # login_logs 改由背景 thread 批次寫入，登入不需等待 MongoDB
+            self.login_log_writer = BufferedMongoWriter(
+                self.mongo_db[COLLECTION_LOGIN_LOGS],
+                batch_size=LOGIN_LOG_BATCH_SIZE,
+                flush_interval=LOGIN_LOG_FLUSH_INTERVAL,
+                max_pending=LOGIN_LOG_QUEUE_SIZE,
+                name="login-log-writer"
+            )
+
     @contextmanager
-    def get_db_connection(self):
+    def get_db_connection(self, caller=None):
         """
         [NEW] Context manager for getting a connection from the pool.
         Ensures connections are returned to the pool even if exceptions occur.
         Auto-rollbacks if an exception is raised within the block.
+        Blocks up to PG_POOL_TIMEOUT seconds when the pool is exhausted;
+        wait/hold time is recorded per caller (defaults to the calling function name).
         """
         if not self.pg_pool:
             raise Exception("PostgreSQL connection pool is not initialized.")
         
-        conn = self.pg_pool.getconn()
+        if caller is None:
+            caller = sys._getframe(2).f_code.co_name
+        started = time.perf_counter()
+        conn = self.pg_pool.getconn(caller=caller)
+        acquired = time.perf_counter()
+        request_timing.add("pool_wait", acquired - started)
         try:
             yield conn
         except Exception:
@@ -58,6 +100,7 @@ class ZooBackend:
             raise
         finally:
             self.pg_pool.putconn(conn)
+            request_timing.add("db", time.perf_counter() - acquired)
 
     def login(self, e_id, password=None):
         """
@@ -89,9 +132,10 @@ class ZooBackend:
                             "status": "failed",
                             "reason": f"帳號狀態異常 ({status})",
                             "ip": "127.0.0.1",
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": datetime.now().isoformat(),
+                            "logged_at": datetime.now(timezone.utc)
                         }
-                        self.mongo_db[COLLECTION_LOGIN_LOGS].insert_one(log_entry)
+                        self._log_login(log_entry)
                         return False, None, None, f"登入失敗: 帳號狀態異常 ({status})"
 
                     # 2. 驗證密碼
@@ -106,9 +150,10 @@ class ZooBackend:
                                 "status": "failed",
                                 "reason": "密碼錯誤",
                                 "ip": "127.0.0.1",
-                                "timestamp": datetime.now().isoformat()
+                                "timestamp": datetime.now().isoformat(),
+                                "logged_at": datetime.now(timezone.utc)
                             }
-                            self.mongo_db[COLLECTION_LOGIN_LOGS].insert_one(log_entry)
+                            self._log_login(log_entry)
                             return False, None, None, "登入失敗: 密碼錯誤"
 
                     # 3. [NoSQL] Log login (Success)
@@ -118,9 +163,10 @@ class ZooBackend:
                         "action": "login",
                         "status": "success",
                         "ip": "127.0.0.1",
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": datetime.now().isoformat(),
+                        "logged_at": datetime.now(timezone.utc)
                     }
-                    self.mongo_db[COLLECTION_LOGIN_LOGS].insert_one(log_entry)
+                    self._log_login(log_entry)
                     return True, name, role, "登入成功"
                 else:
                     # Log failed attempt (User not found)
@@ -131,15 +177,23 @@ class ZooBackend:
                         "status": "failed",
                         "reason": "員工不存在",
                         "ip": "127.0.0.1",
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": datetime.now().isoformat(),
+                        "logged_at": datetime.now(timezone.utc)
                     }
-                    self.mongo_db[COLLECTION_LOGIN_LOGS].insert_one(log_entry)
+                    self._log_login(log_entry)
                     return False, None, None, "登入失敗: 查無此員工 ID"
 
         except Exception as e:
             print(f"Login error: {e}")
             return False, None, None, f"登入失敗: {e}"
 
+    def _log_login(self, log_entry):
+        """[NoSQL] 登入紀錄交給背景 writer 批次寫入 (佇列滿時會等待，不會丟棄)"""
+        if self.login_log_writer is not None:
+            self.login_log_writer.write(log_entry)
+        elif self.mongo_client is not None:
+            self.mongo_db[COLLECTION_LOGIN_LOGS].insert_one(log_entry)
+
     def get_employee_password(self, e_id):
         """查詢員工密碼（忘記密碼功能，僅供展示）"""
         if not self.pg_pool:
@@ -192,38 +246,64 @@ class ZooBackend:
         except Exception as e:
             return False, f"修改失敗: {e}"
 
-    def get_all_employees(self):
-        """取得所有員工列表 (含證照)"""
+    def get_all_employees(self, status=None, role=None, skill=None, limit=None, offset=0):
+        """
+        取得員工列表 (含證照)，可依狀態/角色/證照篩選並分頁。
+        證照以 LEFT JOIN + array_agg 一次查出，不再逐一查詢每位員工。
+        """
         if not self.pg_pool:
             return []
-        
+
+        conditions = []
+        params = []
+        if status:
+            conditions.append(f"e.{COL_STATUS} = %s")
+            params.append(status)
+        if role:
+            conditions.append(f"e.{COL_ROLE} = %s")
+            params.append(role)
+        if skill:
+            # 用 EXISTS 篩選，聚合結果仍保留該員工的所有證照
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM {TABLE_EMPLOYEE_SKILLS} k
+                WHERE k.e_id = e.{COL_EMPLOYEE_ID} AND k.skill_name = %s
+            )""")
+            params.append(skill)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        page = ""
+        if limit is not None:
+            page = "LIMIT %s OFFSET %s"
+            params.extend([limit, offset or 0])
+
         try:
             with self.get_db_connection() as conn:
                 cur = conn.cursor()
-                # 取得員工基本資料
                 cur.execute(f"""
-                    SELECT {COL_EMPLOYEE_ID}, {COL_NAME}, {COL_ROLE}, {COL_STATUS}
-                    FROM {TABLE_EMPLOYEES}
-                    ORDER BY {COL_EMPLOYEE_ID}
-                """)
-                rows = cur.fetchall()
-                
-                # 取得每位員工的證照
-                employees = []
-                for r in rows:
-                    e_id = r[0]
-                    cur.execute(f"""
-                        SELECT skill_name FROM employee_skills WHERE e_id = %s
-                    """, (e_id,))
-                    skills = [s[0] for s in cur.fetchall()]
-                    employees.append({
-                        "e_id": e_id, 
-                        "e_name": r[1], 
-                        "role": r[2], 
+                    SELECT
+                        e.{COL_EMPLOYEE_ID}, e.{COL_NAME}, e.{COL_ROLE}, e.{COL_STATUS},
+                        COALESCE(
+                            array_agg(s.skill_name ORDER BY s.skill_id)
+                                FILTER (WHERE s.skill_name IS NOT NULL),
+                            '{{}}'
+                        )
+                    FROM {TABLE_EMPLOYEES} e
+                    LEFT JOIN {TABLE_EMPLOYEE_SKILLS} s ON s.e_id = e.{COL_EMPLOYEE_ID}
+                    {where}
+                    GROUP BY e.{COL_EMPLOYEE_ID}
+                    ORDER BY e.{COL_EMPLOYEE_ID}
+                    {page}
+                """, params)
+                return [
+                    {
+                        "e_id": r[0],
+                        "e_name": r[1],
+                        "role": r[2],
                         "e_status": r[3],
-                        "skills": skills
-                    })
-                return employees
+                        "skills": list(r[4])
+                    }
+                    for r in cur.fetchall()
+                ]
         except Exception as e:
             print(f"Error fetching employees: {e}")
             return []
@@ -244,6 +324,7 @@ class ZooBackend:
                     VALUES (%s, %s, %s, 'active', %s, %s)
                 """, (e_id, name, role, default_password, sex))
                 conn.commit()
+                self.reference_cache.invalidate(TABLE_EMPLOYEES)
                 return True, f"已新增員工 {name} ({e_id})，預設密碼: zoo123"
         except psycopg2.errors.UniqueViolation:
             return False, f"員工 ID {e_id} 已存在"
@@ -265,6 +346,7 @@ class ZooBackend:
                 if cur.rowcount == 0:
                     return False, "查無此員工"
                 conn.commit()
+                self.reference_cache.invalidate(TABLE_EMPLOYEES)
                 return True, f"已將員工狀態更新為 {status}"
         except Exception as e:
             return False, f"更新失敗: {e}"
@@ -284,10 +366,35 @@ class ZooBackend:
                 if cur.rowcount == 0:
                     return False, "查無此員工"
                 conn.commit()
+                self.reference_cache.invalidate(TABLE_EMPLOYEES)
                 return True, f"已將員工角色更新為 {role}"
         except Exception as e:
             return False, f"更新失敗: {e}"
 
+    def _load_admin_ids(self):
+        with self.get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT {COL_EMPLOYEE_ID} FROM {TABLE_EMPLOYEES} WHERE {COL_ROLE} = 'Admin' AND {COL_STATUS} = 'active'"
+            )
+            return frozenset(r[0] for r in cur.fetchall())
+
+    def is_admin(self, e_id):
+        """員工是否為在職 (active) 的 Admin；名單快取於 reference_cache，員工角色/狀態變更時清除"""
+        if not e_id:
+            return False
+        admin_ids = self.reference_cache.get_or_load(
+            ("admin_ids",), self._load_admin_ids, tags=(TABLE_EMPLOYEES,)
+        )
+        return e_id in admin_ids
+
+    def cached_is_admin(self, e_id):
+        """同 is_admin 但只讀快取、不查詢資料庫；名單未快取時回傳 None"""
+        if not e_id:
+            return False
+        admin_ids = self.reference_cache.peek(("admin_ids",))
+        return None if admin_ids is None else e_id in admin_ids
+
 
 
     def add_animal_state(self, a_id, weight, user_id, state_id=1):
@@ -322,19 +429,15 @@ class ZooBackend:
                 animal_name = animal_info[0] if animal_info else a_id
                 animal_species = animal_info[1] if animal_info else "未知"
                 
-                # 1. Generate ID
-                cur.execute(f"SELECT COALESCE(MAX(CAST(record_id AS INTEGER)), 0) + 1 FROM {TABLE_ANIMAL_STATE}")
-                new_id = str(cur.fetchone()[0])
-
-                # 2. Insert SQL
+                # 1. Insert SQL (record_id 由 sequence 產生，見 migrations/001_id_sequences.sql)
                 query = f"""
-                    INSERT INTO {TABLE_ANIMAL_STATE} (record_id, a_id, {COL_WEIGHT}, datetime, recorded_by, state_id)
-                    VALUES (%s, %s, %s, NOW(), %s, %s)
+                    INSERT INTO {TABLE_ANIMAL_STATE} (a_id, {COL_WEIGHT}, datetime, recorded_by, state_id)
+                    VALUES (%s, %s, NOW(), %s, %s)
                 """
-                cur.execute(query, (new_id, a_id, weight, user_id, state_id))
+                cur.execute(query, (a_id, weight, user_id, state_id))
                 conn.commit()
 
-                # 3. Check Anomaly (NoSQL)
+                # 2. Check Anomaly (NoSQL)
                 self.check_weight_anomaly(a_id)
                 
                 return True, f"已記錄 {animal_name} ({animal_species}) 體重 {weight}kg"
@@ -367,15 +470,12 @@ class ZooBackend:
                 if not cur.fetchone():
                     return False, "飼料不存在"
                 
-                # Generate ID
-                cur.execute(f"SELECT COALESCE(MAX(CAST({COL_STOCK_ID} AS INTEGER)), 0) + 1 FROM {TABLE_INVENTORY}")
-                new_sid = str(cur.fetchone()[0])
-
+                # stock_entry_id 由 sequence 產生
                 query = f"""
-                    INSERT INTO {TABLE_INVENTORY} ({COL_STOCK_ID}, f_id, quantity_delta_kg, datetime, reason)
-                    VALUES (%s, %s, %s, NOW(), 'purchase')
+                    INSERT INTO {TABLE_INVENTORY} (f_id, quantity_delta_kg, datetime, reason)
+                    VALUES (%s, %s, NOW(), 'purchase')
                 """
-                cur.execute(query, (new_sid, f_id, amount_val))
+                cur.execute(query, (f_id, amount_val))
                 conn.commit()
                 return True, "進貨成功，庫存已更新。"
         except Exception as e:
@@ -477,8 +577,9 @@ class ZooBackend:
                 if not feed:
                     return False, f"飼料 {f_id} 不存在"
                 
-                cur.execute("INSERT INTO animal_diet (species, f_id) VALUES (%s, %s)", (species, f_id))
+                cur.execute(f"INSERT INTO {TABLE_ANIMAL_DIET} (species, f_id) VALUES (%s, %s)", (species, f_id))
                 conn.commit()
+                self.reference_cache.invalidate(TABLE_ANIMAL_DIET)
                 return True, f"已新增 {species} 可食用 {feed[0]}"
         except psycopg2.errors.UniqueViolation:
             return False, "此飲食設定已存在"
@@ -493,10 +594,11 @@ class ZooBackend:
         try:
             with self.get_db_connection() as conn:
                 cur = conn.cursor()
-                cur.execute("DELETE FROM animal_diet WHERE species = %s AND f_id = %s", (species, f_id))
+                cur.execute(f"DELETE FROM {TABLE_ANIMAL_DIET} WHERE species = %s AND f_id = %s", (species, f_id))
                 if cur.rowcount == 0:
                     return False, "找不到此飲食設定"
                 conn.commit()
+                self.reference_cache.invalidate(TABLE_ANIMAL_DIET)
                 return True, f"已移除 {species} 的飼料 {f_id}"
         except Exception as e:
             return False, f"移除失敗: {e}"
@@ -563,22 +665,14 @@ class ZooBackend:
                             # We return False to BLOCK assignment if skill is missing, as per "strict" requirement
                             return False, f"指派失敗: 該員工缺乏 '{req_skill}' 證照，無法負責此動物！"
 
-                # 2. Generate Shift ID (Sxxxx)
-                cur.execute(f"SELECT MAX(shift_id) FROM {TABLE_EMPLOYEE_SHIFT}")
-                max_sid = cur.fetchone()[0]
-                if max_sid:
-                    num_part = int(max_sid[1:])
-                    new_sid = f"S{num_part + 1:04d}"
-                else:
-                    new_sid = "S0001"
-                
-                # 3. Insert
+                # 2. Insert (shift_id 由 sequence 產生，格式 Sxxxx)
                 query = f"""
-                    INSERT INTO {TABLE_EMPLOYEE_SHIFT} (shift_id, {COL_EMPLOYEE_ID}, t_id, shift_start, shift_end, {COL_ANIMAL_ID})
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    INSERT INTO {TABLE_EMPLOYEE_SHIFT} ({COL_EMPLOYEE_ID}, t_id, shift_start, shift_end, {COL_ANIMAL_ID})
+                    VALUES (%s, %s, %s, %s, %s)
                 """
-                cur.execute(query, (new_sid, e_id, t_id, start_time, end_time, a_id))
+                cur.execute(query, (e_id, t_id, start_time, end_time, a_id))
                 conn.commit()
+                self.permission_cache.invalidate(e_id)
                 return True, "工作指派成功。"
         except Exception as e:
             return False, f"指派失敗: {e}"
@@ -636,7 +730,7 @@ class ZooBackend:
                     # 找出該動物的待確認健康警報
                     pending_alert = self.mongo_db[COLLECTION_HEALTH_ALERTS].find_one({
                         "animal_id": a_id,
-                        "status": {"$in": ["PENDING", "UNREAD"]}
+                        "status": ALERT_STATUS_PENDING
                     })
                     
                     if pending_alert:
@@ -699,50 +793,14 @@ class ZooBackend:
         try:
             with self.get_db_connection() as conn:
                 cur = conn.cursor()
-
                 # 取得最近 6 筆體重紀錄
-                query = f"""
-                    WITH RecentWeights AS (
-                        SELECT 
-                            {COL_WEIGHT},
-                            datetime,
-                            ROW_NUMBER() OVER (ORDER BY datetime DESC) as rn
-                        FROM {TABLE_ANIMAL_STATE}
-                        WHERE a_id = %s AND {COL_WEIGHT} IS NOT NULL
-                    )
-                    SELECT {COL_WEIGHT}, rn FROM RecentWeights WHERE rn <= 6 ORDER BY rn
-                """
-                cur.execute(query, (a_id,))
-                results = cur.fetchall()
+                weights = anomaly_service.fetch_recent_weights(cur, a_id)
 
-                if len(results) < 3:
-                    return False, "資料不足（需至少 3 筆），無法分析", 0.0
-
-                current_weight = float(results[0][0])
-                # 計算前 N-1 次的移動平均（排除當前）
-                prev_weights = [float(r[0]) for r in results[1:]]
-                moving_avg = sum(prev_weights) / len(prev_weights)
-                
-                if moving_avg == 0:
-                    return False, "移動平均為0，無法計算變化率", 0.0
-
-                change_pct = ((current_weight - moving_avg) / moving_avg) * 100
-
-                # 偏差 >10% 視為異常（比單次比較更嚴謹）
-                if abs(change_pct) > 10:
-                    alert = {
-                        "animal_id": a_id,
-                        "alert_type": "weight_anomaly",
-                        "description": f"體重異常 {change_pct:.1f}% (近期平均 {moving_avg:.1f}kg, 當前 {current_weight:.1f}kg)",
-                        "detected_value": current_weight,
-                        "expected_range": f"{moving_avg*0.9:.1f}-{moving_avg*1.1:.1f}",
-                        "created_at": datetime.now().isoformat(),
-                        "status": "pending"
-                    }
-                    self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_one(alert)
-                    return True, f"偵測到異常: 體重偏離近期平均 {change_pct:.1f}%", change_pct
-                
-                return False, f"體重正常: 偏離近期平均 {change_pct:.1f}%", change_pct
+            # 偏差 >10% 視為異常（比單次比較更嚴謹）
+            is_anomaly, msg, change_pct, alert = anomaly_service.evaluate_weight(a_id, weights)
+            if alert:
+                self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_one(alert)
+            return is_anomaly, msg, change_pct
 
         except Exception as e:
             return False, f"分析失敗: {e}", 0.0
@@ -760,58 +818,14 @@ class ZooBackend:
         try:
             with self.get_db_connection() as conn:
                 cur = conn.cursor()
+                # 使用 Window Function 計算近 7 筆平均（排除最新一筆）
+                stats = anomaly_service.fetch_feeding_stats(cur, a_id)
 
-                # 使用 Window Function 計算近 7 天平均（排除當天）
-                query = f"""
-                    WITH RecentFeedings AS (
-                        SELECT 
-                            {COL_AMOUNT},
-                            feed_date,
-                            ROW_NUMBER() OVER (ORDER BY feed_date DESC) as rn
-                        FROM {TABLE_FEEDING}
-                        WHERE a_id = %s AND {COL_AMOUNT} IS NOT NULL
-                    ),
-                    Stats AS (
-                        SELECT 
-                            {COL_AMOUNT},
-                            rn,
-                            AVG({COL_AMOUNT}) OVER (
-                                ORDER BY rn 
-                                ROWS BETWEEN 1 FOLLOWING AND 7 FOLLOWING
-                            ) as recent_avg
-                        FROM RecentFeedings
-                    )
-                    SELECT {COL_AMOUNT}, recent_avg FROM Stats WHERE rn = 1
-                """
-                cur.execute(query, (a_id,))
-                result = cur.fetchone()
-
-                if not result or result[1] is None:
-                    return False, "食量資料不足（需至少 2 筆），無法分析", 0.0
-
-                latest_amount = float(result[0])
-                recent_avg = float(result[1])
-                
-                if recent_avg == 0:
-                    return False, "近期平均食量為0，無法計算變化率", 0.0
-
-                change_pct = ((latest_amount - recent_avg) / recent_avg) * 100
-
-                # 食量偏離近期平均 >40% 視為異常
-                if abs(change_pct) > 40:
-                    alert = {
-                        "animal_id": a_id,
-                        "alert_type": "food_anomaly",
-                        "description": f"食量異常 {change_pct:.1f}% (近期平均 {recent_avg:.1f}kg, 當前 {latest_amount:.1f}kg)",
-                        "detected_value": latest_amount,
-                        "expected_range": f"{recent_avg*0.6:.1f}-{recent_avg*1.4:.1f}",
-                        "created_at": datetime.now().isoformat(),
-                        "status": "pending"
-                    }
-                    self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_one(alert)
-                    return True, f"偵測到異常: 食量偏離近期平均 {change_pct:.1f}%", change_pct
-                
-                return False, f"食量正常: 偏離近期平均 {change_pct:.1f}%", change_pct
+            # 食量偏離近期平均 >40% 視為異常
+            is_anomaly, msg, change_pct, alert = anomaly_service.evaluate_feeding(a_id, stats)
+            if alert:
+                self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_one(alert)
+            return is_anomaly, msg, change_pct
 
         except Exception as e:
             return False, f"分析失敗: {e}", 0.0
@@ -819,43 +833,22 @@ class ZooBackend:
     def batch_check_anomalies(self):
         """
         批量檢查所有動物的體重和食量異常
+        以兩次 window query (PARTITION BY a_id) 取代逐隻呼叫 check_*_anomaly，
+        判斷邏輯與單隻檢查相同，警示以一次 insert_many 寫入
         """
         if not self.pg_pool:
             return []
 
-        anomalies_found = []
         try:
             with self.get_db_connection() as conn:
                 cur = conn.cursor()
                 # Get all live animals
-                cur.execute(f"SELECT a_id, a_name FROM animal WHERE life_status = 'In_Zoo'")
+                cur.execute(f"SELECT a_id, a_name FROM {TABLE_ANIMAL} WHERE life_status = 'Alive' ORDER BY a_id")
                 animals = cur.fetchall()
-            
-            # Connection is returned here.
-            # Now iterate and check both weight and feeding anomalies.
-            for a_id, a_name in animals:
-                # 檢查體重異常
-                is_weight_anomaly, weight_msg, weight_pct = self.check_weight_anomaly(a_id)
-                if is_weight_anomaly:
-                    anomalies_found.append({
-                        "id": a_id,
-                        "name": a_name,
-                        "type": "體重",
-                        "msg": weight_msg,
-                        "pct": weight_pct
-                    })
-                
-                # 檢查食量異常
-                is_feeding_anomaly, feeding_msg, feeding_pct = self.check_feeding_anomaly(a_id)
-                if is_feeding_anomaly:
-                    anomalies_found.append({
-                        "id": a_id,
-                        "name": a_name,
-                        "type": "食量",
-                        "msg": feeding_msg,
-                        "pct": feeding_pct
-                    })
-            
+                anomalies_found, alerts = anomaly_service.check_animals(cur, animals)
+
+            if alerts:
+                self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_many(alerts)
             return anomalies_found
         except Exception as e:
             print(f"Batch check failed: {e}")
@@ -886,7 +879,7 @@ class ZooBackend:
                     "detected_value": input_val,
                     "expected_range": f"{expected_val*0.8:.1f}-{expected_val*1.2:.1f}",
                     "recorded_by": user_id,
-                    "status": "pending",
+                    "status": ALERT_STATUS_PENDING,
                     "created_at": datetime.now().isoformat()
                 }
                 self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_one(health_alert)
@@ -897,22 +890,25 @@ class ZooBackend:
             print(f"Error logging input warning: {e}")
             return False
 
-    def get_audit_logs(self):
+    def get_audit_logs(self, cursor=None, page_size=50):
         """
-        從 MongoDB 撈出修正紀錄給管理員看。
+        從 MongoDB 撈出修正紀錄給管理員看 (依 timestamp 由新到舊，cursor 分頁)。
         """
         if self.mongo_client is None:
-            return []
+            return Page()
         
         try:
-            logs = list(self.mongo_db[COLLECTION_AUDIT_LOGS].find().sort("timestamp", -1).limit(50))
+            logs = mongo_page(self.mongo_db[COLLECTION_AUDIT_LOGS], {}, "timestamp", cursor, page_size)
             # Convert ObjectId to string for display if needed, or just return dicts
             for log in logs:
                 log['_id'] = str(log['_id'])
-            return logs
+                # 舊格式以 admin_id 記錄操作者
+                if 'operator_id' not in log and 'admin_id' in log:
+                    log['operator_id'] = log['admin_id']
+            return enrichment_service.enrich_names(self, logs, "employee", "operator_id", "operator_name")
         except Exception as e:
             print(f"Error fetching logs: {e}")
-            return []
+            return Page()
 
     def get_high_risk_animals(self):
         """
@@ -928,9 +924,11 @@ class ZooBackend:
                 {"$sort": {"count": -1}}
             ]
             results = list(self.mongo_db[COLLECTION_HEALTH_ALERTS].aggregate(pipeline))
-            return results
+            return enrichment_service.enrich_names(self, results, "animal", "_id", "animal_name")
         except Exception as e:
             print(f"Error fetching high risk animals: {e}")
+            return []
+
     def get_careless_employees(self):
         """
         [NEW] 找出冒失鬼 (資料被修正的員工)
@@ -955,58 +953,34 @@ class ZooBackend:
             # 按次數排序
             combined.sort(key=lambda x: x['corrections'], reverse=True)
 
-            # Enrich with employee names from SQL
-            enriched_results = []
-            with self.get_db_connection() as conn:
-                cur = conn.cursor()
-                for res in combined:
-                    e_id = res['id']
-                    cur.execute(f"SELECT {COL_NAME} FROM {TABLE_EMPLOYEES} WHERE {COL_EMPLOYEE_ID} = %s", (e_id,))
-                    row = cur.fetchone()
-                    name = row[0] if row else "Unknown"
-                    enriched_results.append({
-                        "id": e_id, 
-                        "name": name, 
-                        "corrections": res['corrections']
-                    })
-            
-            return enriched_results
-        except Exception as e:
-            print(f"Error fetching careless employees: {e}")
-            return []
-            
-            return enriched_results
+            # Enrich with employee names from SQL (單一查詢)
+            return enrichment_service.enrich_names(self, combined, "employee", "id", "name", default="Unknown")
         except Exception as e:
             print(f"Error fetching careless employees: {e}")
             return []
 
-    def get_pending_health_alerts(self):
+    def get_pending_health_alerts(self, cursor=None, page_size=50):
         """
-        [NEW] 取得待處理的健康警示 (PENDING 或 UNREAD)
+        [NEW] 取得待處理的健康警示 (PENDING，使用 open_alerts partial index，cursor 分頁)
         """
         if self.mongo_client is None:
-            return []
+            return Page()
         
         try:
-            alerts = list(self.mongo_db[COLLECTION_HEALTH_ALERTS].find({
-                "status": {"$in": ["PENDING", "UNREAD", "pending", "unread"]}
-            }).sort("created_at", -1).limit(50))
-            
-            # 用動物名稱豐富資料
-            with self.get_db_connection() as conn:
-                cur = conn.cursor()
-                for alert in alerts:
-                    alert['_id'] = str(alert['_id'])
-                    a_id = alert.get("animal_id")
-                    if a_id:
-                        cur.execute(f"SELECT {COL_ANIMAL_NAME} FROM {TABLE_ANIMAL} WHERE {COL_ANIMAL_ID} = %s", (a_id,))
-                        row = cur.fetchone()
-                        alert['animal_name'] = row[0] if row else ""
+            alerts = mongo_page(
+                self.mongo_db[COLLECTION_HEALTH_ALERTS],
+                {"status": ALERT_STATUS_PENDING},
+                "created_at", cursor, page_size
+            )
             
-            return alerts
+            for alert in alerts:
+                alert['_id'] = str(alert['_id'])
+
+            # 用動物名稱豐富資料 (單一查詢)
+            return enrichment_service.enrich_names(self, alerts, "animal", "animal_id", "animal_name")
         except Exception as e:
             print(f"Error fetching pending health alerts: {e}")
-            return []
+            return Page()
 
     def confirm_health_alert(self, alert_id, status):
         """
@@ -1026,11 +1000,11 @@ class ZooBackend:
             if not alert:
                 return False, "找不到該警示"
             
-            if status == "CONFIRMED":
+            if status == ALERT_STATUS_CONFIRMED:
                 # 確認為真實健康問題 → 更新狀態
                 self.mongo_db[COLLECTION_HEALTH_ALERTS].update_one(
                     {"_id": ObjectId(alert_id)},
-                    {"$set": {"status": "CONFIRMED", "confirmed_at": datetime.now().isoformat()}}
+                    {"$set": {"status": ALERT_STATUS_CONFIRMED, "confirmed_at": datetime.now().isoformat()}}
                 )
                 return True, "已確認為真實健康問題，警示已標記為 CONFIRMED"
             
@@ -1059,24 +1033,27 @@ class ZooBackend:
         except Exception as e:
             return False, f"處理失敗: {e}"
 
-    def get_my_corrections(self, e_id):
+    def get_my_corrections(self, e_id, careless_cursor=None, corrections_cursor=None, page_size=20):
         """
-        [NEW] 飼養員查看自己被修正的紀錄
+        [NEW] 飼養員查看自己被修正的紀錄 (兩個清單各自以 cursor 分頁)
         """
         if self.mongo_client is None:
-            return []
+            return {"careless": Page(), "corrections": Page()}
         
         try:
             # 從 careless_logs 找出自己的錯誤
-            careless = list(self.mongo_db[COLLECTION_CARELESS_LOGS].find({
-                "employee_id": e_id
-            }).sort("created_at", -1).limit(20))
+            careless = mongo_page(
+                self.mongo_db[COLLECTION_CARELESS_LOGS],
+                {"employee_id": e_id},
+                "created_at", careless_cursor, page_size
+            )
             
             # 從 audit_logs 找出自己的資料被修正的紀錄
-            corrections = list(self.mongo_db[COLLECTION_AUDIT_LOGS].find({
-                "original_creator_id": e_id,
-                "event_type": "DATA_CORRECTION"
-            }).sort("timestamp", -1).limit(20))
+            corrections = mongo_page(
+                self.mongo_db[COLLECTION_AUDIT_LOGS],
+                {"original_creator_id": e_id, "event_type": "DATA_CORRECTION"},
+                "timestamp", corrections_cursor, page_size
+            )
             
             for c in careless:
                 c['_id'] = str(c['_id'])
@@ -1089,62 +1066,16 @@ class ZooBackend:
             return {"careless": careless, "corrections": corrections}
         except Exception as e:
             print(f"Error fetching my corrections: {e}")
-            return {"careless": [], "corrections": []}
+            return {"careless": Page(), "corrections": Page()}
 
-    # Assuming this new function is where the inventory check and lock should be added.
-    # This function is not present in the original document, but the instruction implies its existence.
-    # The provided snippet seems to be a mix of existing code and new code.
-    # I will create a new placeholder function `check_and_lock_inventory` based on the provided snippet's intent.
     def check_shift_permission(self, e_id, a_id):
         """
         [NEW] 檢查權限: 
         1. 是否有排班負責該動物? (Shift Check)
         2. 是否擁有該動物所需的專業證照? (Skill Check)
+        同一班次內的重複檢查使用權限快取，不查詢資料庫。
         """
-        # Admin bypass
-        if e_id == "E001": 
-            return True, "管理員權限"
-
-        if not self.pg_pool:
-            return False, "資料庫連線池未初始化"
-            
-        try:
-            with self.get_db_connection() as conn:
-                cur = conn.cursor()
-                
-                # 1. Shift Check
-                query_shift = f"""
-                    SELECT shift_id FROM {TABLE_EMPLOYEE_SHIFT}
-                    WHERE {COL_EMPLOYEE_ID} = %s 
-                    AND {COL_ANIMAL_ID} = %s
-                    AND NOW() BETWEEN shift_start AND shift_end
-                """
-                cur.execute(query_shift, (e_id, a_id))
-                if not cur.fetchone():
-                    return False, "無操作權限: 非值班時間或非負責動物"
-
-                # 2. Skill Check
-                # Get required skill for animal
-                cur.execute(f"""
-                    SELECT s.required_skill 
-                    FROM {TABLE_ANIMAL} a
-                    JOIN {TABLE_SPECIES} s ON a.species = s.s_name
-                    WHERE a.{COL_ANIMAL_ID} = %s
-                """, (a_id,))
-                row = cur.fetchone()
-                req_skill = row[0] if row else 'General'
-                
-                if req_skill != 'General':
-                    cur.execute(f"""
-                        SELECT skill_id FROM {TABLE_EMPLOYEE_SKILLS} 
-                        WHERE e_id = %s AND skill_name = %s
-                    """, (e_id, req_skill))
-                    if not cur.fetchone():
-                        return False, f"權限不足: 缺乏 '{req_skill}' 專業證照"
-
-                return True, "權限驗證通過"
-        except Exception as e:
-            return False, f"權限檢查失敗: {e}"
+        return schedule_service.check_shift_permission(self, e_id, a_id)
 
     def add_employee_skill(self, target_e_id, skill_name):
         """
@@ -1173,6 +1104,7 @@ class ZooBackend:
                 
                 cur.execute(f"INSERT INTO {TABLE_EMPLOYEE_SKILLS} (e_id, skill_name) VALUES (%s, %s)", (target_e_id, skill_name))
                 conn.commit()
+                self.permission_cache.invalidate(target_e_id)
                 return True, f"已授予 {target_e_id} '{skill_name}' 證照。"
         except Exception as e:
             return False, f"授證失敗: {e}"
@@ -1211,16 +1143,13 @@ class ZooBackend:
                 animal_species = animal_info[1] if animal_info else "未知"
                 
                 # 1. Check and Lock Inventory
-                # This ensures only one transaction can modify inventory for this feed at a time
+                # This ensures only one transaction can modify inventory for this feed at a time.
+                # IDs come from sequences, so no table lock is needed and feedings of
+                # different feeds can commit in parallel.
                 cur.execute(f"SELECT {COL_FEED_ID} FROM {TABLE_FEEDS} WHERE {COL_FEED_ID} = %s FOR UPDATE", (f_id,))
-                
-                # [CRITICAL FIX] Lock Tables for Safe ID Generation
-                # SHARE ROW EXCLUSIVE mode protects against concurrent data changes and serializes table modifications
-                cur.execute(f"LOCK TABLE {TABLE_FEEDING}, {TABLE_INVENTORY} IN SHARE ROW EXCLUSIVE MODE")
 
-                cur.execute(f"SELECT SUM(quantity_delta_kg) FROM {TABLE_INVENTORY} WHERE f_id = %s", (f_id,))
-                current_stock = cur.fetchone()[0]
-                current_stock = Decimal(current_stock) if current_stock is not None else Decimal("0")
+                # O(1) 讀取即時餘額 (feeding_inventory trigger 於同一交易內維護)
+                current_stock = inventory_service.get_current_stock(cur, f_id)
                 
                 if current_stock < normalized_amount:
                     # No need to rollback explicitly, raising exception triggers it in context manager
@@ -1236,27 +1165,21 @@ class ZooBackend:
                     conn.rollback()
                     return False, f"庫存不足! 目前僅剩 {current_stock} kg"
 
-                # 2. Insert Feeding Record
-                # Generate ID safely under lock
-                cur.execute(f"SELECT COALESCE(MAX(CAST({COL_FEEDING_ID} AS INTEGER)), 0) + 1 FROM {TABLE_FEEDING}")
-                new_fid = str(cur.fetchone()[0])
-
+                # 2. Insert Feeding Record (feeding_id 由 sequence 產生)
                 insert_feeding_query = f"""
-                    INSERT INTO {TABLE_FEEDING} ({COL_FEEDING_ID}, a_id, f_id, {COL_AMOUNT}, feed_date, fed_by)
-                    VALUES (%s, %s, %s, %s, NOW(), %s)
+                    INSERT INTO {TABLE_FEEDING} (a_id, f_id, {COL_AMOUNT}, feed_date, fed_by)
+                    VALUES (%s, %s, %s, NOW(), %s)
+                    RETURNING {COL_FEEDING_ID}
                 """
-                cur.execute(insert_feeding_query, (new_fid, a_id, f_id, normalized_amount, user_id))
+                cur.execute(insert_feeding_query, (a_id, f_id, normalized_amount, user_id))
+                new_fid = cur.fetchone()[0]
 
                 # 3. Update Inventory (deduct amount)
-                # Generate ID
-                cur.execute(f"SELECT COALESCE(MAX(CAST({COL_STOCK_ID} AS INTEGER)), 0) + 1 FROM {TABLE_INVENTORY}")
-                new_sid = str(cur.fetchone()[0])
-
                 insert_inventory_query = f"""
-                    INSERT INTO {TABLE_INVENTORY} ({COL_STOCK_ID}, f_id, quantity_delta_kg, datetime, reason, feeding_id)
-                    VALUES (%s, %s, %s, NOW(), 'feeding', %s)
+                    INSERT INTO {TABLE_INVENTORY} (f_id, quantity_delta_kg, datetime, reason, feeding_id)
+                    VALUES (%s, %s, NOW(), 'feeding', %s)
                 """
-                cur.execute(insert_inventory_query, (new_sid, f_id, -normalized_amount, new_fid))
+                cur.execute(insert_inventory_query, (f_id, -normalized_amount, new_fid))
 
                 # 4. Commit Transaction
                 conn.commit()
@@ -1265,6 +1188,225 @@ class ZooBackend:
         except Exception as e:
             return False, f"新增餵食紀錄失敗: {e}"
 
+    def add_feeding_batch(self, items, user_id):
+        """
+        一次新增多筆餵食紀錄 (例如一輪巡場)，items 為 [(a_id, f_id, amount)]。
+        - 所有動物的權限一次檢查 (同一份值班/證照資料)
+        - 依 f_id 排序鎖定涉及的飼料，並以每種飼料的本批總量檢查庫存；不足時該飼料的項目全部失敗
+        - 通過檢查的項目以 multi-row INSERT 在同一交易內寫入餵食紀錄與庫存扣減
+        回傳 (success, msg, results)，results 依輸入順序為每筆的 {a_id, f_id, amount, success, message}。
+        """
+        if not self.pg_pool:
+            return False, "資料庫連線池未初始化", []
+        if not items:
+            return False, "沒有餵食項目", []
+        if len(items) > BULK_ENTRY_MAX_ITEMS:
+            return False, f"單次最多 {BULK_ENTRY_MAX_ITEMS} 筆", []
+
+        results = []
+        pending = []  # (index, a_id, f_id, amount)
+        for index, item in enumerate(items):
+            try:
+                a_id, f_id, amount = item
+            except (TypeError, ValueError):
+                results.append({"a_id": None, "f_id": None, "amount": None, "success": False, "message": "項目格式錯誤"})
+                continue
+            result = {"a_id": a_id, "f_id": f_id, "amount": amount, "success": False, "message": None}
+            results.append(result)
+            if not isinstance(a_id, str) or not isinstance(f_id, str):
+                result["message"] = "動物或飼料編號格式錯誤"
+                continue
+            try:
+                normalized_amount = Decimal(str(amount))
+            except Exception:
+                result["message"] = "餵食數量格式錯誤"
+                continue
+            if not normalized_amount.is_finite() or normalized_amount <= 0:
+                result["message"] = "餵食數量需為正值"
+                continue
+            pending.append((index, a_id, f_id, normalized_amount))
+
+        # 0. Check Permission (所有動物一次)
+        permissions = schedule_service.check_shift_permissions(self, user_id, {p[1] for p in pending})
+        allowed_items = []
+        for entry in pending:
+            allowed, msg = permissions[entry[1]]
+            if allowed:
+                allowed_items.append(entry)
+            else:
+                results[entry[0]]["message"] = msg
+
+        if allowed_items:
+            try:
+                with self.get_db_connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        f"SELECT a_id, a_name, species FROM {TABLE_ANIMAL} WHERE a_id = ANY(%s)",
+                        (list({entry[1] for entry in allowed_items}),)
+                    )
+                    animals = {r[0]: (r[1], r[2]) for r in cur.fetchall()}
+
+                    # 1. Lock feeds in f_id order, then validate the batch total per feed
+                    stocks = inventory_service.lock_feeds(cur, [entry[2] for entry in allowed_items])
+                    valid = []
+                    needed = {}
+                    for index, a_id, f_id, amount in allowed_items:
+                        if a_id not in animals:
+                            results[index]["message"] = "查無此動物"
+                        elif f_id not in stocks:
+                            results[index]["message"] = "查無此飼料"
+                        else:
+                            valid.append((index, a_id, f_id, amount))
+                            needed[f_id] = needed.get(f_id, Decimal("0")) + amount
+
+                    rows = []
+                    for index, a_id, f_id, amount in valid:
+                        if stocks[f_id] < needed[f_id]:
+                            results[index]["message"] = f"庫存不足! 本批需要 {needed[f_id]} kg，目前僅剩 {stocks[f_id]} kg"
+                        else:
+                            rows.append((index, a_id, f_id, amount))
+
+                    if rows:
+                        # 2. Insert feeding records and deduct inventory in one statement;
+                        #    庫存扣減取自 RETURNING 的 (feeding_id, f_id, 數量)，不依賴回傳順序
+                        psycopg2.extras.execute_values(cur, f"""
+                            WITH ins AS (
+                                INSERT INTO {TABLE_FEEDING} (a_id, f_id, {COL_AMOUNT}, feed_date, fed_by)
+                                VALUES %s
+                                RETURNING {COL_FEEDING_ID}, f_id, {COL_AMOUNT}
+                            )
+                            INSERT INTO {TABLE_INVENTORY} (f_id, {COL_QUANTITY_DELTA}, datetime, reason, feeding_id)
+                            SELECT f_id, -{COL_AMOUNT}, NOW(), 'feeding', {COL_FEEDING_ID} FROM ins
+                        """, [(a_id, f_id, amount, user_id) for _, a_id, f_id, amount in rows],
+                            template="(%s, %s, %s, NOW(), %s)")
+
+                    # 3. Commit Transaction
+                    conn.commit()
+
+                for index, a_id, f_id, amount in rows:
+                    animal_name, animal_species = animals[a_id]
+                    results[index]["success"] = True
+                    results[index]["message"] = f"已餵食 {animal_name} ({animal_species})"
+            except Exception as e:
+                # 已有個別原因 (查無動物/飼料、庫存不足) 的項目保留原訊息，只改寫已排入或尚未檢查的項目
+                for index, _, _, _ in allowed_items:
+                    if results[index]["success"] or results[index]["message"] is None:
+                        results[index]["success"] = False
+                        results[index]["message"] = f"新增餵食紀錄失敗: {e}"
+
+        succeeded = sum(1 for r in results if r["success"])
+        return succeeded == len(results), f"已新增 {succeeded}/{len(results)} 筆餵食紀錄", results
+
+    def add_animal_states_batch(self, items, user_id):
+        """
+        一次匯入多筆體重紀錄 (例如獸醫巡檢)，items 為 [(a_id, weight)] 或 [(a_id, weight, state_id)]。
+        - 所有動物的權限一次檢查，通過的項目以 multi-row INSERT 在同一交易內寫入
+        - 提交後只對本批涉及的動物做一次體重異常檢查 (window query)，警示以一次 insert_many 寫入
+        回傳 (success, msg, results, anomalies)，results 依輸入順序為每筆的 {a_id, weight, success, message}。
+        """
+        if not self.pg_pool:
+            return False, "資料庫連線池未初始化", [], []
+        if not items:
+            return False, "沒有體重紀錄", [], []
+        if len(items) > BULK_ENTRY_MAX_ITEMS:
+            return False, f"單次最多 {BULK_ENTRY_MAX_ITEMS} 筆", [], []
+
+        # 狀態代碼取自已快取的 status_type；讀取失敗 (空清單) 時只檢查型別，交由資料庫約束把關
+        state_ids = {row[0] for row in self.get_reference_data(TABLE_STATUS_TYPE)}
+        results = []
+        pending = []  # (index, a_id, weight, state_id)
+        for index, item in enumerate(items):
+            try:
+                a_id, weight, *rest = item
+                if len(rest) > 1:
+                    raise ValueError
+            except (TypeError, ValueError):
+                results.append({"a_id": None, "weight": None, "success": False, "message": "項目格式錯誤"})
+                continue
+            result = {"a_id": a_id, "weight": weight, "success": False, "message": None}
+            results.append(result)
+            if not isinstance(a_id, str):
+                result["message"] = "動物編號格式錯誤"
+                continue
+            try:
+                weight_val = float(weight)
+            except (TypeError, ValueError):
+                result["message"] = "體重格式錯誤"
+                continue
+            if not math.isfinite(weight_val) or weight_val <= 0:
+                result["message"] = "體重必須為正數"
+                continue
+            state_id = rest[0] if rest and rest[0] is not None else 1
+            if not isinstance(state_id, int) or isinstance(state_id, bool) or (state_ids and state_id not in state_ids):
+                result["message"] = "狀態代碼錯誤"
+                continue
+            pending.append((index, a_id, weight_val, state_id))
+
+        # 0. Check Permission (所有動物一次)
+        permissions = schedule_service.check_shift_permissions(self, user_id, {p[1] for p in pending})
+        allowed_items = []
+        for entry in pending:
+            allowed, msg = permissions[entry[1]]
+            if allowed:
+                allowed_items.append(entry)
+            else:
+                results[entry[0]]["message"] = msg
+
+        anomalies = []
+        if allowed_items:
+            try:
+                with self.get_db_connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        f"SELECT a_id, a_name, species FROM {TABLE_ANIMAL} WHERE a_id = ANY(%s)",
+                        (list({entry[1] for entry in allowed_items}),)
+                    )
+                    animals = {r[0]: (r[1], r[2]) for r in cur.fetchall()}
+
+                    rows = []
+                    for index, a_id, weight_val, state_id in allowed_items:
+                        if a_id not in animals:
+                            results[index]["message"] = "查無此動物"
+                        else:
+                            rows.append((index, a_id, weight_val, state_id))
+
+                    if rows:
+                        # 1. Insert SQL (record_id 由 sequence 產生)
+                        # 同一交易內 NOW() 相同，改用 clock_timestamp() 讓同一動物的多筆紀錄保持輸入順序
+                        psycopg2.extras.execute_values(cur, f"""
+                            INSERT INTO {TABLE_ANIMAL_STATE} (a_id, {COL_WEIGHT}, datetime, recorded_by, state_id)
+                            VALUES %s
+                        """, [(a_id, weight_val, user_id, state_id) for _, a_id, weight_val, state_id in rows],
+                            template="(%s, %s, clock_timestamp(), %s, %s)")
+                    conn.commit()
+
+                for index, a_id, _, _ in rows:
+                    animal_name, animal_species = animals[a_id]
+                    results[index]["success"] = True
+                    results[index]["message"] = f"已記錄 {animal_name} ({animal_species}) 體重 {results[index]['weight']}kg"
+            except Exception as e:
+                rows = []
+                # 已有個別原因 (查無此動物) 的項目保留原訊息
+                for index, _, _, _ in allowed_items:
+                    if results[index]["success"] or results[index]["message"] is None:
+                        results[index]["success"] = False
+                        results[index]["message"] = f"回報失敗: {e}"
+
+            # 2. Check Anomaly (只檢查本批動物，紀錄已提交，檢查失敗不影響結果)
+            if rows:
+                affected = sorted({(a_id, animals[a_id][0]) for _, a_id, _, _ in rows})
+                try:
+                    with self.get_db_connection() as conn:
+                        cur = conn.cursor()
+                        anomalies, alerts = anomaly_service.check_animals(cur, affected, feeding=False)
+                    if alerts:
+                        self.mongo_db[COLLECTION_HEALTH_ALERTS].insert_many(alerts)
+                except Exception as e:
+                    print(f"Batch weight check failed: {e}")
+
+        succeeded = sum(1 for r in results if r["success"])
+        return succeeded == len(results), f"已新增 {succeeded}/{len(results)} 筆體重紀錄", results, anomalies
+
     def check_and_lock_inventory(self, f_id, amount):
         """
         [NEW] 檢查庫存並鎖定相關飼料紀錄以防止競態條件。
@@ -1281,8 +1423,7 @@ class ZooBackend:
                 cur.execute(f"SELECT {COL_FEED_ID} FROM {TABLE_FEEDS} WHERE {COL_FEED_ID} = %s FOR UPDATE", (f_id,))
                 
                 # 1. Check stock
-                cur.execute(f"SELECT SUM(quantity_delta_kg) FROM {TABLE_INVENTORY} WHERE f_id = %s", (f_id,))
-                current_stock = cur.fetchone()[0] or 0
+                current_stock = inventory_service.get_current_stock(cur, f_id)
                 
                 if current_stock < amount:
                     return False, f"庫存不足! 目前僅剩 {current_stock} kg"
@@ -1305,19 +1446,46 @@ class ZooBackend:
         """
         return reference_service.get_animal_trends(self, a_id)
 
+    def iter_animal_state_history(self, a_id=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        [NEW] 體重/狀態完整歷史 (串流匯出用)，逐批產生 row list
+        """
+        return reference_service.iter_animal_state_history(self, a_id, chunk_size)
+
     def get_reference_data(self, table_name):
         """
         [NEW] 查詢代碼表 (Reference Lookup)
         """
         return reference_service.get_reference_data(self, table_name)
 
-    def get_recent_records(self, table_name, filter_id):
+    def get_recent_records(self, table_name, filter_id, cursor=None, page_size=10):
         """
-        [NEW] 取得最近的紀錄，輔助修正功能
+        [NEW] 取得最近的紀錄，輔助修正功能 (cursor 分頁)
         """
-        return reference_service.get_recent_records(self, table_name, filter_id)
+        return reference_service.get_recent_records(self, table_name, filter_id, cursor, page_size)
+
+    def get_pool_stats(self):
+        """連線池使用狀況 (等待/持有時間依呼叫者分組)"""
+        if not self.pg_pool:
+            return {}
+        return self.pg_pool.stats()
+
+    def get_cache_stats(self):
+        """參考資料快取與權限快取的命中/未命中統計"""
+        return {
+            "reference": self.reference_cache.stats(),
+            "permission": self.permission_cache.stats(),
+        }
+
+    def get_login_log_stats(self):
+        """login_logs 背景寫入佇列狀態"""
+        if self.login_log_writer is None:
+            return {}
+        return self.login_log_writer.stats()
 
     def close(self):
+        if self.login_log_writer is not None:
+            self.login_log_writer.close()
         if self.pg_pool:
             self.pg_pool.closeall()
         if self.mongo_client:
@@ -1,4 +1,5 @@
 from action.base import Action
+from services.pagination import parse_page_args
 
 class CheckWeightAnomalyAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -24,8 +25,12 @@ class GetAnimalTrendsAction(Action):
 
 class GetAuditLogsAction(Action):
     def execute(self, db_utils, **kwargs):
-        logs = db_utils.get_audit_logs()
-        return {"success": True, "data": logs}
+        try:
+            cursor, page_size = parse_page_args(kwargs.get('cursor'), kwargs.get('page_size'), 50)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        logs = db_utils.get_audit_logs(cursor, page_size)
+        return {"success": True, "data": logs, "page": logs.info()}
 
 class GetCarelessEmployeesAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -34,8 +39,12 @@ class GetCarelessEmployeesAction(Action):
 
 class GetPendingHealthAlertsAction(Action):
     def execute(self, db_utils, **kwargs):
-        data = db_utils.get_pending_health_alerts()
-        return {"success": True, "data": data}
+        try:
+            cursor, page_size = parse_page_args(kwargs.get('cursor'), kwargs.get('page_size'), 50)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        data = db_utils.get_pending_health_alerts(cursor, page_size)
+        return {"success": True, "data": data, "page": data.info()}
 
 class ConfirmHealthAlertAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -47,5 +56,11 @@ class ConfirmHealthAlertAction(Action):
 class GetMyCorrectionsAction(Action):
     def execute(self, db_utils, **kwargs):
         e_id = kwargs.get('e_id')
-        data = db_utils.get_my_corrections(e_id)
-        return {"success": True, "data": data}
+        try:
+            careless_cursor, page_size = parse_page_args(kwargs.get('careless_cursor'), kwargs.get('page_size'), 20)
+            corrections_cursor, _ = parse_page_args(kwargs.get('corrections_cursor'), page_size, 20)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        data = db_utils.get_my_corrections(e_id, careless_cursor, corrections_cursor, page_size)
+        page = {name: items.info() for name, items in data.items()}
+        return {"success": True, "data": data, "page": page}
@@ -0,0 +1,37 @@
+from action.base import Action
+from config import BATCH_MAX_REQUESTS
+
+class BatchAction(Action):
+    """
+    一次執行多個唯讀 action，回傳 {"results": {id: 回應}}。
+    可執行的 action 由 server.py 依 config.BATCH_ACTIONS 設定 (名稱 -> Action 類別)。
+    各項目依序在同一個 worker 中執行，單一項目失敗不影響其他項目。
+    """
+    actions = {}
+
+    def execute(self, db_utils, **kwargs):
+        requests = kwargs.get('requests')
+        if not isinstance(requests, list) or not requests:
+            return {"success": False, "message": "requests 必須為非空的 list"}
+        if len(requests) > BATCH_MAX_REQUESTS:
+            return {"success": False, "message": f"單次 batch 最多 {BATCH_MAX_REQUESTS} 個請求"}
+
+        results = {}
+        for item in requests:
+            if not isinstance(item, dict) or item.get('id') is None:
+                return {"success": False, "message": "每個請求都必須包含 id"}
+            request_id = str(item['id'])
+            if request_id in results:
+                return {"success": False, "message": f"重複的 id: {request_id}"}
+
+            action_name = item.get('action')
+            action_cls = self.actions.get(action_name)
+            if action_cls is None:
+                results[request_id] = {"success": False, "message": f"不支援批次執行的操作: {action_name}"}
+                continue
+            try:
+                results[request_id] = action_cls().execute(db_utils, **(item.get('data') or {}))
+            except Exception as e:
+                results[request_id] = {"success": False, "message": f"Server Error: {str(e)}"}
+
+        return {"success": True, "results": results}
@@ -1,4 +1,5 @@
 from action.base import Action
+from network.streaming import StreamResponse
 
 class AddAnimalStateAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -9,3 +10,28 @@ class AddAnimalStateAction(Action):
         
         success, msg = db_utils.add_animal_state(a_id, weight, user_id, state_id)
         return {"success": success, "message": msg}
+
+class AddAnimalStatesBatchAction(Action):
+    """一次匯入多筆體重，items 為 [{"a_id", "weight", "state_id"?}]，每筆各自回傳結果"""
+    def execute(self, db_utils, **kwargs):
+        items = kwargs.get('items') or []
+        user_id = kwargs.get('user_id')
+
+        if not isinstance(items, list):
+            return {"success": False, "message": "items 必須為清單"}
+        items = [
+            (item.get('a_id'), item.get('weight'), item.get('state_id', 1)) if isinstance(item, dict) else item
+            for item in items
+        ]
+        success, msg, results, anomalies = db_utils.add_animal_states_batch(items, user_id)
+        return {"success": success, "message": msg, "results": results, "anomalies": anomalies}
+
+class ExportAnimalStateHistoryAction(Action):
+    """完整體重/狀態歷史，以串流回應逐批傳送 (見 network/streaming.py)"""
+    def execute(self, db_utils, **kwargs):
+        a_id = kwargs.get('a_id') or None
+        chunks = db_utils.iter_animal_state_history(a_id)
+        return StreamResponse(
+            chunks,
+            columns=["record_id", "a_id", "datetime", "weight", "state_id", "recorded_by"]
+        )
@@ -10,7 +10,23 @@ class ChangePasswordAction(Action):
 
 class GetAllEmployeesAction(Action):
     def execute(self, db_utils, **kwargs):
-        data = db_utils.get_all_employees()
+        limit = kwargs.get('limit')
+        offset = kwargs.get('offset', 0)
+        try:
+            limit = int(limit) if limit is not None else None
+            offset = int(offset or 0)
+        except (TypeError, ValueError):
+            return {"success": False, "message": "limit/offset 必須為整數"}
+        if (limit is not None and limit <= 0) or offset < 0:
+            return {"success": False, "message": "limit 必須大於 0，offset 不可為負數"}
+
+        data = db_utils.get_all_employees(
+            status=kwargs.get('status'),
+            role=kwargs.get('role'),
+            skill=kwargs.get('skill'),
+            limit=limit,
+            offset=offset
+        )
         return {"success": True, "data": data}
 
 class AddEmployeeAction(Action):
@@ -9,3 +9,18 @@ class AddFeedingAction(Action):
         
         success, msg = db_utils.add_feeding_record(a_id, f_id, amount, user_id)
         return {"success": success, "message": msg}
+
+class AddFeedingBatchAction(Action):
+    """一次送出整輪餵食，items 為 [{"a_id", "f_id", "amount"}]，每筆各自回傳結果"""
+    def execute(self, db_utils, **kwargs):
+        items = kwargs.get('items') or []
+        user_id = kwargs.get('user_id')
+
+        if not isinstance(items, list):
+            return {"success": False, "message": "items 必須為清單"}
+        items = [
+            (item.get('a_id'), item.get('f_id'), item.get('amount')) if isinstance(item, dict) else item
+            for item in items
+        ]
+        success, msg, results = db_utils.add_feeding_batch(items, user_id)
+        return {"success": success, "message": msg, "results": results}
@@ -1,4 +1,5 @@
 from action.base import Action
+from services.pagination import parse_page_args
 
 class CorrectRecordAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -15,9 +16,13 @@ class GetRecentRecordsAction(Action):
     def execute(self, db_utils, **kwargs):
         table_name = kwargs.get('table_name')
         filter_id = kwargs.get('filter_id')
+        try:
+            cursor, page_size = parse_page_args(kwargs.get('cursor'), kwargs.get('page_size'), 10)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
         
-        data = db_utils.get_recent_records(table_name, filter_id)
-        return {"success": True, "data": data}
+        data = db_utils.get_recent_records(table_name, filter_id, cursor, page_size)
+        return {"success": True, "data": data, "page": data.info()}
 
 class LogInputWarningAction(Action):
     def execute(self, db_utils, **kwargs):
@@ -1,6 +1,6 @@
 import sys
+import csv
 import socket
-import json
 from decimal import Decimal
 from rich.console import Console
 from rich.table import Table
@@ -9,17 +9,27 @@ from rich.panel import Panel
 from rich.layout import Layout
 from rich import print as rprint
 from config import *
+from network.codec import CODECS, JSON_CODEC
+from network.framing import FRAMING_LINE, FRAMING_LENGTH, encode_frame
 
 # Configuration
 HOST = '127.0.0.1'
 PORT = 60000
 
+class StreamError(Exception):
+    """串流回應失敗 (伺服器回報錯誤或連線中斷)"""
+
+
 class NetworkClient:
     def __init__(self):
         self.host = HOST
         self.port = PORT
         self.socket = None
+        self.reader = None
+        self.framing = FRAMING_LINE
+        self.codec = JSON_CODEC
         self.connected = False
+        self._next_id = 0
 
     def connect(self):
         """建立長連線"""
@@ -29,72 +39,236 @@ class NetworkClient:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            # 以緩衝 reader 讀取，回應大小不影響讀取成本
+            self.reader = self.socket.makefile("rb")
+            self.framing = FRAMING_LINE
+            self.codec = JSON_CODEC
             self.connected = True
+            self._negotiate()
             return True
         except ConnectionRefusedError:
             self.connected = False
             return False
         except Exception as e:
-            self.connected = False
+            self.disconnect()
             return False
 
+    def _negotiate(self):
+        """
+        連線後第一個請求：要求 PROTOCOL_FRAMING 與 PROTOCOL_CODECS 中本機已安裝的 codec。
+        舊版伺服器回覆未知操作時維持換行分隔 JSON。
+        """
+        codecs = [name.strip() for name in PROTOCOL_CODECS.split(",") if name.strip() in CODECS]
+        if PROTOCOL_FRAMING == FRAMING_LINE and codecs in ([], [JSON_CODEC.name]):
+            return
+        self._send("hello", {"framing": PROTOCOL_FRAMING, "codecs": codecs})
+        response = self._read_message()
+        if response is None:
+            raise ConnectionError("伺服器連線中斷")
+        if response.get("success"):
+            if response.get("framing") == FRAMING_LENGTH:
+                self.framing = FRAMING_LENGTH
+            self.codec = CODECS.get(response.get("codec"), JSON_CODEC)
+
     def disconnect(self):
         """關閉連線"""
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
+        for resource in (self.reader, self.socket):
+            if resource:
+                try:
+                    resource.close()
+                except:
+                    pass
+        self.reader = None
         self.socket = None
         self.connected = False
 
+    def _send(self, action, data, request_id=None):
+        request = {"action": action, "data": data}
+        if request_id is not None:
+            request["id"] = request_id
+        payload = self.codec.dumps(request)
+        self.socket.sendall(encode_frame(payload, self.framing))
+
+    def _read_message(self):
+        """依目前 framing 讀取一則 JSON 訊息；連線被關閉時回傳 None"""
+        if self.framing == FRAMING_LENGTH:
+            header = self.reader.read(4)
+            payload = self.reader.read(int.from_bytes(header, "big")) if len(header) == 4 else b""
+        else:
+            payload = self.reader.readline()
+        if not payload:
+            self.connected = False
+            return None
+        return self.codec.loads(payload)
+
     def send_request(self, action, data=None):
         """
         Send a JSON request to the server and return the JSON response.
         使用長連線，斷線時自動重連。
+        若伺服器回傳串流，收齊所有 chunk 後組成 {"success", "data", "count"}。
         """
         if data is None:
             data = {}
         
-        request = {
-            "action": action,
-            "data": data
-        }
-        
         # 確保連線
         if not self.connected:
             if not self.connect():
                 return {"success": False, "message": "無法連線至伺服器，請確認 Server 是否已啟動。"}
         
         try:
-            # 發送請求
-            request_json = json.dumps(request, default=str) + "\n"  # 加換行符作為訊息結尾
-            self.socket.sendall(request_json.encode('utf-8'))
+            self._send(action, data)
             
             # 接收回應
-            response_data = ""
-            while True:
-                chunk = self.socket.recv(16384).decode('utf-8')
-                if not chunk:
-                    # 連線被關閉
-                    self.connected = False
-                    return {"success": False, "message": "伺服器連線中斷"}
-                response_data += chunk
-                if response_data.endswith("\n"):
-                    break
-            
-            return json.loads(response_data.strip())
+            response = self._read_message()
+            if response is None:
+                return {"success": False, "message": "伺服器連線中斷"}
+            if response.get("stream") != "start":
+                return response
+
+            rows = []
+            for chunk in self._read_stream():
+                rows.extend(chunk)
+            return {"success": True, "data": rows, "count": len(rows)}
             
         except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError):
             # 連線中斷，嘗試重連一次
-            self.connected = False
+            self.disconnect()
             if self.connect():
                 return self.send_request(action, data)  # 重試
             return {"success": False, "message": "連線中斷，重連失敗"}
+        except StreamError as e:
+            return {"success": False, "message": str(e)}
         except Exception as e:
-            self.connected = False
+            self.disconnect()
             return {"success": False, "message": f"網路錯誤: {e}"}
 
+    def send_requests(self, requests):
+        """
+        Pipelining：一次送出多個請求 [(action, data), ...]，只等待一次往返，
+        回傳依相同順序排列的回應。請求帶 id，伺服器依完成順序回覆；
+        舊版伺服器回應不帶 id 時依送出順序對應。
+        """
+        if not requests:
+            return []
+        if not self.connected and not self.connect():
+            return [{"success": False, "message": "無法連線至伺服器，請確認 Server 是否已啟動。"} for _ in requests]
+
+        ids = []
+        try:
+            for action, data in requests:
+                self._next_id += 1
+                ids.append(self._next_id)
+                self._send(action, data or {}, self._next_id)
+            results = self._collect(ids)
+        except (OSError, ValueError) as e:
+            self.disconnect()
+            return [{"success": False, "message": f"網路錯誤: {e}"} for _ in requests]
+        return [results[request_id] for request_id in ids]
+
+    def _collect(self, ids):
+        """讀取 ids 的回應 (串流回應收齊為 {"success", "data", "count"})，回傳 {id: 回應}"""
+        pending = list(ids)
+        results = {}
+        streams = {}
+        while pending:
+            message = self._read_message()
+            if message is None:
+                raise ConnectionError("伺服器連線中斷")
+            request_id = message.pop("id", None)
+            if request_id not in pending:
+                request_id = pending[0]
+
+            kind = message.get("stream")
+            if kind == "start":
+                streams[request_id] = []
+                continue
+            if kind == "chunk":
+                streams.setdefault(request_id, []).extend(message.get("data", []))
+                continue
+            if kind == "end":
+                rows = streams.pop(request_id, [])
+                if message.get("success"):
+                    message = {"success": True, "data": rows, "count": len(rows)}
+                else:
+                    message = {"success": False, "message": message.get("message", "串流失敗")}
+            results[request_id] = message
+            pending.remove(request_id)
+        return results
+
+    def send_batch(self, requests):
+        """
+        以單一 batch 請求執行多個唯讀 action：{key: (action, data)} -> {key: 回應}。
+        伺服器不支援 batch 時改以 send_requests 送出。
+        """
+        items = [{"id": str(key), "action": action, "data": data or {}} for key, (action, data) in requests.items()]
+        response = self.send_request("batch", {"requests": items})
+        if response.get("success"):
+            results = response.get("results", {})
+            return {key: results.get(str(key), {"success": False, "message": "缺少回應"}) for key in requests}
+        if not str(response.get("message", "")).startswith("Unknown action"):
+            return {key: response for key in requests}
+        keys = list(requests)
+        return dict(zip(keys, self.send_requests([requests[key] for key in keys])))
+
+    def _read_stream(self):
+        """讀取 start 之後的 frame，逐一產生 chunk 的 row list，直到 end frame"""
+        while True:
+            frame = self._read_message()
+            if frame is None:
+                raise StreamError("伺服器連線中斷")
+            kind = frame.get("stream")
+            if kind == "chunk":
+                yield frame.get("data", [])
+            elif kind == "end":
+                if not frame.get("success"):
+                    raise StreamError(frame.get("message", "串流失敗"))
+                return
+            else:
+                self.disconnect()
+                raise StreamError("無效的串流回應")
+
+    def stream_request(self, action, data=None):
+        """
+        送出串流請求，回傳 (header, rows)：rows 為逐筆產生資料的 generator，
+        一次只在記憶體中保留一個 chunk。失敗時拋出 StreamError。
+        rows 未讀完即放棄時會中斷連線 (剩餘 frame 無法與下一個請求區分)，下次請求自動重連。
+        """
+        if data is None:
+            data = {}
+        if not self.connected and not self.connect():
+            raise StreamError("無法連線至伺服器，請確認 Server 是否已啟動。")
+
+        try:
+            self._send(action, data)
+            header = self._read_message()
+        except (OSError, ValueError) as e:
+            self.disconnect()
+            raise StreamError(f"網路錯誤: {e}")
+        if header is None:
+            raise StreamError("伺服器連線中斷")
+        if header.get("stream") != "start":
+            # 一般回應 (例如權限不足、伺服器忙碌)
+            raise StreamError(header.get("message", "伺服器未回傳串流"))
+
+        def rows():
+            finished = False
+            try:
+                for chunk in self._read_stream():
+                    yield from chunk
+                finished = True
+            except StreamError:
+                # end frame 回報失敗 (連線仍同步) 或 _read_stream 已自行斷線
+                finished = True
+                raise
+            except (OSError, ValueError) as e:
+                self.disconnect()
+                raise StreamError(f"網路錯誤: {e}")
+            finally:
+                if not finished and self.connected:
+                    self.disconnect()
+
+        return header, rows()
+
 
 console = Console()
 client = NetworkClient()
@@ -122,6 +296,32 @@ def float_prompt_with_back(message):
         except ValueError:
             console.print("[red]請輸入有效數字[/red]")
 
+def page_options(page):
+    """依回應中的 page 資訊回傳可用的翻頁選項 {"n": next_cursor, "p": prev_cursor}"""
+    page = page or {}
+    options = {}
+    if page.get("prev_cursor"):
+        options["p"] = page["prev_cursor"]
+    if page.get("next_cursor"):
+        options["n"] = page["next_cursor"]
+    return options
+
+def print_page_options(options):
+    if "p" in options:
+        console.print("p → 上一頁")
+    if "n" in options:
+        console.print("n → 下一頁")
+
+def ask_page(page):
+    """顯示翻頁選項並回傳所選頁的 cursor；沒有其他頁或選擇返回時回傳 None"""
+    options = page_options(page)
+    if not options:
+        return None
+    print_page_options(options)
+    console.print("0 → 返回")
+    choice = Prompt.ask("請選擇", choices=[*options, "0"])
+    return options.get(choice)
+
 def select_my_animal(user_id):
     """選擇目前值班負責的動物，回傳 (a_id, a_name, species) 或 BACK"""
     response = client.send_request("get_my_animals", {"e_id": user_id})
@@ -281,9 +481,10 @@ def health_monitor_ui():
         console.print("2. 高風險動物列表")
         console.print("3. 查詢個別動物趨勢")
         console.print("4. 待處理健康警示")
+        console.print("5. 匯出體重歷史 (CSV)")
         console.print("0. 返回")
         
-        choice = Prompt.ask("請選擇", choices=["1", "2", "3", "4", "0"])
+        choice = Prompt.ask("請選擇", choices=["1", "2", "3", "4", "5", "0"])
         
         if choice == "1":
             batch_check_anomalies_ui()
@@ -293,6 +494,8 @@ def health_monitor_ui():
             view_animal_trends_ui()
         elif choice == "4":
             view_pending_health_alerts_ui()
+        elif choice == "5":
+            export_animal_state_history_ui()
         elif choice == "0":
             break
 
@@ -414,55 +617,80 @@ def view_my_corrections_ui(user_id):
     """飼養員查看自己被修正的紀錄"""
     console.print("[bold]我的修正紀錄[/bold]")
     
-    response = client.send_request("get_my_corrections", {"e_id": user_id})
-    data = response.get("data", {})
+    careless_cursor = None
+    corrections_cursor = None
+    while True:
+        response = client.send_request("get_my_corrections", {
+            "e_id": user_id, "careless_cursor": careless_cursor, "corrections_cursor": corrections_cursor
+        })
+        data = response.get("data", {})
+        pages = response.get("page", {})
     
-    careless = data.get("careless", [])
-    corrections = data.get("corrections", [])
+        careless = data.get("careless", [])
+        corrections = data.get("corrections", [])
     
-    if not careless and not corrections:
-        console.print("[green]你沒有任何被修正的紀錄，做得很好！[/green]")
-        return
+        if not careless and not corrections:
+            console.print("[green]你沒有任何被修正的紀錄，做得很好！[/green]")
+            return
     
-    # 顯示輸入錯誤紀錄 (careless_logs)
-    if careless:
-        table = Table(title="輸入錯誤紀錄 (已被標記)")
-        table.add_column("動物 ID", style="red")
-        table.add_column("錯誤類型", style="yellow")
-        table.add_column("錯誤值", style="white")
-        table.add_column("時間", style="dim")
+        # 顯示輸入錯誤紀錄 (careless_logs)
+        if careless:
+            table = Table(title="輸入錯誤紀錄 (已被標記)")
+            table.add_column("動物 ID", style="red")
+            table.add_column("錯誤類型", style="yellow")
+            table.add_column("錯誤值", style="white")
+            table.add_column("時間", style="dim")
         
-        for c in careless:
-            # 支援多種欄位格式
-            error_type = c.get("record_type") or c.get("error_type") or ""
-            wrong_val = c.get("original_value") or c.get("wrong_value") or ""
-            timestamp = c.get("created_at") or c.get("original_timestamp") or c.get("timestamp") or ""
-            table.add_row(
-                c.get("animal_id", ""),
-                error_type,
-                str(wrong_val),
-                str(timestamp)[:19].replace("T", " ") if timestamp else ""
-            )
-        console.print(table)
+            for c in careless:
+                # 支援多種欄位格式
+                error_type = c.get("record_type") or c.get("error_type") or ""
+                wrong_val = c.get("original_value") or c.get("wrong_value") or ""
+                timestamp = c.get("created_at") or c.get("original_timestamp") or c.get("timestamp") or ""
+                table.add_row(
+                    c.get("animal_id", ""),
+                    error_type,
+                    str(wrong_val),
+                    str(timestamp)[:19].replace("T", " ") if timestamp else ""
+                )
+            console.print(table)
     
-    # 顯示被管理員修正的紀錄 (audit_logs)
-    if corrections:
-        table2 = Table(title="被管理員修正的紀錄")
-        table2.add_column("資料表", style="blue")
-        table2.add_column("欄位", style="yellow")
-        table2.add_column("舊值 -> 新值", style="white")
-        table2.add_column("修正時間", style="dim")
+        # 顯示被管理員修正的紀錄 (audit_logs)
+        if corrections:
+            table2 = Table(title="被管理員修正的紀錄")
+            table2.add_column("資料表", style="blue")
+            table2.add_column("欄位", style="yellow")
+            table2.add_column("舊值 -> 新值", style="white")
+            table2.add_column("修正時間", style="dim")
         
-        for c in corrections:
-            change = c.get("change", {})
-            change_str = f"{change.get('old_value', '')} -> {change.get('new_value', '')}"
-            table2.add_row(
-                c.get("target_table", ""),
-                change.get("field", ""),
-                change_str,
-                str(c.get("timestamp", ""))[:19] if c.get("timestamp") else ""
-            )
-        console.print(table2)
+            for c in corrections:
+                change = c.get("change", {})
+                change_str = f"{change.get('old_value', '')} -> {change.get('new_value', '')}"
+                table2.add_row(
+                    c.get("target_table", ""),
+                    change.get("field", ""),
+                    change_str,
+                    str(c.get("timestamp", ""))[:19] if c.get("timestamp") else ""
+                )
+            console.print(table2)
+
+        # 兩個清單各自分頁：n1/p1 翻輸入錯誤紀錄，n2/p2 翻被修正的紀錄
+        options = {}
+        labels = {"n": "下一頁", "p": "上一頁"}
+        for suffix, name, title in (("1", "careless", "輸入錯誤紀錄"), ("2", "corrections", "被修正的紀錄")):
+            for key, cursor in page_options(pages.get(name)).items():
+                options[key + suffix] = (name, cursor)
+                console.print(f"{key}{suffix} → {title}{labels[key]}")
+        if not options:
+            return
+        console.print("0 → 返回")
+        choice = Prompt.ask("請選擇", choices=[*options, "0"])
+        if choice == "0":
+            return
+        name, cursor = options[choice]
+        if name == "careless":
+            careless_cursor = cursor
+        else:
+            corrections_cursor = cursor
 
 def manage_employees_ui():
     """員工管理 (Admin) - 合併證照管理"""
@@ -740,10 +968,11 @@ def manage_diet_ui():
         elif choice == "0":
             break
 
-def select_feed_for_animal(species):
-    """選擇該物種可食用的飼料，回傳 f_id 或 BACK"""
-    response = client.send_request("get_animal_diet", {"species": species})
-    feeds = response.get("data", [])
+def select_feed_for_animal(species, feeds=None):
+    """選擇該物種可食用的飼料，回傳 f_id 或 BACK；feeds 為已取得的 get_animal_diet 結果"""
+    if feeds is None:
+        response = client.send_request("get_animal_diet", {"species": species})
+        feeds = response.get("data", [])
     
     if not feeds:
         console.print(f"[yellow]{species} 尚未設定可食用飼料，請聯繫管理員[/yellow]")
@@ -790,9 +1019,14 @@ def add_feeding_ui(user_id):
     
     a_id, a_name, species = animal
     
+    # 最近紀錄與可食用飼料以單一 batch 請求取得
+    prefetch = client.send_batch({
+        "records": ("get_recent_records", {"table_name": TABLE_FEEDING, "filter_id": a_id}),
+        "diet": ("get_animal_diet", {"species": species}),
+    })
+
     # [UX] Show recent records
-    response = client.send_request("get_recent_records", {"table_name": TABLE_FEEDING, "filter_id": a_id})
-    records = response.get("data", [])
+    records = prefetch["records"].get("data", [])
     if records:
         r_table = Table(title=f"{a_name} ({species}) 的最近餵食紀錄")
         r_table.add_column("日期", style="cyan")
@@ -803,7 +1037,7 @@ def add_feeding_ui(user_id):
         console.print(r_table)
     
     # 選擇該動物可食用的飼料
-    f_id = select_feed_for_animal(species)
+    f_id = select_feed_for_animal(species, prefetch["diet"].get("data", []))
     if f_id == BACK:
         return
     
@@ -816,6 +1050,7 @@ def add_feeding_ui(user_id):
         return
     
     # [即時警告] 檢查食量是否異常
+    warning = None
     if records:
         recent_amounts = [Decimal(str(r[3])) for r in records[:5] if r[3] is not None]
         if recent_amounts:
@@ -826,17 +1061,21 @@ def add_feeding_ui(user_id):
                     console.print(f"\n[bold yellow]⚠ 警告：您輸入的食量 {amount} kg 與近期平均 {avg_amount:.2f} kg 差異 {deviation:.0f}%[/bold yellow]")
                     confirm = Prompt.ask("確定要儲存嗎？", choices=["y", "n"], default="n")
                     # 記錄警告事件
-                    client.send_request("log_input_warning", {
+                    warning = {
                         "user_id": user_id, "animal_id": a_id, "warning_type": "FEEDING",
                         "input_value": amount, "expected_value": avg_amount, "confirmed": confirm.lower() == "y"
-                    })
+                    }
                     if confirm.lower() != "y":
+                        client.send_request("log_input_warning", warning)
                         console.print("[yellow]已取消輸入。[/yellow]")
                         return
         
-    response = client.send_request("add_feeding", {
-        "a_id": a_id, "f_id": f_id, "amount": amount, "user_id": user_id
-    })
+    feeding = {"a_id": a_id, "f_id": f_id, "amount": amount, "user_id": user_id}
+    if warning:
+        # 警告紀錄與餵食紀錄以 pipelining 一次送出
+        _, response = client.send_requests([("log_input_warning", warning), ("add_feeding", feeding)])
+    else:
+        response = client.send_request("add_feeding", feeding)
     
     if response.get("success"):
         console.print(f"[green]{response.get('message')}[/green]")
@@ -854,9 +1093,14 @@ def add_body_info_ui(user_id):
     
     a_id, a_name, species = animal
     
+    # 最近紀錄與狀態代碼表以單一 batch 請求取得
+    prefetch = client.send_batch({
+        "records": ("get_recent_records", {"table_name": TABLE_ANIMAL_STATE, "filter_id": a_id}),
+        "status": ("get_reference_data", {"table_name": "status_type"}),
+    })
+
     # [UX] Show recent records
-    response = client.send_request("get_recent_records", {"table_name": TABLE_ANIMAL_STATE, "filter_id": a_id})
-    records = response.get("data", [])
+    records = prefetch["records"].get("data", [])
     if records:
         r_table = Table(title=f"{a_name} ({species}) 的最近體重紀錄")
         r_table.add_column("日期", style="cyan")
@@ -874,6 +1118,7 @@ def add_body_info_ui(user_id):
         return
     
     # [即時警告] 檢查體重是否異常
+    warning = None
     if records:
         recent_weights = [Decimal(str(r[2])) for r in records[:5] if r[2] is not None]
         if recent_weights:
@@ -884,17 +1129,18 @@ def add_body_info_ui(user_id):
                     console.print(f"\n[bold yellow]⚠ 警告：您輸入的體重 {weight} kg 與上次 {last_weight:.2f} kg 變化 {change_pct:.0f}%[/bold yellow]")
                     confirm = Prompt.ask("確定要儲存嗎？", choices=["y", "n"], default="n")
                     # 記錄警告事件
-                    client.send_request("log_input_warning", {
+                    warning = {
                         "user_id": user_id, "animal_id": a_id, "warning_type": "WEIGHT",
                         "input_value": weight, "expected_value": last_weight, "confirmed": confirm.lower() == "y"
-                    })
+                    }
                     if confirm.lower() != "y":
+                        client.send_request("log_input_warning", warning)
                         console.print("[yellow]已取消輸入。[/yellow]")
                         return
         
     # [NEW] Select Status
     state_id = 1 # Default Normal
-    resp_status = client.send_request("get_reference_data", {"table_name": "status_type"})
+    resp_status = prefetch["status"]
     if resp_status.get("success"):
         statuses = resp_status.get("data", [])
         if statuses:
@@ -904,6 +1150,8 @@ def add_body_info_ui(user_id):
             
             state_input = prompt_with_back("請輸入狀態 ID (預設 1)")
             if state_input == BACK:
+                if warning:
+                    client.send_request("log_input_warning", warning)
                 return
             if state_input:
                 try:
@@ -911,9 +1159,12 @@ def add_body_info_ui(user_id):
                 except ValueError:
                     state_id = 1
 
-    response = client.send_request("add_animal_state", {
-        "a_id": a_id, "weight": weight, "user_id": user_id, "state_id": state_id
-    })
+    state = {"a_id": a_id, "weight": weight, "user_id": user_id, "state_id": state_id}
+    if warning:
+        # 警告紀錄與體重紀錄以 pipelining 一次送出
+        _, response = client.send_requests([("log_input_warning", warning), ("add_animal_state", state)])
+    else:
+        response = client.send_request("add_animal_state", state)
     
     if response.get("success"):
         console.print(f"[green]{response.get('message')}[/green]")
@@ -1128,36 +1379,44 @@ def correct_record_ui(user_id):
     if a_id == BACK:
         return
     
-    response = client.send_request("get_recent_records", {
-        "table_name": table, "filter_id": a_id
-    })
-    records = response.get("data", [])
+    cursor = None
+    while True:
+        response = client.send_request("get_recent_records", {
+            "table_name": table, "filter_id": a_id, "cursor": cursor
+        })
+        records = response.get("data", [])
     
-    if not records:
-        console.print("[yellow]查無此動物的近期紀錄。[/yellow]")
-        return
+        if not records:
+            console.print("[yellow]查無此動物的近期紀錄。[/yellow]")
+            return
 
-    # Display Records
-    r_table = Table(title=f"動物 {a_id} 的近期紀錄")
-    r_table.add_column("紀錄 ID", style="cyan")
-    r_table.add_column("日期", style="blue")
-    
-    if table == TABLE_FEEDING:
-        r_table.add_column("飼料", style="yellow")
-        r_table.add_column("數量", style="green")
-        for r in records:
-            r_table.add_row(str(r[0]), str(r[1]), r[2], str(r[3]))
-    else:
-        r_table.add_column("體重", style="green")
-        for r in records:
-            r_table.add_row(str(r[0]), str(r[1]), str(r[2]))
+        # Display Records
+        r_table = Table(title=f"動物 {a_id} 的近期紀錄")
+        r_table.add_column("紀錄 ID", style="cyan")
+        r_table.add_column("日期", style="blue")
+    
+        if table == TABLE_FEEDING:
+            r_table.add_column("飼料", style="yellow")
+            r_table.add_column("數量", style="green")
+            for r in records:
+                r_table.add_row(str(r[0]), str(r[1]), r[2], str(r[3]))
+        else:
+            r_table.add_column("體重", style="green")
+            for r in records:
+                r_table.add_row(str(r[0]), str(r[1]), str(r[2]))
             
-    console.print(r_table)
+        console.print(r_table)
     
-    # Step 2: Select Record ID
-    record_id = prompt_with_back("請輸入要修正的紀錄 ID (參考上表)")
-    if record_id == BACK:
-        return
+        # Step 2: Select Record ID
+        options = page_options(response.get("page"))
+        print_page_options(options)
+        record_id = prompt_with_back("請輸入要修正的紀錄 ID (參考上表)")
+        if record_id == BACK:
+            return
+        if record_id in options:
+            cursor = options[record_id]
+            continue
+        break
     
     col_choice = ""
     col_name = ""
@@ -1221,44 +1480,51 @@ def correct_record_ui(user_id):
         console.print(f"[red]{response.get('message')}[/red]")
 
 def view_audit_logs_ui():
-    response = client.send_request("get_audit_logs")
-    logs = response.get("data", [])
+    cursor = None
+    while True:
+        response = client.send_request("get_audit_logs", {"cursor": cursor})
+        logs = response.get("data", [])
     
-    if not logs:
-        console.print("[yellow]查無稽核紀錄。[/yellow]")
-        return
+        if not logs:
+            console.print("[yellow]查無稽核紀錄。[/yellow]")
+            return
 
-    table = Table(title="稽核日誌 (Audit Logs - NoSQL)")
-    table.add_column("時間", style="cyan")
-    table.add_column("操作者", style="magenta")
-    table.add_column("操作類型", style="green")
-    table.add_column("對象", style="yellow")
-    table.add_column("變更內容", style="white")
-
-    for log in logs:
-        # 處理新格式 (DATA_CORRECTION)
-        if 'change' in log and isinstance(log['change'], dict):
-            action_type = log.get('event_type', 'DATA_CORRECTION')
-            target = log.get('target_table', '') + ' / ' + str(log.get('record_id', ''))
-            change_str = f"{log['change'].get('field', '')}: {log['change'].get('old_value', '')} -> {log['change'].get('new_value', '')}"
-        # 處理舊格式 (action based)
-        elif 'action' in log:
-            action_type = log.get('description', log.get('action', ''))
-            target = log.get('target_id', '')
-            if log.get('old_value') and log.get('new_value'):
-                change_str = f"{log['old_value']} -> {log['new_value']}"
+        table = Table(title="稽核日誌 (Audit Logs - NoSQL)")
+        table.add_column("時間", style="cyan")
+        table.add_column("操作者", style="magenta")
+        table.add_column("操作類型", style="green")
+        table.add_column("對象", style="yellow")
+        table.add_column("變更內容", style="white")
+
+        for log in logs:
+            # 處理新格式 (DATA_CORRECTION)
+            if 'change' in log and isinstance(log['change'], dict):
+                action_type = log.get('event_type', 'DATA_CORRECTION')
+                target = log.get('target_table', '') + ' / ' + str(log.get('record_id', ''))
+                change_str = f"{log['change'].get('field', '')}: {log['change'].get('old_value', '')} -> {log['change'].get('new_value', '')}"
+            # 處理舊格式 (action based)
+            elif 'action' in log:
+                action_type = log.get('description', log.get('action', ''))
+                target = log.get('target_id', '')
+                if log.get('old_value') and log.get('new_value'):
+                    change_str = f"{log['old_value']} -> {log['new_value']}"
+                else:
+                    change_str = "-"
             else:
-                change_str = "-"
-        else:
-            action_type = log.get('event_type', 'N/A')
-            target = log.get('target_id', 'N/A')
-            change_str = str(log.get('details', '-'))
+                action_type = log.get('event_type', 'N/A')
+                target = log.get('target_id', 'N/A')
+                change_str = str(log.get('details', '-'))
         
-        timestamp = log.get('timestamp', log.get('created_at', 'N/A'))
-        operator = str(log.get('operator_id', log.get('admin_id', 'N/A')))
-        table.add_row(timestamp, operator, action_type, target, change_str)
+            timestamp = log.get('timestamp', log.get('created_at', 'N/A'))
+            operator = str(log.get('operator_id', log.get('admin_id', 'N/A')))
+            if log.get('operator_name'):
+                operator = f"{operator} ({log['operator_name']})"
+            table.add_row(timestamp, operator, action_type, target, change_str)
     
-    console.print(table)
+        console.print(table)
+        cursor = ask_page(response.get("page"))
+        if cursor is None:
+            return
 
 # def check_anomalies_ui():  <-- Removed as integrated into view_animal_trends_ui
 
@@ -1300,16 +1566,18 @@ def view_high_risk_animals_ui():
 
     table = Table(title="高風險動物 (異常次數 >= 3)")
     table.add_column("動物 ID", style="red")
+    table.add_column("名字", style="cyan")
     table.add_column("異常次數", style="yellow")
 
     for res in results:
-        table.add_row(str(res['_id']), str(res['count']))
+        table.add_row(str(res['_id']), res.get('animal_name', ''), str(res['count']))
     
     console.print(table)
 
 def view_pending_health_alerts_ui():
     """查看待處理的健康警示，管理員可確認或修正"""
-    response = client.send_request("get_pending_health_alerts")
+    cursor = None
+    response = client.send_request("get_pending_health_alerts", {"cursor": cursor})
     alerts = response.get("data", [])
     
     if not alerts:
@@ -1355,19 +1623,34 @@ def view_pending_health_alerts_ui():
         console.print(table)
         console.print("\n[bold]處理選項:[/bold]")
         console.print("輸入編號 → 處理該筆警示")
+        options = page_options(response.get("page"))
+        print_page_options(options)
         console.print("0 → 返回")
         
         choice = Prompt.ask("請選擇")
         if choice == "0":
             break
+        if choice in options:
+            cursor = options[choice]
+            response = client.send_request("get_pending_health_alerts", {"cursor": cursor})
+            alerts = response.get("data", [])
+            if not alerts:
+                console.print("[yellow]此頁已無警示。[/yellow]")
+                break
+            continue
         
         try:
             idx = int(choice) - 1
             if 0 <= idx < len(alerts):
                 handle_health_alert(alerts[idx])
-                # 重新載入
-                response = client.send_request("get_pending_health_alerts")
+                # 重新載入目前這一頁 (處理過的警示已不在 PENDING 中)
+                response = client.send_request("get_pending_health_alerts", {"cursor": cursor})
                 alerts = response.get("data", [])
+                if not alerts and cursor is not None:
+                    # 目前頁已處理完，回到第一頁
+                    cursor = None
+                    response = client.send_request("get_pending_health_alerts", {"cursor": cursor})
+                    alerts = response.get("data", [])
                 if not alerts:
                     console.print("[green]所有警示已處理完畢。[/green]")
                     break
@@ -1522,6 +1805,39 @@ def view_animal_trends_ui():
     else:
         console.print(f"[green]檢查結果: {msg}[/green]")
 
+def export_animal_state_history_ui():
+    """以串流接收完整體重/狀態歷史並逐筆寫入 CSV，不需一次載入全部資料"""
+    console.print("[bold]匯出體重歷史 (CSV)[/bold]")
+
+    a_id = prompt_with_back("請輸入動物 ID (留空匯出全部)", default="")
+    if a_id == BACK:
+        return
+    filename = prompt_with_back("輸出檔名", default="animal_state_history.csv")
+    if filename == BACK:
+        return
+
+    count = 0
+    try:
+        # 先開檔，避免串流開始後才發現無法寫入
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            header, rows = client.stream_request("export_animal_state_history", {"a_id": a_id.strip()})
+            writer = csv.writer(f)
+            writer.writerow(header.get("columns", []))
+            with console.status("匯出中...") as status:
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+                    if count % 1000 == 0:
+                        status.update(f"匯出中... 已寫入 {count} 筆")
+    except StreamError as e:
+        console.print(f"[red]匯出失敗 (已寫入 {count} 筆): {e}[/red]")
+        return
+    except OSError as e:
+        console.print(f"[red]無法寫入檔案: {e}[/red]")
+        return
+
+    console.print(f"[green]已匯出 {count} 筆至 {filename}[/green]")
+
 def view_reference_data_ui():
     console.print("[bold]查詢代碼表[/bold]")
     console.print("1. 動物 (Animals)")
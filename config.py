@@ -10,10 +10,72 @@ PG_DB = os.getenv("PG_DB", "zoo_db")
 PG_USER = os.getenv("PG_USER", "postgres")
 PG_PASSWORD = os.getenv("PG_PASSWORD", "password")
 
+# PostgreSQL Connection Pool
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "10"))  # 連線用盡時最長等待秒數
+PG_POOL_VALIDATE_IDLE = float(os.getenv("PG_POOL_VALIDATE_IDLE", "30"))  # 閒置超過此秒數，取出前先 SELECT 1
+
 # MongoDB Configuration
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DB = os.getenv("MONGO_DB", "zoo_nosql")
 
+# Server Configuration
+# SERVER_MODE: "thread" (每條連線一個 thread) 或 "asyncio" (單一 event loop)
+SERVER_MODE = os.getenv("SERVER_MODE", "thread")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "8"))  # 執行 ZooBackend 呼叫的 worker 數 (應小於連線池上限)
+SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "100"))  # 等待 worker 的請求上限，超過即回覆忙碌
+
+# 各 action 同時排隊 + 執行的上限，未列出者不限制 (僅受 worker 數與佇列限制)
+ACTION_CONCURRENCY_LIMITS = {
+    "batch_check_anomalies": 1,
+    "get_careless_employees": 2,
+    "get_audit_logs": 2,
+    "get_high_risk_animals": 2,
+    "get_all_employees": 4,
+    "export_animal_state_history": 2,  # 串流期間佔用 worker 與連線
+}
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "500"))  # 串流回應每個 chunk 的筆數
+# 每條連線同時進行的 pipelined 請求 (帶 id) 上限，達上限時伺服器暫停讀取該連線
+PIPELINE_MAX_INFLIGHT = int(os.getenv("PIPELINE_MAX_INFLIGHT", "16"))
+# 可在 batch 中一次執行的唯讀 action (不含有並行上限的重量級報表與串流)
+BATCH_ACTIONS = (
+    "get_my_animals", "get_recent_records", "get_animal_diet", "get_all_diet_settings",
+    "get_all_species", "get_all_feeds", "get_all_tasks", "get_all_animals",
+    "get_reference_data", "get_employee_schedule", "get_inventory_report", "get_animal_trends",
+)
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+# add_feeding_batch / add_animal_states_batch 單次最多筆數 (整批在同一交易內寫入)
+BULK_ENTRY_MAX_ITEMS = int(os.getenv("BULK_ENTRY_MAX_ITEMS", "100"))
+# 客戶端連線時要求的 framing："length" (長度前綴) 或 "line" (換行分隔 JSON)；伺服器不支援時退回 line
+PROTOCOL_FRAMING = os.getenv("PROTOCOL_FRAMING", "length")
+# 客戶端依偏好排序的 codec，只會要求本機已安裝者 (orjson / msgpack 為選用套件，msgpack 需 length framing)
+PROTOCOL_CODECS = os.getenv("PROTOCOL_CODECS", "msgpack,orjson,json")
+
+# Request Logging (server.py → network/request_log.py，由背景 thread 輸出，不阻塞請求)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" (key=value) 或 "json" (每行一筆 JSON)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # 佇列滿時丟棄紀錄，不讓請求等待輸出
+LOG_SLOW_MS = float(os.getenv("LOG_SLOW_MS", "500"))  # 超過即以 WARNING 記錄 (不受抽樣影響)
+# 成功請求的紀錄層級，未列出者為 INFO；高頻的參考資料查詢預設只在 DEBUG 顯示
+LOG_ACTION_LEVELS = {
+    "get_reference_data": "DEBUG",
+    "get_all_species": "DEBUG",
+    "get_all_feeds": "DEBUG",
+}
+# 成功請求的抽樣比例 (0~1)，未列出者全部記錄；失敗、錯誤與慢請求一律記錄。例如 {"get_my_animals": 0.1}
+LOG_SAMPLE_RATES = {}
+
+# Server Metrics (network/metrics.py；admin 可用 get_server_metrics 查詢)
+# Prometheus text 格式的 GET /metrics 連接埠，0 表示不開啟；只綁定 METRICS_HOST
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Reference Data Cache (物種、飼料、工作、動物、飲食設定、代碼表)
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))  # 秒
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", "256"))  # 最多快取筆數
+PERMISSION_CACHE_TTL = float(os.getenv("PERMISSION_CACHE_TTL", "300"))  # 秒，值班中則快取到班次結束
+
 # Table Names (SQL)
 TABLE_FEEDING = "feeding_records"       # 餵食紀錄表
 TABLE_ANIMAL_STATE = "animal_state_record" # 體重/狀態紀錄表
@@ -27,6 +89,8 @@ TABLE_STATUS_TYPE = "status_type"       # 狀態代碼表
 
 TABLE_EMPLOYEE_SKILLS = "employee_skills" # 員工證照表
 TABLE_SPECIES = "species"               # 物種表
+TABLE_STOCK_BALANCE = "feed_stock_balance" # 飼料即時庫存餘額 (由 feeding_inventory trigger 維護)
+TABLE_ANIMAL_DIET = "animal_diet"       # 物種-飼料對應表
 
 # Column Names (SQL)
 COL_FEEDING_ID = "feeding_id"
@@ -47,3 +111,16 @@ COLLECTION_AUDIT_LOGS = "audit_logs"
 COLLECTION_HEALTH_ALERTS = "health_alerts"
 COLLECTION_LOGIN_LOGS = "login_logs"
 COLLECTION_CARELESS_LOGS = "careless_logs"
+
+# login_logs 保留天數 (TTL index，見 services/mongo_indexes.py)
+LOGIN_LOG_TTL_DAYS = int(os.getenv("LOGIN_LOG_TTL_DAYS", "90"))
+
+# login_logs 背景批次寫入 (見 services/log_writer.py)
+LOGIN_LOG_BATCH_SIZE = int(os.getenv("LOGIN_LOG_BATCH_SIZE", "100"))
+LOGIN_LOG_FLUSH_INTERVAL = float(os.getenv("LOGIN_LOG_FLUSH_INTERVAL", "1.0"))  # 秒
+LOGIN_LOG_QUEUE_SIZE = int(os.getenv("LOGIN_LOG_QUEUE_SIZE", "10000"))  # 佇列上限，滿時 login 會等待
+
+# health_alerts.status 只使用以下值 (舊資料由 scripts/migrate.py 統一轉換)
+ALERT_STATUS_PENDING = "PENDING"      # 待管理員檢查
+ALERT_STATUS_CONFIRMED = "CONFIRMED"  # 確認為真實健康問題
+ALERT_STATUSES = (ALERT_STATUS_PENDING, ALERT_STATUS_CONFIRMED)
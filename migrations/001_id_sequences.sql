@@ -0,0 +1,64 @@
+-- 001: 以 sequence 產生 varchar ID，取代 MAX()+1 與 LOCK TABLE
+--
+-- 既有 ID 格式保持不變：
+--   feeding_records.feeding_id        '2024'
+--   feeding_inventory.stock_entry_id  '2131'
+--   animal_state_record.record_id     '15017'
+--   employee_shift.shift_id           'S0607'
+-- 可重複執行：sequence 已存在時只會重新對齊目前最大值。
+
+-- feeding_records.feeding_id
+CREATE SEQUENCE IF NOT EXISTS public.feeding_records_feeding_id_seq
+    OWNED BY public.feeding_records.feeding_id;
+SELECT setval(
+    'public.feeding_records_feeding_id_seq',
+    GREATEST(
+        COALESCE((SELECT MAX(CAST(feeding_id AS INTEGER)) FROM public.feeding_records WHERE feeding_id ~ '^[0-9]+$'), 0) + 1,
+        nextval('public.feeding_records_feeding_id_seq')
+    ),
+    false
+);
+ALTER TABLE public.feeding_records
+    ALTER COLUMN feeding_id SET DEFAULT nextval('public.feeding_records_feeding_id_seq')::text;
+
+-- feeding_inventory.stock_entry_id
+CREATE SEQUENCE IF NOT EXISTS public.feeding_inventory_stock_entry_id_seq
+    OWNED BY public.feeding_inventory.stock_entry_id;
+SELECT setval(
+    'public.feeding_inventory_stock_entry_id_seq',
+    GREATEST(
+        COALESCE((SELECT MAX(CAST(stock_entry_id AS INTEGER)) FROM public.feeding_inventory WHERE stock_entry_id ~ '^[0-9]+$'), 0) + 1,
+        nextval('public.feeding_inventory_stock_entry_id_seq')
+    ),
+    false
+);
+ALTER TABLE public.feeding_inventory
+    ALTER COLUMN stock_entry_id SET DEFAULT nextval('public.feeding_inventory_stock_entry_id_seq')::text;
+
+-- animal_state_record.record_id
+CREATE SEQUENCE IF NOT EXISTS public.animal_state_record_record_id_seq
+    OWNED BY public.animal_state_record.record_id;
+SELECT setval(
+    'public.animal_state_record_record_id_seq',
+    GREATEST(
+        COALESCE((SELECT MAX(CAST(record_id AS INTEGER)) FROM public.animal_state_record WHERE record_id ~ '^[0-9]+$'), 0) + 1,
+        nextval('public.animal_state_record_record_id_seq')
+    ),
+    false
+);
+ALTER TABLE public.animal_state_record
+    ALTER COLUMN record_id SET DEFAULT nextval('public.animal_state_record_record_id_seq')::text;
+
+-- employee_shift.shift_id (S + 至少 4 位數字；DMO 開頭的展示班表不列入計算)
+CREATE SEQUENCE IF NOT EXISTS public.employee_shift_shift_id_seq
+    OWNED BY public.employee_shift.shift_id;
+SELECT setval(
+    'public.employee_shift_shift_id_seq',
+    GREATEST(
+        COALESCE((SELECT MAX(CAST(SUBSTRING(shift_id FROM 2) AS INTEGER)) FROM public.employee_shift WHERE shift_id ~ '^S[0-9]+$'), 0) + 1,
+        nextval('public.employee_shift_shift_id_seq')
+    ),
+    false
+);
+ALTER TABLE public.employee_shift
+    ALTER COLUMN shift_id SET DEFAULT 'S' || lpad(nextval('public.employee_shift_shift_id_seq')::text, 4, '0');
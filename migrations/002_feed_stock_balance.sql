@@ -0,0 +1,54 @@
+-- 002: 每種飼料的即時庫存餘額，取代對 feeding_inventory 全帳本的 SUM()
+--
+-- feed_stock_balance 由 feeding_inventory 的 trigger 在同一交易內更新，
+-- 因此所有寫入路徑 (餵食、進貨、手動調整) 都會保持一致。
+-- 可重複執行：每次都會依帳本重新計算餘額。
+-- 核對帳本與餘額：python scripts/reconcile_stock.py
+
+CREATE TABLE IF NOT EXISTS public.feed_stock_balance (
+    f_id character varying(20) NOT NULL,
+    current_stock numeric(12,3) DEFAULT 0 NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    CONSTRAINT feed_stock_balance_pkey PRIMARY KEY (f_id),
+    CONSTRAINT fk_stock_balance_feed FOREIGN KEY (f_id) REFERENCES public.feeds(f_id) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+CREATE OR REPLACE FUNCTION public.apply_feed_stock_delta() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE public.feed_stock_balance
+        SET current_stock = current_stock - OLD.quantity_delta_kg,
+            updated_at = now()
+        WHERE f_id = OLD.f_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO public.feed_stock_balance (f_id, current_stock, updated_at)
+        VALUES (NEW.f_id, NEW.quantity_delta_kg, now())
+        ON CONFLICT (f_id) DO UPDATE
+        SET current_stock = public.feed_stock_balance.current_stock + EXCLUDED.current_stock,
+            updated_at = now();
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_feeding_inventory_stock_balance ON public.feeding_inventory;
+CREATE TRIGGER trg_feeding_inventory_stock_balance
+    AFTER INSERT OR DELETE OR UPDATE OF f_id, quantity_delta_kg ON public.feeding_inventory
+    FOR EACH ROW EXECUTE FUNCTION public.apply_feed_stock_delta();
+
+-- 回填：擋住帳本寫入，依帳本重新計算所有飼料的餘額
+LOCK TABLE public.feeding_inventory IN SHARE MODE;
+
+INSERT INTO public.feed_stock_balance (f_id, current_stock, updated_at)
+SELECT f.f_id, COALESCE(SUM(i.quantity_delta_kg), 0), now()
+FROM public.feeds f
+LEFT JOIN public.feeding_inventory i ON i.f_id = f.f_id
+GROUP BY f.f_id
+ON CONFLICT (f_id) DO UPDATE
+SET current_stock = EXCLUDED.current_stock,
+    updated_at = now();
@@ -0,0 +1 @@
+"""Socket server helpers for server.py."""
@@ -0,0 +1,119 @@
+"""asyncio server core: one event loop multiplexes all client sockets."""
+
+import asyncio
+import logging
+
+from network.framing import FrameTooLarge
+from network.request_log import log_event
+
+
+class AsyncZooServer:
+    """
+    以單一 event loop 處理所有連線，取代每條連線一個 thread 的 ClientHandler。
+    - 協定狀態 (framing、hello 協商) 由 open_connection 建立的連線物件處理，與 thread 模式相同
+    - 阻塞的 ZooBackend 呼叫交給 RequestDispatcher 的 worker pool 執行
+    - 不帶 id 的請求依序處理，回應順序與請求順序一致；帶 id 的請求 (pipelining)
+      不等待前一個完成，回應依完成順序送出，每條連線同時最多 max_inflight 個
+    - 串流回應由 worker thread 經 write 回呼寫出，每個 frame 都等 drain 完成 (backpressure)
+    """
+
+    def __init__(self, host, port, open_connection, on_connect=None, on_disconnect=None,
+                 recv_size=65536, max_inflight=16):
+        """
+        :param open_connection: (addr, write) -> 連線物件，需提供
+            feed(bytes)、next_frame() -> bytes | None、parse(bytes) -> request、is_pipelined(request) -> bool、
+            submit(request) -> concurrent.futures.Future (結果為回應 bytes)。
+            write 為可在 worker thread 中呼叫的阻塞寫入函式 (bytes) -> None。
+        :param on_connect / on_disconnect: 連線建立/關閉時的回呼 (addr)。
+        :param recv_size: 每次讀取的最大 bytes 數 (單一訊息上限由連線物件的 FrameDecoder 控制)。
+        :param max_inflight: 每條連線同時進行的 pipelined 請求上限，達上限時暫停讀取。
+        """
+        self.host = host
+        self.port = port
+        self.open_connection = open_connection
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.recv_size = recv_size
+        self.max_inflight = max_inflight
+        self._server = None
+
+    @staticmethod
+    async def _write(writer, data):
+        writer.write(data)
+        await writer.drain()
+
+    async def _reply_later(self, writer, inflight, future):
+        try:
+            response_bytes = await future
+            if response_bytes:
+                await self._write(writer, response_bytes)
+        except (ConnectionResetError, BrokenPipeError) as e:
+            log_event(logging.WARNING, "connection error", error=e)
+        finally:
+            inflight.release()
+
+    async def _handle_client(self, reader, writer):
+        addr = writer.get_extra_info("peername")
+        loop = asyncio.get_running_loop()
+
+        def write(data):
+            # 於 worker thread 執行：交給 event loop 寫入並等待 drain
+            asyncio.run_coroutine_threadsafe(self._write(writer, data), loop).result()
+
+        connection = self.open_connection(addr, write)
+        inflight = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+        if self.on_connect:
+            self.on_connect(addr)
+        try:
+            while True:
+                data = await reader.read(self.recv_size)
+                if not data:
+                    break
+                connection.feed(data)
+
+                while True:
+                    message = connection.next_frame()
+                    if message is None:
+                        break
+                    request = connection.parse(message)
+                    if connection.is_pipelined(request):
+                        # 同時進行的請求達上限時暫停讀取
+                        await inflight.acquire()
+                        future = asyncio.wrap_future(connection.submit(request))
+                        pending.add(asyncio.create_task(self._reply_later(writer, inflight, future)))
+                        pending = {task for task in pending if not task.done()}
+                        continue
+                    response_bytes = await asyncio.wrap_future(connection.submit(request))
+                    if response_bytes:
+                        await self._write(writer, response_bytes)
+
+            # 客戶端已送完請求，回覆仍在進行中的 pipelined 請求後才關閉
+            await asyncio.gather(*pending, return_exceptions=True)
+        except FrameTooLarge as e:
+            # 超過上限的訊息，無法再與此連線同步訊息邊界
+            log_event(logging.WARNING, "request too large", addr=addr, error=e)
+        except (ConnectionResetError, BrokenPipeError) as e:
+            log_event(logging.WARNING, "connection error", addr=addr, error=e)
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            if self.on_disconnect:
+                self.on_disconnect(addr)
+
+    async def serve_forever(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, reuse_address=True
+        )
+        print(f"[LISTENING] Server (asyncio) is listening on {self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def run(self):
+        """阻塞執行直到 KeyboardInterrupt。"""
+        asyncio.run(self.serve_forever())
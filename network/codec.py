@@ -0,0 +1,106 @@
+"""Wire codecs for the socket protocol: stdlib json, orjson and msgpack."""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from bson.objectid import ObjectId
+except ImportError:
+    ObjectId = None
+
+
+# 線上格式與原本 json.dumps(default=str) 相同：Decimal "12.50"、datetime "2025-01-01 08:00:00"、ObjectId 十六進位字串
+_ENCODERS = {
+    Decimal: str,
+    datetime: str,
+    date: str,
+    time: str,
+}
+if ObjectId is not None:
+    _ENCODERS[ObjectId] = str
+
+
+def encode_default(obj):
+    """JSON 無法表示的型別：已知型別查表轉換，其餘沿用 str() (與舊協定相容)"""
+    encoder = _ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    for cls, fn in _ENCODERS.items():
+        if isinstance(obj, cls):
+            return fn(obj)
+    return str(obj)
+
+
+class JsonCodec:
+    """標準函式庫 json，所有客戶端都支援"""
+    name = "json"
+    binary = False
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, default=encode_default).encode('utf-8')
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """orjson：輸出為精簡 JSON (UTF-8 不轉義)，datetime 交給 encode_default 以維持原格式"""
+    name = "orjson"
+    binary = False
+
+    @staticmethod
+    def dumps(obj):
+        return orjson.dumps(
+            obj, default=encode_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    """msgpack：二進位格式，內容可能含換行符，只能搭配長度前綴 framing"""
+    name = "msgpack"
+    binary = True
+
+    @staticmethod
+    def dumps(obj):
+        return msgpack.packb(obj, default=encode_default, use_bin_type=True)
+
+    @staticmethod
+    def loads(data):
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+JSON_CODEC = JsonCodec()
+
+# 依偏好排序，只包含已安裝的 codec
+CODECS = {codec.name: codec for codec in (
+    MsgpackCodec() if msgpack else None,
+    OrjsonCodec() if orjson else None,
+    JSON_CODEC,
+) if codec is not None}
+
+
+def negotiate_codec(requested, allow_binary):
+    """從客戶端依偏好排序的 codec 名稱中選出第一個可用的；都不可用時回傳 json"""
+    for name in requested or ():
+        codec = CODECS.get(name)
+        if codec and (allow_binary or not codec.binary):
+            return codec
+    return JSON_CODEC
@@ -0,0 +1,130 @@
+"""Bounded worker pool and admission control in front of ACTION_MAP dispatch."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ServerBusy(Exception):
+    """請求在進入佇列前即被拒絕 (佇列已滿或該 action 已達併發上限)。"""
+
+
+class RequestDispatcher:
+    """
+    固定數量的 worker thread 從有上限的佇列取出請求執行。
+    - 佇列已滿時 submit 立即拋出 ServerBusy，而不是讓請求卡在 pg_pool.getconn()
+    - 每個 action 可設定併發上限 (排隊中 + 執行中)，避免單一重量級報表佔滿 worker
+    - 記錄佇列深度與等待時間，供 metrics() 查詢
+    """
+
+    def __init__(self, workers=8, queue_size=100, action_limits=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.action_limits = dict(action_limits or {})
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._admitted = {}  # action -> 排隊中 + 執行中的數量
+        self._threads = []
+        self._stopped = False
+
+        # Metrics
+        self._busy_workers = 0
+        self._max_queue_depth = 0
+        self._completed = 0
+        self._rejected = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for i in range(workers):
+            t = threading.Thread(target=self._worker_loop, name=f"zoo-worker-{i + 1}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, action_name, fn, *args, **kwargs):
+        """
+        將 fn(*args, **kwargs) 排入佇列，回傳 concurrent.futures.Future。
+        無法受理時拋出 ServerBusy。
+        """
+        limit = self.action_limits.get(action_name)
+        with self._lock:
+            if self._stopped:
+                raise ServerBusy("伺服器正在關閉")
+            if limit is not None and self._admitted.get(action_name, 0) >= limit:
+                self._rejected[action_name] = self._rejected.get(action_name, 0) + 1
+                raise ServerBusy(f"{action_name} 同時執行數已達上限 ({limit})")
+            self._admitted[action_name] = self._admitted.get(action_name, 0) + 1
+
+        future = Future()
+        try:
+            self._queue.put_nowait((action_name, fn, args, kwargs, future, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self._release(action_name)
+                self._rejected[action_name] = self._rejected.get(action_name, 0) + 1
+            raise ServerBusy(f"請求佇列已滿 ({self.queue_size})")
+
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return future
+
+    def _release(self, action_name):
+        remaining = self._admitted.get(action_name, 0) - 1
+        if remaining > 0:
+            self._admitted[action_name] = remaining
+        else:
+            self._admitted.pop(action_name, None)
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            action_name, fn, args, kwargs, future, enqueued_at = item
+            wait = time.monotonic() - enqueued_at
+            with self._lock:
+                self._busy_workers += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy_workers -= 1
+                    self._completed += 1
+                    self._release(action_name)
+
+    def metrics(self):
+        """回傳佇列深度、等待時間與拒絕次數的快照"""
+        with self._lock:
+            started = self._completed + self._busy_workers
+            return {
+                "workers": self.workers,
+                "busy_workers": self._busy_workers,
+                "queue_size": self.queue_size,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "completed": self._completed,
+                "rejected": dict(self._rejected),
+                "in_flight": dict(self._admitted),
+                "avg_wait_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+    def shutdown(self, wait=True):
+        """停止受理新請求，待佇列中的請求處理完後結束 worker。"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
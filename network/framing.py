@@ -0,0 +1,88 @@
+"""Message framing for the socket protocol: newline-delimited or length-prefixed."""
+
+import struct
+
+FRAMING_LINE = "line"        # 每則訊息一行 JSON (預設，舊客戶端相容)
+FRAMING_LENGTH = "length"    # 4 bytes big-endian 長度 + 訊息本體
+FRAMINGS = (FRAMING_LINE, FRAMING_LENGTH)
+
+MAX_FRAME_SIZE = 1024 * 1024  # 單一訊息上限 (bytes)
+
+_HEADER = struct.Struct(">I")
+
+
+class FrameTooLarge(Exception):
+    """訊息超過 max_frame，無法再與此連線同步訊息邊界"""
+
+
+def encode_frame(payload, mode):
+    """將訊息本體 (bytes) 依 framing 模式包裝；line 模式的本體不可含換行符"""
+    if mode == FRAMING_LENGTH:
+        return _HEADER.pack(len(payload)) + payload
+    return payload + b"\n"
+
+
+class FrameDecoder:
+    """
+    從 socket 收到的 bytes 切出完整訊息，以 bytes 為單位處理，
+    跨 recv 邊界的多 byte UTF-8 字元不會被拆壞。
+    - 接收緩衝區為單一 bytearray，已處理的部分在下次 feed() 時一次移除
+    - 訊息以 memoryview 切片後複製一次成 bytes (交給 worker thread 使用)
+    - line 模式記住已掃描過的位置，不會重複搜尋換行符
+    - mode 可在連線中途切換 (hello 協商)，緩衝區中尚未處理的資料以新模式解析
+    """
+
+    def __init__(self, mode=FRAMING_LINE, max_frame=MAX_FRAME_SIZE):
+        self.mode = mode
+        self.max_frame = max_frame
+        self._buffer = bytearray()
+        self._start = 0  # 尚未處理的資料起點
+        self._scan = 0   # line 模式：[_start, _scan) 之間沒有換行符
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self._scan = self._start
+
+    def feed(self, data):
+        if self._start:
+            del self._buffer[:self._start]
+            self._scan -= self._start
+            self._start = 0
+        self._buffer += data
+
+    def next_frame(self):
+        """回傳下一則完整訊息 (bytes)，資料不足時回傳 None；line 模式略過空行"""
+        if self.mode == FRAMING_LENGTH:
+            return self._next_length_frame()
+        return self._next_line_frame()
+
+    def _slice(self, start, end):
+        with memoryview(self._buffer) as view:
+            return bytes(view[start:end])
+
+    def _next_line_frame(self):
+        while True:
+            end = self._buffer.find(b"\n", self._scan)
+            if end < 0:
+                self._scan = len(self._buffer)
+                if self._scan - self._start > self.max_frame:
+                    raise FrameTooLarge(f"message exceeds {self.max_frame} bytes")
+                return None
+            frame = self._slice(self._start, end)
+            self._start = self._scan = end + 1
+            if frame.strip():
+                return frame
+
+    def _next_length_frame(self):
+        available = len(self._buffer) - self._start
+        if available < _HEADER.size:
+            return None
+        (length,) = _HEADER.unpack_from(self._buffer, self._start)
+        if length > self.max_frame:
+            raise FrameTooLarge(f"message exceeds {self.max_frame} bytes")
+        if available < _HEADER.size + length:
+            return None
+        body = self._start + _HEADER.size
+        frame = self._slice(body, body + length)
+        self._start = self._scan = body + length
+        return frame
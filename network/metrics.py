@@ -0,0 +1,226 @@
+"""Per-action request metrics and Prometheus text rendering for server.py."""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 直方圖上界 (秒)，最後一格為 +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 每個請求分別記錄的時間：總延遲、等待連線池、SQL、MongoDB
+TIMINGS = ("latency", "pool_wait", "sql", "mongo")
+
+OUTCOMES = ("ok", "fail", "error", "busy")
+
+
+class Histogram:
+    """固定 bucket 的延遲直方圖 (非 thread-safe，由 ServerMetrics 的 lock 保護)"""
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """以 bucket 上界估計分位數 (秒)，不超過觀察到的最大值"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def snapshot(self):
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            "count": self.count,
+            "avg_ms": ms(self.sum / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+            "max_ms": ms(self.max),
+        }
+
+
+class _ActionMetrics:
+    __slots__ = ("outcomes", "in_flight", "histograms")
+
+    def __init__(self):
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.in_flight = 0
+        self.histograms = {name: Histogram() for name in TIMINGS}
+
+
+class ServerMetrics:
+    """
+    依 action 統計請求數 (依 outcome)、進行中數量與延遲直方圖。
+    actions 為允許的 action 名稱；其他名稱一律歸入 "unknown"，避免客戶端送任意名稱撐大統計。
+    """
+
+    def __init__(self, actions):
+        self._known = set(actions)
+        self._lock = threading.Lock()
+        self._actions = {}
+
+    def _get(self, action):
+        if action not in self._known:
+            action = "unknown"
+        metrics = self._actions.get(action)
+        if metrics is None:
+            metrics = self._actions[action] = _ActionMetrics()
+        return metrics
+
+    def started(self, action):
+        with self._lock:
+            self._get(action).in_flight += 1
+
+    def finished(self, action, outcome, latency, timings=None):
+        """timings 為 services.request_timing.RequestTimings"""
+        with self._lock:
+            metrics = self._get(action)
+            metrics.in_flight -= 1
+            self._record(metrics, outcome, latency, timings)
+
+    def rejected(self, action, outcome):
+        """未進入 worker 就回覆的請求 (busy / unknown)"""
+        with self._lock:
+            metrics = self._get(action)
+            metrics.outcomes[outcome] = metrics.outcomes.get(outcome, 0) + 1
+
+    @staticmethod
+    def _record(metrics, outcome, latency, timings):
+        metrics.outcomes[outcome] = metrics.outcomes.get(outcome, 0) + 1
+        metrics.histograms["latency"].observe(latency)
+        if timings is not None:
+            metrics.histograms["pool_wait"].observe(timings.pool_wait)
+            metrics.histograms["sql"].observe(timings.sql)
+            metrics.histograms["mongo"].observe(timings.mongo)
+
+    def snapshot(self):
+        """{action: {requests, errors, in_flight, latency: {...}, pool_wait: {...}, sql: {...}, mongo: {...}}}"""
+        with self._lock:
+            result = {}
+            for action, metrics in sorted(self._actions.items()):
+                entry = {
+                    "requests": sum(metrics.outcomes.values()),
+                    "outcomes": dict(metrics.outcomes),
+                    "errors": metrics.outcomes.get("error", 0),
+                    "in_flight": metrics.in_flight,
+                }
+                for name, histogram in metrics.histograms.items():
+                    entry[name] = histogram.snapshot()
+                result[action] = entry
+            return result
+
+    def render_prometheus(self):
+        """請求統計的 Prometheus text format (histogram 以秒為單位)"""
+        lines = []
+        with self._lock:
+            items = sorted(self._actions.items())
+            lines += ["# HELP zoo_requests_total Requests by action and outcome.",
+                      "# TYPE zoo_requests_total counter"]
+            for action, metrics in items:
+                for outcome, n in metrics.outcomes.items():
+                    lines.append(f'zoo_requests_total{{action="{action}",outcome="{outcome}"}} {n}')
+
+            lines += ["# HELP zoo_requests_in_flight Requests currently executing.",
+                      "# TYPE zoo_requests_in_flight gauge"]
+            for action, metrics in items:
+                lines.append(f'zoo_requests_in_flight{{action="{action}"}} {metrics.in_flight}')
+
+            for name in TIMINGS:
+                metric = f"zoo_request_{name}_seconds"
+                lines += [f"# HELP {metric} Per-request {name.replace('_', ' ')} time.",
+                          f"# TYPE {metric} histogram"]
+                for action, metrics in items:
+                    histogram = metrics.histograms[name]
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + ("+Inf",), histogram.counts):
+                        cumulative += n
+                        lines.append(f'{metric}_bucket{{action="{action}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{action="{action}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{action="{action}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+# 巢狀統計中以 dict key 作為 label 的欄位
+_NESTED_LABELS = {
+    "rejected": "action", "in_flight": "action", "callers": "caller",
+    "cache": "cache", "by_namespace": "namespace",
+}
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_gauges(prefix, data, labels=()):
+    """
+    將 dispatcher / 連線池 / 快取等統計 dict 轉為 gauge。
+    數值欄位為 {prefix}_{key}；巢狀 dict 依 _NESTED_LABELS 把 key 轉為 label，其他巢狀 dict 接在名稱後。
+    labels 為附加在所有樣本上的 ((name, value), ...)。
+    """
+    samples = {}
+
+    def walk(name, key, value, labels):
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            samples.setdefault(name, []).append((labels, value))
+        elif isinstance(value, dict):
+            label = _NESTED_LABELS.get(key)
+            for sub, item in value.items():
+                if label:
+                    walk(name, None, item, labels + ((label, sub),))
+                else:
+                    walk(f"{name}_{sub}", sub, item, labels)
+
+    for key, value in data.items():
+        walk(f"{prefix}_{key}", key, value, tuple(labels))
+
+    lines = []
+    for name, values in samples.items():
+        lines.append(f"# TYPE {name} gauge")
+        for sample_labels, value in values:
+            label_text = ",".join(f'{k}="{_label_value(v)}"' for k, v in sample_labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def start_metrics_http_server(port, render, host="127.0.0.1"):
+    """
+    在背景 thread 提供 GET /metrics (Prometheus text format)，預設只綁定本機。
+    render 為回傳文字的函式；回傳 server 物件 (shutdown() 停止)。
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 抓取請求不寫入日誌
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,144 @@
+"""Structured, queue-based request logging for server.py."""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+logger = logging.getLogger("zoo.server")
+
+_listener = None
+_config = {"action_levels": {}, "sample_rates": {}, "slow_ms": None}
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """佇列滿時丟棄紀錄並計數，請求 thread 永遠不會因為輸出而阻塞"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 只在此 process 內傳遞：保留 fields，例外在請求 thread 先轉成文字
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _pair(key, value):
+    value = str(value)
+    if " " in value or '"' in value:
+        value = json.dumps(value, ensure_ascii=False)
+    return f"{key}={value}"
+
+
+class KeyValueFormatter(logging.Formatter):
+    """時間 層級 訊息 key=value ... (適合直接閱讀)"""
+
+    def format(self, record):
+        line = f"{self.formatTime(record)} {record.levelname} {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(_pair(key, value) for key, value in fields.items() if value is not None)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """每筆紀錄一行 JSON (適合交給日誌收集工具)"""
+
+    def format(self, record):
+        entry = {"ts": self.formatTime(record), "level": record.levelname, "msg": record.getMessage()}
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(level="INFO", fmt="text", queue_size=10000, action_levels=None, sample_rates=None,
+                  slow_ms=None):
+    """
+    設定 zoo.server logger：紀錄先放入有上限的佇列，由背景 thread (QueueListener) 寫到 stdout。
+    :param action_levels: {action: 層級名稱}，成功請求的紀錄層級 (預設 INFO)
+    :param sample_rates: {action: 0~1}，成功請求只記錄此比例；失敗、錯誤與慢請求一律記錄
+    :param slow_ms: 超過此毫秒數的請求以 WARNING 記錄
+    """
+    global _listener
+    shutdown_logging()
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+
+    handler = _DroppingQueueHandler(log_queue)
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    _config.update(
+        action_levels={action: logging.getLevelName(name) for action, name in (action_levels or {}).items()},
+        sample_rates=dict(sample_rates or {}),
+        slow_ms=slow_ms,
+    )
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown_logging():
+    """寫完佇列中的紀錄並停止背景 thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_count():
+    return sum(getattr(handler, "dropped", 0) for handler in logger.handlers)
+
+
+def log_request(action, user, outcome, latency, timings=None, summary=None, message=None, exc_info=False,
+                **fields):
+    """
+    記錄一次請求。outcome: ok / fail (success=false) / error (例外) / busy / unknown。
+    summary 為產生參數摘要的函式，只在這筆紀錄確定會輸出時才呼叫。
+    """
+    latency_ms = latency * 1000
+    slow_ms = _config["slow_ms"]
+    if outcome == "error":
+        level = logging.ERROR
+    elif outcome != "ok" or (slow_ms is not None and latency_ms >= slow_ms):
+        level = logging.WARNING
+    else:
+        level = _config["action_levels"].get(action, logging.INFO)
+        rate = _config["sample_rates"].get(action, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return
+
+    if not logger.isEnabledFor(level):
+        return
+
+    record = {"action": action, "user": user, "outcome": outcome, "latency_ms": round(latency_ms, 3)}
+    if timings is not None:
+        record.update(timings.as_ms())
+    record.update((key, value) for key, value in fields.items() if value is not None)
+    if summary is not None:
+        record["params"] = summary()
+    if message:
+        record["message"] = str(message)[:50]  # 截斷過長訊息
+    logger.log(level, "request", exc_info=exc_info, extra={"fields": record})
+
+
+def log_event(level, event, **fields):
+    """連線、協定錯誤等非請求事件"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
@@ -0,0 +1,48 @@
+"""Streamed (chunked) responses for actions that return large result sets."""
+
+
+class StreamResponse:
+    """
+    action 回傳此物件時，伺服器以多個 frame 串流結果，而不是組成單一回應：
+        {"stream": "start", "success": true, ...header}
+        {"stream": "chunk", "data": [row, ...]}      (重複)
+        {"stream": "end", "success": true, "count": N}
+    chunks 為產生 row list 的 iterable (通常是持有 DB 連線的 generator)，
+    逐批送出，伺服器與客戶端都不需要一次持有全部資料。
+    """
+
+    def __init__(self, chunks, **header):
+        self.chunks = chunks
+        self.header = header
+
+
+def write_stream(stream, send):
+    """
+    依序送出 start / chunk / end frame，回傳 (row 數, 是否成功)。
+    send 為阻塞的寫入函式 (dict) -> None，負責編碼與 framing；
+    socket 寫不出去時由 send 拋出例外 (客戶端已離線)。
+    產生資料時的錯誤以 success=false 的 end frame 回報。
+    """
+    count = 0
+    chunks = iter(stream.chunks)
+    try:
+        send({"stream": "start", "success": True, **stream.header})
+        while True:
+            try:
+                chunk = next(chunks, None)
+            except Exception as e:
+                send({"stream": "end", "success": False, "count": count, "message": f"Server Error: {e}"})
+                return count, False
+            if chunk is None:
+                break
+            if not chunk:
+                continue
+            count += len(chunk)
+            send({"stream": "chunk", "data": chunk})
+        send({"stream": "end", "success": True, "count": count})
+        return count, True
+    finally:
+        # 客戶端中途離線時提早關閉 generator，釋放其持有的 DB 連線
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Generate synthetic zoo data at a configurable scale for benchmarks.
+
+Adds species, employees (with skills), animals, shifts, feedings, weight
+records and inventory movements to PostgreSQL with COPY, and matching
+health alerts, audit logs and careless logs to MongoDB with insert_many.
+Existing zoo.sql data is left untouched and every generated row is
+marked so --clean can remove it again:
+
+    a_id 'GA…', e_id 'GE…', shift_id 'GS…', species '<base> Gnn',
+    feeding_inventory.location_id 'LGEN', Mongo documents {"synthetic": true}
+
+Scale 1 adds about as many rows as zoo.sql (200 animals, ~15k weights,
+~12k feedings); scale 700 reaches ~10M weight records. Run
+scripts/migrate.py first (ID sequences and the stock balance trigger).
+
+    python scripts/generate_scale_data.py --scale 100
+    python scripts/generate_scale_data.py --clean
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from DB_utils import ZooBackend
+from config import (
+    ALERT_STATUS_CONFIRMED, ALERT_STATUS_PENDING,
+    COLLECTION_AUDIT_LOGS, COLLECTION_CARELESS_LOGS, COLLECTION_HEALTH_ALERTS,
+)
+
+# 每 1 倍 scale 新增的數量
+ANIMALS_PER_SCALE = 200
+EMPLOYEES_PER_SCALE = 60
+
+GEN_LOCATION = "LGEN"
+PASSWORD_HASH = hashlib.sha256("zoo123".encode()).hexdigest()
+STOCK_TRIGGER = "trg_feeding_inventory_stock_balance"
+COPY_BATCH_ROWS = 200_000
+MONGO_BATCH = 10_000
+
+
+class MongoBatch:
+    """累積文件後以 insert_many 批次寫入"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.docs = []
+        self.written = 0
+
+    def add(self, doc):
+        doc["synthetic"] = True
+        self.docs.append(doc)
+        if len(self.docs) >= MONGO_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.docs and self.collection is not None:
+            self.collection.insert_many(self.docs, ordered=False)
+            self.written += len(self.docs)
+        self.docs = []
+
+
+def copy_rows(cur, table, columns, rows):
+    """以 COPY FROM STDIN 寫入 (每 COPY_BATCH_ROWS 筆送出一次)，回傳筆數"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    buffer = io.StringIO()
+    pending = 0
+    for row in rows:
+        buffer.write("\t".join(r"\N" if value is None else str(value) for value in row))
+        buffer.write("\n")
+        pending += 1
+        if pending >= COPY_BATCH_ROWS:
+            buffer.seek(0)
+            cur.copy_expert(sql, buffer)
+            total += pending
+            buffer, pending = io.StringIO(), 0
+    if pending:
+        buffer.seek(0)
+        cur.copy_expert(sql, buffer)
+        total += pending
+    return total
+
+
+def reserve_ids(cur, sequence, count):
+    """從 sequence 預留 count 個連續 ID，回傳第一個"""
+    cur.execute("SELECT nextval(%s)", (sequence,))
+    start = cur.fetchone()[0]
+    if count > 1:
+        cur.execute("SELECT setval(%s, %s)", (sequence, start + count - 1))
+    return start
+
+
+def load_reference(cur):
+    """既有物種、飲食設定、物種平均體重與平均餵食量，作為產生資料的基準"""
+    cur.execute("SELECT s_name, COALESCE(required_skill, 'General') FROM species WHERE s_name !~ ' G[0-9]+$'")
+    species = dict(cur.fetchall())
+    cur.execute("SELECT species, f_id FROM animal_diet ORDER BY species, f_id")
+    diets = {}
+    for s_name, f_id in cur.fetchall():
+        diets.setdefault(s_name, []).append(f_id)
+    cur.execute("""
+        SELECT a.species, AVG(r.weight) FROM animal_state_record r JOIN animal a ON a.a_id = r.a_id
+        WHERE r.weight IS NOT NULL GROUP BY a.species
+    """)
+    weights = {s_name: float(avg) for s_name, avg in cur.fetchall()}
+    cur.execute("""
+        SELECT a.species, AVG(f.feeding_amount_kg) FROM feeding_records f JOIN animal a ON a.a_id = f.a_id
+        GROUP BY a.species
+    """)
+    amounts = {s_name: float(avg) for s_name, avg in cur.fetchall()}
+    cur.execute("SELECT f_id FROM feeds ORDER BY f_id")
+    feeds = [row[0] for row in cur.fetchall()]
+    return species, diets, weights, amounts, feeds
+
+
+def plan_species(species, copies):
+    """每個既有物種複製 copies 份 ('Lion G01' …)，沿用證照需求與飲食設定"""
+    planned = {}
+    for base, skill in sorted(species.items()):
+        for i in range(1, copies + 1):
+            planned[f"{base} G{i:02d}"] = (base, skill)
+    return planned
+
+
+def clean(backend):
+    """移除先前產生的資料並依帳本重算庫存餘額"""
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"ALTER TABLE feeding_inventory DISABLE TRIGGER {STOCK_TRIGGER}")
+        cur.execute("DELETE FROM feeding_inventory WHERE location_id = %s OR feeding_id IN "
+                    "(SELECT feeding_id FROM feeding_records WHERE a_id LIKE 'GA%%')", (GEN_LOCATION,))
+        inventory = cur.rowcount
+        cur.execute("DELETE FROM employee_shift WHERE shift_id LIKE 'GS%'")
+        cur.execute("DELETE FROM animal WHERE a_id LIKE 'GA%'")  # 餵食與體重紀錄 ON DELETE CASCADE
+        animals = cur.rowcount
+        cur.execute("DELETE FROM employee WHERE e_id LIKE 'GE%'")  # 證照 ON DELETE CASCADE
+        employees = cur.rowcount
+        cur.execute("DELETE FROM animal_diet WHERE species ~ ' G[0-9]+$'")
+        cur.execute("DELETE FROM species WHERE s_name ~ ' G[0-9]+$'")
+        rebuild_stock_balance(cur)
+        cur.execute(f"ALTER TABLE feeding_inventory ENABLE TRIGGER {STOCK_TRIGGER}")
+        conn.commit()
+    print(f"Removed {animals} animals, {employees} employees, {inventory} inventory movements")
+
+    if backend.mongo_db is not None:
+        for name in (COLLECTION_HEALTH_ALERTS, COLLECTION_AUDIT_LOGS, COLLECTION_CARELESS_LOGS):
+            deleted = backend.mongo_db[name].delete_many({"synthetic": True}).deleted_count
+            print(f"Removed {deleted} {name} documents")
+
+
+def rebuild_stock_balance(cur):
+    """與 migrations/002_feed_stock_balance.sql 的回填相同：依帳本重算所有飼料餘額"""
+    cur.execute("""
+        INSERT INTO feed_stock_balance (f_id, current_stock, updated_at)
+        SELECT f.f_id, COALESCE(SUM(i.quantity_delta_kg), 0), now()
+        FROM feeds f
+        LEFT JOIN feeding_inventory i ON i.f_id = f.f_id
+        GROUP BY f.f_id
+        ON CONFLICT (f_id) DO UPDATE
+        SET current_stock = EXCLUDED.current_stock,
+            updated_at = now()
+    """)
+
+
+class Generator:
+    def __init__(self, args, cur, mongo_db):
+        self.args = args
+        self.cur = cur
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now().replace(microsecond=0)
+        self.start = self.now - timedelta(days=args.days)
+        self.mongo = {
+            name: MongoBatch(mongo_db[name] if mongo_db is not None else None)
+            for name in (COLLECTION_HEALTH_ALERTS, COLLECTION_AUDIT_LOGS, COLLECTION_CARELESS_LOGS)
+        }
+        self.base_species, self.base_diets, self.base_weights, self.base_amounts, self.feeds = load_reference(cur)
+        self.species = plan_species(self.base_species, args.species_copies)
+
+    def random_times(self, count):
+        span = (self.now - self.start).total_seconds()
+        offsets = sorted(self.rng.random() * span for _ in range(count))
+        return [self.start + timedelta(seconds=int(offset)) for offset in offsets]
+
+    def timed_copy(self, table, columns, rows):
+        started = time.perf_counter()
+        count = copy_rows(self.cur, table, columns, rows)
+        elapsed = time.perf_counter() - started
+        print(f"  {table:<22} {count:>11,} rows  {elapsed:7.1f}s  ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+        return count
+
+    # --- 參考資料與人員 ---
+
+    def species_rows(self):
+        for s_name, (_, skill) in self.species.items():
+            yield s_name, None if skill == "General" else skill
+
+    def diet_rows(self):
+        for s_name, (base, _) in self.species.items():
+            for f_id in self.base_diets.get(base) or self.feeds[:1]:
+                yield s_name, f_id
+
+    def build_employees(self):
+        """員工與證照：證照輪流分配，確保每種證照都有人負責"""
+        skills = sorted({skill for skill in self.base_species.values() if skill != "General"})
+        self.employees = []
+        self.holders = {"General": []}
+        count = EMPLOYEES_PER_SCALE * self.args.scale
+        for i in range(count):
+            e_id = f"GE{i + 1:06d}"
+            role = "Admin" if i % 20 == 0 else "User"
+            owned = []
+            if skills and role == "User":
+                owned.append(skills[i % len(skills)])
+                if self.rng.random() < 0.3:
+                    owned.append(self.rng.choice(skills))
+            owned = sorted(set(owned))
+            self.employees.append((e_id, role, owned))
+            if role == "User":
+                self.holders["General"].append(e_id)
+                for skill in owned:
+                    self.holders.setdefault(skill, []).append(e_id)
+        self.admins = [e_id for e_id, role, _ in self.employees if role == "Admin"]
+
+    def employee_rows(self):
+        for e_id, role, _ in self.employees:
+            joined = self.start - timedelta(days=self.rng.randint(0, 1500))
+            yield (e_id, f"員工{e_id[2:]}", self.rng.choice("MF"), f"09{self.rng.randint(10000000, 99999999)}",
+                   joined.date(), "active", role, PASSWORD_HASH)
+
+    def skill_rows(self):
+        issued = self.start.date()
+        for e_id, _, owned in self.employees:
+            for skill in owned:
+                yield e_id, skill, issued
+
+    # --- 動物與班表 ---
+
+    def build_animals(self):
+        """每隻動物有固定負責人 (具備物種所需證照)，餵食與體重紀錄皆由此人登錄"""
+        names = list(self.species)
+        self.animals = []
+        for i in range(ANIMALS_PER_SCALE * self.args.scale):
+            s_name = names[i % len(names)]
+            base, skill = self.species[s_name]
+            keepers = self.holders.get(skill) or self.holders["General"]
+            status = "Alive" if self.rng.random() < 0.95 else self.rng.choice(("Deceased", "Transferred"))
+            weight = self.base_weights.get(base, 100.0) * self.rng.uniform(0.8, 1.2)
+            amount = self.base_amounts.get(base, 5.0) * self.rng.uniform(0.8, 1.2)
+            self.animals.append({
+                "a_id": f"GA{i + 1:07d}", "species": s_name, "base": base, "status": status,
+                "keeper": self.rng.choice(keepers), "weight": weight, "amount": amount,
+            })
+
+    def animal_rows(self):
+        for animal in self.animals:
+            yield animal["a_id"], animal["species"], self.rng.choice("MF"), animal["status"], f"{animal['base']}{animal['a_id'][2:]}"
+
+    def shift_rows(self):
+        """在園動物從 shift_history 天前到 7 天後，每天一班 08:00–17:00 日常照護"""
+        today = date.today()
+        n = 0
+        for animal in self.animals:
+            if animal["status"] != "Alive":
+                continue
+            for offset in range(-self.args.shift_history, 8):
+                day = today + timedelta(days=offset)
+                n += 1
+                yield (f"GS{n:09d}", animal["keeper"], "T006",
+                       datetime.combine(day, dt_time(8)), datetime.combine(day, dt_time(17)), animal["a_id"])
+
+    # --- 歷史紀錄 ---
+
+    def weight_rows(self, first_id):
+        """體重隨機漫步；anomaly_rate 的紀錄偏離 ±25% 並產生對應的健康警示"""
+        record_id = first_id
+        pending_after = self.now - timedelta(days=30)
+        for animal in self.animals:
+            weight = animal["weight"]
+            for at in self.random_times(self.args.weights_per_animal):
+                weight = max(0.5, weight * self.rng.uniform(0.99, 1.01))
+                recorded, state_id = weight, 1
+                if self.rng.random() < self.args.anomaly_rate:
+                    recorded = weight * self.rng.choice((0.75, 1.25))
+                    state_id = self.rng.randint(2, 6)
+                    self.mongo[COLLECTION_HEALTH_ALERTS].add({
+                        "animal_id": animal["a_id"],
+                        "alert_type": "weight_anomaly",
+                        "description": f"體重異常 {(recorded / weight - 1) * 100:.1f}% (近期平均 {weight:.1f}kg, 當前 {recorded:.1f}kg)",
+                        "detected_value": round(recorded, 2),
+                        "expected_range": f"{weight * 0.9:.1f}-{weight * 1.1:.1f}",
+                        "recorded_by": animal["keeper"],
+                        "created_at": at.isoformat(),
+                        "status": ALERT_STATUS_PENDING if at >= pending_after else ALERT_STATUS_CONFIRMED,
+                    })
+                self.maybe_correction("animal_state_record", "weight", record_id, recorded, animal, at)
+                yield record_id, animal["a_id"], at, f"{recorded:.2f}", state_id, animal["keeper"]
+                record_id += 1
+
+    def feeding_rows(self, first_id):
+        feeding_id = first_id
+        for animal in self.animals:
+            diet = self.base_diets.get(animal["base"]) or self.feeds[:1]
+            for at in self.random_times(self.args.feedings_per_animal):
+                f_id = self.rng.choice(diet)
+                amount = max(0.1, animal["amount"] * self.rng.uniform(0.85, 1.15))
+                self.maybe_correction("feeding_records", "feeding_amount_kg", feeding_id, amount, animal, at)
+                yield feeding_id, animal["a_id"], f_id, animal["keeper"], at, f"{amount:.2f}"
+                feeding_id += 1
+
+    def load_inventory(self):
+        """
+        庫存異動由已載入的餵食紀錄以 set-based INSERT … SELECT 產生 (不必在 Python 保留千萬筆)：
+        每筆餵食一筆扣減，加上每 30 天一次、足以涵蓋用量的進貨。stock_entry_id 使用欄位預設的 sequence。
+        """
+        started = time.perf_counter()
+        self.cur.execute("""
+            INSERT INTO feeding_inventory (f_id, location_id, datetime, quantity_delta_kg, reason, feeding_id)
+            SELECT f_id, %s, feed_date, -feeding_amount_kg, 'feeding', feeding_id
+            FROM feeding_records
+            WHERE a_id LIKE 'GA%%'
+        """, (GEN_LOCATION,))
+        count = self.cur.rowcount
+        periods = max(1, self.args.days // 30)
+        self.cur.execute("""
+            INSERT INTO feeding_inventory (f_id, location_id, datetime, quantity_delta_kg, reason, feeding_id)
+            SELECT u.f_id, %s, %s + p * INTERVAL '30 days', ROUND(u.total * 1.2 / %s, 3), 'purchase', NULL
+            FROM (
+                SELECT f_id, SUM(feeding_amount_kg) AS total
+                FROM feeding_records
+                WHERE a_id LIKE 'GA%%'
+                GROUP BY f_id
+            ) u
+            CROSS JOIN generate_series(0, %s - 1) AS p
+        """, (GEN_LOCATION, self.start, periods, periods))
+        count += self.cur.rowcount
+        elapsed = time.perf_counter() - started
+        print(f"  {'feeding_inventory':<22} {count:>11,} rows  {elapsed:7.1f}s  ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    def maybe_correction(self, table, field, record_id, value, animal, at):
+        """correction_rate 的紀錄被管理員修正：稽核日誌，體重修正另有冒失鬼紀錄"""
+        if not self.admins or self.rng.random() >= self.args.correction_rate:
+            return
+        corrected = round(value * self.rng.uniform(0.9, 1.1), 2)
+        fixed_at = (at + timedelta(hours=self.rng.randint(1, 48))).isoformat()
+        operator = self.rng.choice(self.admins)
+        self.mongo[COLLECTION_AUDIT_LOGS].add({
+            "event_type": "DATA_CORRECTION",
+            "timestamp": fixed_at,
+            "operator_id": operator,
+            "target_table": table,
+            "record_id": str(record_id),
+            "change": {"field": field, "old_value": round(value, 2), "new_value": corrected},
+            "original_creator_id": animal["keeper"],
+        })
+        if table == "animal_state_record":
+            self.mongo[COLLECTION_CARELESS_LOGS].add({
+                "employee_id": animal["keeper"],
+                "animal_id": animal["a_id"],
+                "record_type": "weighing",
+                "original_value": round(value, 2),
+                "corrected_value": corrected,
+                "corrected_by": operator,
+                "reason": "管理員修正異常數值",
+                "created_at": fixed_at,
+            })
+
+    def run(self):
+        cur = self.cur
+        print(f"Scale {self.args.scale}: {ANIMALS_PER_SCALE * self.args.scale:,} animals, "
+              f"{EMPLOYEES_PER_SCALE * self.args.scale:,} employees, {len(self.species)} species, {self.args.days} days")
+        self.build_employees()
+        self.build_animals()
+
+        self.timed_copy("species", ("s_name", "required_skill"), self.species_rows())
+        self.timed_copy("animal_diet", ("species", "f_id"), self.diet_rows())
+        self.timed_copy("employee", ("e_id", "e_name", "sex", "phone", "start_time", "status", "role", "password_hash"),
+                        self.employee_rows())
+        self.timed_copy("employee_skills", ("e_id", "skill_name", "issue_date"), self.skill_rows())
+        self.timed_copy("animal", ("a_id", "species", "sex", "life_status", "a_name"), self.animal_rows())
+        self.timed_copy("employee_shift", ("shift_id", "e_id", "t_id", "shift_start", "shift_end", "a_id"), self.shift_rows())
+
+        n_weights = len(self.animals) * self.args.weights_per_animal
+        first = reserve_ids(cur, "animal_state_record_record_id_seq", n_weights)
+        self.timed_copy("animal_state_record", ("record_id", "a_id", "datetime", "weight", "state_id", "recorded_by"),
+                        self.weight_rows(first))
+
+        n_feedings = len(self.animals) * self.args.feedings_per_animal
+        first = reserve_ids(cur, "feeding_records_feeding_id_seq", n_feedings)
+        self.timed_copy("feeding_records", ("feeding_id", "a_id", "f_id", "fed_by", "feed_date", "feeding_amount_kg"),
+                        self.feeding_rows(first))
+
+        # 逐列 trigger 在千萬筆時是主要成本：載入期間停用，結束前依帳本一次重算餘額
+        cur.execute(f"ALTER TABLE feeding_inventory DISABLE TRIGGER {STOCK_TRIGGER}")
+        self.load_inventory()
+        rebuild_stock_balance(cur)
+        cur.execute(f"ALTER TABLE feeding_inventory ENABLE TRIGGER {STOCK_TRIGGER}")
+
+        for name, batch in self.mongo.items():
+            batch.flush()
+            print(f"  {name:<22} {batch.written:>11,} documents")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help=f"每 1 倍新增 {ANIMALS_PER_SCALE} 隻動物、{EMPLOYEES_PER_SCALE} 位員工")
+    parser.add_argument("--days", type=int, default=365, help="歷史紀錄涵蓋的天數")
+    parser.add_argument("--weights-per-animal", type=int, default=75)
+    parser.add_argument("--feedings-per-animal", type=int, default=60)
+    parser.add_argument("--species-copies", type=int, default=3, help="每個既有物種複製幾份")
+    parser.add_argument("--shift-history", type=int, default=7, help="產生幾天前至今的班表 (另加未來 7 天)")
+    parser.add_argument("--anomaly-rate", type=float, default=0.002, help="體重紀錄中異常值的比例 (產生健康警示)")
+    parser.add_argument("--correction-rate", type=float, default=0.001, help="被修正紀錄的比例 (產生稽核日誌)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clean", action="store_true", help="移除先前產生的資料後結束")
+    args = parser.parse_args()
+
+    backend = ZooBackend()
+    try:
+        if args.clean:
+            clean(backend)
+            return
+
+        started = time.perf_counter()
+        with backend.get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT 1 FROM animal WHERE a_id LIKE 'GA%' LIMIT 1")
+            if cur.fetchone():
+                print("[FAIL] Generated data already exists; run with --clean first.")
+                sys.exit(1)
+            Generator(args, cur, backend.mongo_db).run()
+
+            # 大量載入後更新統計，讓規劃器依新的資料量選擇計畫
+            for table in ("animal", "employee_shift", "animal_state_record", "feeding_records", "feeding_inventory"):
+                cur.execute(f"ANALYZE {table}")
+            conn.commit()
+        print(f"\n[OK] Generated in {time.perf_counter() - started:.1f}s")
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Apply the SQL migrations in migrations/ and the MongoDB indexes.
+
+Every migration is written to be idempotent, so all files are applied in
+order on each run. Re-run this after restoring zoo.sql or zoo.backup.
+
+MongoDB indexes are declared in services/mongo_indexes.py. After creating
+them, every known query shape is explained and the script fails if any of
+them still runs as a collection scan.
+"""
+
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from DB_utils import ZooBackend
+from services import mongo_indexes
+
+MIGRATIONS_DIR = os.path.join(ROOT, "migrations")
+
+
+def migration_files():
+    return sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql")))
+
+
+def apply_migrations(backend):
+    """在單一交易中依序套用所有 migration，回傳已套用的檔名"""
+    applied = []
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        for path in migration_files():
+            with open(path, "r", encoding="utf-8") as f:
+                cur.execute(f.read())
+            applied.append(os.path.basename(path))
+        conn.commit()
+    return applied
+
+
+def apply_mongo_indexes(backend):
+    """轉換舊資料、建立索引並檢查查詢計畫；回傳 COLLSCAN 的查詢清單"""
+    normalized, unknown = mongo_indexes.normalize_alert_statuses(backend.mongo_db)
+    if normalized:
+        print(f"[OK] health_alerts.status normalized ({normalized} docs)")
+    if unknown:
+        print(f"[WARNING] health_alerts has unknown status values: {unknown}")
+
+    retimed = mongo_indexes.normalize_log_timestamps(backend.mongo_db)
+    if retimed:
+        print(f"[OK] log timestamps normalized to ISO format ({retimed} docs)")
+
+    for collection, name in mongo_indexes.ensure_indexes(backend.mongo_db):
+        print(f"[OK] {collection}.{name}")
+
+    backfilled = mongo_indexes.backfill_login_timestamps(backend.mongo_db)
+    if backfilled:
+        print(f"[OK] login_logs.logged_at backfilled ({backfilled} docs)")
+
+    collscans = []
+    for label, stages, ok in mongo_indexes.verify_query_plans(backend.mongo_db):
+        print(f"[{'OK' if ok else 'FAIL'}] {label}: {' <- '.join(stages)}")
+        if not ok:
+            collscans.append(label)
+    return collscans
+
+
+def main():
+    backend = ZooBackend()
+    try:
+        if backend.pg_pool is None:
+            print("[FAIL] PostgreSQL connection pool is not initialized.")
+            sys.exit(1)
+        for name in apply_migrations(backend):
+            print(f"[OK] {name}")
+        print("\nMigrations applied.\n")
+
+        if backend.mongo_client is None:
+            print("[FAIL] MongoDB connection is not initialized.")
+            sys.exit(1)
+        collscans = apply_mongo_indexes(backend)
+        if collscans:
+            print(f"\n[FAIL] Collection scan: {', '.join(collscans)}")
+            sys.exit(1)
+        print("\nMongoDB indexes verified.")
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Verify feed_stock_balance against the feeding_inventory ledger.
+
+Exits with status 1 when balances drift from the ledger. Pass --fix to
+rewrite drifted balances from the ledger.
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from DB_utils import ZooBackend
+from services.inventory_service import reconcile_stock_balance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="以帳本加總覆寫不一致的餘額")
+    args = parser.parse_args()
+
+    backend = ZooBackend()
+    try:
+        mismatches = reconcile_stock_balance(backend, fix=args.fix)
+    finally:
+        backend.close()
+
+    if not mismatches:
+        print("[OK] feed_stock_balance matches the feeding_inventory ledger.")
+        return
+
+    for m in mismatches:
+        print(f"[DIFF] {m['f_id']}: balance={m['balance']:.3f} ledger={m['ledger']:.3f} diff={m['diff']:+.3f}")
+
+    if args.fix:
+        print(f"\nRewrote {len(mismatches)} balances from the ledger.")
+    else:
+        print(f"\n{len(mismatches)} feeds drifted; run with --fix to repair.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
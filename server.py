@@ -1,12 +1,28 @@
+import argparse
 import socket
 import threading
-import json
-import traceback
+import time
+import logging
 from DB_utils import ZooBackend
+from concurrent.futures import Future
+from config import (
+    SERVER_MODE, SERVER_WORKERS, SERVER_QUEUE_SIZE, ACTION_CONCURRENCY_LIMITS,
+    BATCH_ACTIONS, PIPELINE_MAX_INFLIGHT,
+    LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_ACTION_LEVELS, LOG_SAMPLE_RATES, LOG_SLOW_MS,
+    METRICS_PORT, METRICS_HOST
+)
+from network.async_server import AsyncZooServer
+from network.dispatcher import RequestDispatcher, ServerBusy
+from network.codec import CODECS, JSON_CODEC, negotiate_codec
+from network.framing import FRAMINGS, FRAMING_LINE, FrameDecoder, FrameTooLarge, encode_frame
+from network.metrics import ServerMetrics, render_gauges, start_metrics_http_server
+from network.request_log import dropped_count, log_event, log_request, setup_logging, shutdown_logging
+from network.streaming import StreamResponse, write_stream
+from services import request_timing
 
 # Import Actions
 from action.auth import LoginAction, LogoutAction, ForgotPasswordAction
-from action.feeding import AddFeedingAction
+from action.feeding import AddFeedingAction, AddFeedingBatchAction
 from action.inventory import AddInventoryStockAction, GetInventoryReportAction
 from action.schedule import GetEmployeeScheduleAction, GetMyAnimalsAction, AssignTaskAction, GetAllTasksAction, GetAllAnimalsAction
 from action.record import CorrectRecordAction, GetRecentRecordsAction, LogInputWarningAction
@@ -17,7 +33,8 @@ from action.analysis import (
     ConfirmHealthAlertAction, GetMyCorrectionsAction
 )
 from action.reference import GetReferenceDataAction
-from action.body_info import AddAnimalStateAction
+from action.batch import BatchAction
+from action.body_info import AddAnimalStateAction, AddAnimalStatesBatchAction, ExportAnimalStateHistoryAction
 from action.skill import AddEmployeeSkillAction
 from action.diet import (
     GetAnimalDietAction, GetAllDietSettingsAction, 
@@ -37,12 +54,19 @@ PORT = 60000
 online_count = 0
 online_lock = threading.Lock()
 
+# 請求分派器 (於 start_server 建立)
+dispatcher = None
+
+RECV_SIZE = 65536
+
 # Action Mapping
 ACTION_MAP = {
     "login": LoginAction,
     "logout": LogoutAction,
     "forgot_password": ForgotPasswordAction,
     "add_feeding": AddFeedingAction,
+    "add_feeding_batch": AddFeedingBatchAction,
+    "add_animal_states_batch": AddAnimalStatesBatchAction,
     "add_inventory_stock": AddInventoryStockAction,
     "get_inventory_report": GetInventoryReportAction,
     "get_employee_schedule": GetEmployeeScheduleAction,
@@ -59,6 +83,7 @@ ACTION_MAP = {
     "get_careless_employees": GetCarelessEmployeesAction,
     "get_reference_data": GetReferenceDataAction,
     "add_animal_state": AddAnimalStateAction,
+    "export_animal_state_history": ExportAnimalStateHistoryAction,
     "add_employee_skill": AddEmployeeSkillAction,
     "get_animal_diet": GetAnimalDietAction,
     "get_all_diet_settings": GetAllDietSettingsAction,
@@ -78,6 +103,14 @@ ACTION_MAP = {
     "get_my_corrections": GetMyCorrectionsAction,
 }
 
+# batch：一次往返執行多個唯讀 action
+BatchAction.actions = {name: ACTION_MAP[name] for name in BATCH_ACTIONS}
+ACTION_MAP["batch"] = BatchAction
+
+# 各 action 的請求數、進行中數量與延遲直方圖 (見 network/metrics.py)
+metrics = ServerMetrics(ACTION_MAP)
+server_started = time.time()
+
 class ClientHandler(threading.Thread):
     def __init__(self, conn, addr, db_backend):
         super().__init__(daemon=True)
@@ -85,104 +118,358 @@ class ClientHandler(threading.Thread):
         self.addr = addr
         self.db_backend = db_backend
 
-    def _format_params(self, action_name, params):
-        """格式化參數摘要用於日誌"""
-        if action_name == "login":
-            return params.get("e_id", "-")
-        elif action_name == "add_feeding":
-            return f"{params.get('a_id')}, {params.get('f_id')}, {params.get('amount')}kg"
-        elif action_name == "add_animal_state":
-            return f"{params.get('a_id')}, {params.get('weight')}kg"
-        elif action_name == "add_inventory_stock":
-            return f"{params.get('f_id')}, +{params.get('amount')}kg"
-        elif action_name == "assign_task":
-            return f"{params.get('e_id')} -> {params.get('t_id')}, {params.get('a_id') or '無指定動物'}"
-        elif action_name == "correct_record":
-            return f"{params.get('table')}, ID:{params.get('record_id')}"
-        elif action_name == "add_employee_skill":
-            return f"{params.get('target_e_id')} <- {params.get('skill_name')}"
-        elif action_name == "get_animal_trends":
-            return params.get("a_id", "-")
-        elif action_name == "get_reference_data":
-            return params.get("table_name", "-")
-        else:
-            return "-"
-
     def run(self):
-        global online_count
-        with online_lock:
-            online_count += 1
-            print(f"[ONLINE] {self.addr} 上線，目前上線人數: {online_count}")
+        client_online(self.addr)
         
-        buffer = ""
+        connection = ClientConnection(self.db_backend, self.addr, self.conn.sendall)
         try:
             while True:
-                # Receive data
-                chunk = self.conn.recv(4096).decode('utf-8')
-                if not chunk:
+                # Receive data (以 bytes 處理，切分訊息後才解碼)
+                data = self.conn.recv(RECV_SIZE)
+                if not data:
                     break
-                
-                buffer += chunk
-                
-                # 處理所有完整的訊息（以換行符分隔）
-                while "\n" in buffer:
-                    message, buffer = buffer.split("\n", 1)
-                    if not message.strip():
+                connection.feed(data)
+
+                # 處理所有完整的訊息
+                while True:
+                    message = connection.next_frame()
+                    if message is None:
+                        break
+                    request = connection.parse(message)
+                    if connection.is_pipelined(request):
+                        # 帶 id 的請求不等待，完成後由 worker 直接回覆 (可能與送出順序不同)；
+                        # 同時進行的請求達上限時暫停讀取
+                        connection.inflight.acquire()
+                        future = connection.submit(request)
+                        future.add_done_callback(lambda f: self._reply_later(connection, f))
                         continue
-                    
-                    try:
-                        request = json.loads(message)
-                        action_name = request.get('action')
-                        params = request.get('data', {})
-                        
-                        # 取得操作者 ID
-                        user_id = params.get('user_id') or params.get('e_id') or '-'
-                        
-                        # 格式化參數摘要
-                        param_summary = self._format_params(action_name, params)
-                        
-                        if action_name in ACTION_MAP:
-                            action_cls = ACTION_MAP[action_name]
-                            action_instance = action_cls()
-                            response = action_instance.execute(self.db_backend, **params)
-                            
-                            # 格式化結果
-                            status = "成功" if response.get("success") else "失敗"
-                            msg = response.get("message", "")[:50]  # 截斷過長訊息
-                            
-                            print(f"[{user_id}] {action_name} -> {param_summary} -> {status}: {msg}")
-                        else:
-                            response = {"success": False, "message": f"Unknown action: {action_name}"}
-                            print(f"[{user_id}] {action_name} -> 未知操作")
-                        
-                        # Send response (加換行符作為訊息結尾)
-                        response_json = json.dumps(response, default=str) + "\n"
-                        self.conn.sendall(response_json.encode('utf-8'))
-                        
-                    except json.JSONDecodeError:
-                        print(f"[{self.addr}] Invalid JSON received.")
-                        error_resp = {"success": False, "message": "Invalid JSON format"}
-                        self.conn.sendall((json.dumps(error_resp) + "\n").encode('utf-8'))
-                    except Exception as e:
-                        print(f"[{self.addr}] Error processing request: {e}")
-                        traceback.print_exc()
-                        error_resp = {"success": False, "message": f"Server Error: {str(e)}"}
-                        self.conn.sendall((json.dumps(error_resp) + "\n").encode('utf-8'))
+                    # 交由 dispatcher 執行並等待結果 (回應已依 framing 編碼)
+                    # 串流回應由 worker 直接送出，結果為空 bytes
+                    response = connection.submit(request).result()
+                    if response:
+                        connection.reply(response)
+
+            # 客戶端已送完請求，等待進行中的 pipelined 請求回覆後才關閉
+            for _ in range(PIPELINE_MAX_INFLIGHT):
+                connection.inflight.acquire()
 
+        except FrameTooLarge as e:
+            log_event(logging.WARNING, "request too large", addr=self.addr, error=e)
         except Exception as e:
-            print(f"[{self.addr}] Connection error: {e}")
+            log_event(logging.WARNING, "connection error", addr=self.addr, error=e)
         finally:
             self.conn.close()
-            with online_lock:
-                online_count -= 1
-                print(f"[OFFLINE] {self.addr} 離線，目前上線人數: {online_count}")
+            client_offline(self.addr)
 
+    def _reply_later(self, connection, future):
+        try:
+            response = future.result()
+            if response:
+                connection.reply(response)
+        except Exception as e:
+            log_event(logging.WARNING, "connection error", addr=self.addr, error=e)
+        finally:
+            connection.inflight.release()
 
-def start_server():
-    print("[STARTING] Server is starting...")
-    # Initialize Database Connection
-    db_backend = ZooBackend()
-    
+
+def client_online(addr):
+    global online_count
+    with online_lock:
+        online_count += 1
+        log_event(logging.INFO, "connect", addr=addr, online=online_count)
+
+
+def client_offline(addr):
+    global online_count
+    with online_lock:
+        online_count -= 1
+        log_event(logging.INFO, "disconnect", addr=addr, online=online_count)
+
+
+class ClientConnection:
+    """
+    單一連線的協定狀態，thread 與 asyncio 模式共用。
+    連線預設為換行分隔 JSON；客戶端可在第一個請求送出
+    {"action": "hello", "data": {"framing": "length"}} 改用長度前綴 framing，
+    hello 的 "codecs" 為客戶端依偏好排序的 codec (json / orjson / msgpack)，伺服器選第一個
+    已安裝者 (msgpack 需搭配 length framing)。hello 的回應仍以原模式與 json 送出，之後雙方切換。
+    請求帶 "id" 時為 pipelining：不等待前一個回應即可送出下一個，
+    回應 (含串流 frame) 帶相同 id，依完成順序送出；不帶 id 的請求依序處理。
+    write 為阻塞寫入 bytes 的函式，由 worker thread 呼叫時以 lock 保護，frame 不會交錯。
+    """
+
+    def __init__(self, db_backend, addr, write):
+        self.db_backend = db_backend
+        self.addr = addr
+        self.write = write
+        self.decoder = FrameDecoder()
+        self.codec = JSON_CODEC
+        self.inflight = threading.BoundedSemaphore(PIPELINE_MAX_INFLIGHT)
+        self._write_lock = threading.Lock()
+        self._first = True
+
+    def feed(self, data):
+        self.decoder.feed(data)
+
+    def next_frame(self):
+        return self.decoder.next_frame()
+
+    def encode(self, response, request_id=None):
+        """以連線的 codec 與 framing 編碼回應；pipelined 請求的回應帶上 id"""
+        if request_id is not None:
+            response = {"id": request_id, **response}
+        return encode_frame(self.codec.dumps(response), self.decoder.mode)
+
+    def reply(self, data):
+        with self._write_lock:
+            self.write(data)
+
+    def send(self, response, request_id=None):
+        self.reply(self.encode(response, request_id))
+
+    def parse(self, message):
+        """以連線的 codec 解析請求，格式錯誤時回傳 None"""
+        try:
+            return self.codec.loads(message)
+        except Exception:
+            log_event(logging.WARNING, "invalid message", addr=self.addr, codec=self.codec.name)
+            return None
+
+    def is_pipelined(self, request):
+        """hello 之外帶 id 的請求"""
+        return isinstance(request, dict) and request.get('id') is not None and request.get('action') != "hello"
+
+    def submit(self, request):
+        """執行一則已解析的請求，回傳 Future，結果為已編碼的回應 bytes"""
+        first, self._first = self._first, False
+        if request is None:
+            return _completed(self, {"success": False, "message": "Invalid JSON format"})
+
+        if isinstance(request, dict) and request.get('action') == "hello":
+            return _completed(self, self._hello(request.get('data') or {}, first))
+        return submit_message(self.db_backend, request, self.addr, self)
+
+    def _hello(self, data, first):
+        if not first:
+            return {"success": False, "message": "hello 必須是連線的第一個請求"}
+        framing = data.get('framing', FRAMING_LINE)
+        if framing not in FRAMINGS:
+            framing = FRAMING_LINE
+        codec = negotiate_codec(data.get('codecs'), allow_binary=framing != FRAMING_LINE)
+        response = {
+            "success": True, "framing": framing, "framings": list(FRAMINGS),
+            "codec": codec.name, "codecs": list(CODECS), "pipelining": True
+        }
+        # 回應以原模式編碼，之後收到的資料改用新模式解析
+        encoded = self.encode(response)
+        self.decoder.set_mode(framing)
+        self.codec = codec
+        return encoded
+
+
+def format_params(action_name, params):
+    """格式化參數摘要用於日誌"""
+    if action_name == "login":
+        return params.get("e_id", "-")
+    elif action_name == "add_feeding":
+        return f"{params.get('a_id')}, {params.get('f_id')}, {params.get('amount')}kg"
+    elif action_name in ("add_feeding_batch", "add_animal_states_batch"):
+        items = params.get("items")
+        return f"{len(items)} 筆" if isinstance(items, list) else "-"
+    elif action_name == "add_animal_state":
+        return f"{params.get('a_id')}, {params.get('weight')}kg"
+    elif action_name == "add_inventory_stock":
+        return f"{params.get('f_id')}, +{params.get('amount')}kg"
+    elif action_name == "assign_task":
+        return f"{params.get('e_id')} -> {params.get('t_id')}, {params.get('a_id') or '無指定動物'}"
+    elif action_name == "correct_record":
+        return f"{params.get('table')}, ID:{params.get('record_id')}"
+    elif action_name == "add_employee_skill":
+        return f"{params.get('target_e_id')} <- {params.get('skill_name')}"
+    elif action_name == "get_animal_trends":
+        return params.get("a_id", "-")
+    elif action_name == "get_reference_data":
+        return params.get("table_name", "-")
+    elif action_name == "batch":
+        requests = params.get("requests")
+        return ", ".join(str(r.get("action")) for r in requests if isinstance(r, dict)) if isinstance(requests, list) else "-"
+    elif action_name == "export_animal_state_history":
+        return params.get("a_id") or "全部動物"
+    else:
+        return "-"
+
+
+def execute_action(db_backend, action_name, params, addr, connection, request_id=None):
+    """
+    於 dispatcher worker 中執行 ACTION_MAP 對應的 action。
+    回傳已編碼的回應 bytes；action 回傳 StreamResponse 時由此處以 connection.send
+    逐 frame 寫出並回傳空 bytes。
+    每個請求記錄 latency 與資料庫時間 (services/request_timing.py) 後交給 log_request 與 metrics。
+    """
+    started = time.perf_counter()
+    timings = request_timing.start()
+    metrics.started(action_name)
+    user_id = '-'
+    outcome, message, exc_info, fields = "ok", None, False, {}
+    try:
+        # 取得操作者 ID
+        user_id = params.get('user_id') or params.get('e_id') or '-'
+
+        action_cls = ACTION_MAP[action_name]
+        action_instance = action_cls()
+        response = action_instance.execute(db_backend, **params)
+
+        if isinstance(response, StreamResponse):
+            try:
+                count, ok = write_stream(response, lambda frame: connection.send(frame, request_id))
+                outcome = "ok" if ok else "fail"
+            except OSError as e:
+                count, outcome, message = None, "fail", f"客戶端已離線 ({e})"
+            fields["rows"] = count
+            encoded = b""
+        else:
+            if not response.get("success"):
+                outcome = "fail"
+            message = response.get("message")
+            encoded = connection.encode(response, request_id)
+    except Exception as e:
+        outcome, message, exc_info = "error", str(e), (type(e), e, e.__traceback__)
+        encoded = connection.encode({"success": False, "message": f"Server Error: {str(e)}"}, request_id)
+    finally:
+        request_timing.finish()
+
+    latency = time.perf_counter() - started
+    metrics.finished(action_name, outcome, latency, timings)
+    log_request(
+        action_name, user_id, outcome, latency, timings,
+        summary=lambda: format_params(action_name, params), message=message, exc_info=exc_info,
+        id=request_id, **fields
+    )
+    return encoded
+
+
+def _completed(connection, response, request_id=None):
+    """包裝成已完成的 Future，讓立即回應與排隊回應走同一條路徑"""
+    future = Future()
+    future.set_result(response if isinstance(response, bytes) else connection.encode(response, request_id))
+    return future
+
+
+def submit_message(db_backend, request, addr, connection):
+    """
+    將已解析的 JSON 請求送入 dispatcher。
+    Thread 模式與 asyncio 模式共用，回傳 Future，結果為已編碼的回應 bytes。
+    """
+    try:
+        action_name = request.get('action')
+        params = request.get('data', {})
+        request_id = request.get('id')
+    except Exception as e:
+        log_event(logging.WARNING, "invalid request", addr=addr, error=e)
+        return _completed(connection, {"success": False, "message": f"Server Error: {str(e)}"})
+
+    user_id = '-'
+    if isinstance(params, dict):
+        user_id = params.get('user_id') or params.get('e_id') or '-'
+
+    # 伺服器層級的查詢不進佇列，忙碌時仍可回應
+    # 伺服器層級的查詢 (僅限 Admin) 不進佇列，忙碌時仍可回應；
+    # Admin 名單未快取時才交給 worker 查詢，不在 asyncio 的 event loop 上等待資料庫
+    if action_name in SERVER_ACTIONS:
+        allowed = db_backend.cached_is_admin(user_id)
+        if allowed is not None:
+            return _completed(connection, server_action_response(db_backend, action_name, allowed), request_id)
+        try:
+            return dispatcher.submit(action_name, execute_server_action, db_backend, action_name, user_id, connection, request_id)
+        except ServerBusy as e:
+            return _completed(connection, {"success": False, "busy": True, "message": f"伺服器忙碌中，請稍後再試 ({e})"}, request_id)
+
+    if action_name not in ACTION_MAP:
+        metrics.rejected(action_name, "fail")
+        log_request(action_name, user_id, "unknown", 0.0, id=request_id)
+        return _completed(connection, {"success": False, "message": f"Unknown action: {action_name}"}, request_id)
+
+    try:
+        return dispatcher.submit(action_name, execute_action, db_backend, action_name, params, addr, connection, request_id)
+    except ServerBusy as e:
+        metrics.rejected(action_name, "busy")
+        log_request(action_name, user_id, "busy", 0.0, message=e, id=request_id)
+        return _completed(connection, {"success": False, "busy": True, "message": f"伺服器忙碌中，請稍後再試 ({e})"}, request_id)
+
+
+def get_dispatcher_metrics(db_backend):
+    return {"success": True, "data": dispatcher.metrics()}
+
+
+def get_pool_metrics(db_backend):
+    return {"success": True, "data": db_backend.get_pool_stats()}
+
+
+def get_cache_metrics(db_backend):
+    return {"success": True, "data": db_backend.get_cache_stats()}
+
+
+def _server_stats(db_backend):
+    """伺服器層級的統計 (不含各 action 的請求統計)"""
+    with online_lock:
+        online = online_count
+    return {
+        "uptime_seconds": round(time.time() - server_started, 1),
+        "online": online,
+        "log_dropped": dropped_count(),
+        "dispatcher": dispatcher.metrics(),
+        "pool": db_backend.get_pool_stats(),
+        "cache": db_backend.get_cache_stats(),
+        "login_log_writer": db_backend.get_login_log_stats(),
+    }
+
+
+def get_server_metrics(db_backend):
+    """各 action 的請求數/錯誤數/進行中數量與延遲分位數，加上 dispatcher、連線池與快取統計"""
+    data = _server_stats(db_backend)
+    data["actions"] = metrics.snapshot()
+    return {"success": True, "data": data}
+
+
+def render_prometheus(db_backend):
+    """GET /metrics 的內容 (Prometheus text format)"""
+    stats = _server_stats(db_backend)
+    parts = [
+        metrics.render_prometheus(),
+        render_gauges("zoo_server", {key: stats[key] for key in ("uptime_seconds", "online", "log_dropped")}),
+        render_gauges("zoo_dispatcher", stats["dispatcher"]),
+        render_gauges("zoo_pg_pool", stats["pool"]),
+        render_gauges("zoo_login_log_writer", stats["login_log_writer"]),
+        render_gauges("zoo", {"cache": stats["cache"]}),  # 依快取名稱加上 cache label
+    ]
+    return "".join(parts)
+
+
+# 由 server 直接回應、不經過 dispatcher 的 action，需帶在職 Admin 的 user_id
+SERVER_ACTIONS = {
+    "get_dispatcher_metrics": get_dispatcher_metrics,
+    "get_pool_metrics": get_pool_metrics,
+    "get_cache_metrics": get_cache_metrics,
+    "get_server_metrics": get_server_metrics,
+}
+
+
+def server_action_response(db_backend, action_name, allowed):
+    if not allowed:
+        return {"success": False, "message": "權限不足: 僅限管理員查詢"}
+    return SERVER_ACTIONS[action_name](db_backend)
+
+
+def execute_server_action(db_backend, action_name, user_id, connection, request_id=None):
+    """Admin 名單未快取時於 worker 中載入後回應，回傳已編碼的回應 bytes"""
+    try:
+        response = server_action_response(db_backend, action_name, db_backend.is_admin(user_id))
+    except Exception as e:
+        response = {"success": False, "message": f"Server Error: {str(e)}"}
+    return connection.encode(response, request_id)
+
+
+def start_threaded_server(db_backend):
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # 允許重用地址
     server.bind((HOST, PORT))
@@ -194,12 +481,64 @@ def start_server():
             conn, addr = server.accept()
             thread = ClientHandler(conn, addr, db_backend)
             thread.start()
+    finally:
+        server.close()
+
+
+def start_async_server(db_backend):
+    def open_connection(addr, write):
+        return ClientConnection(db_backend, addr, write)
+
+    server = AsyncZooServer(
+        HOST, PORT, open_connection,
+        on_connect=client_online,
+        on_disconnect=client_offline,
+        max_inflight=PIPELINE_MAX_INFLIGHT
+    )
+    server.run()
+
+
+def start_server(mode=SERVER_MODE):
+    global dispatcher
+    print(f"[STARTING] Server is starting ({mode} mode)...")
+    setup_logging(
+        level=LOG_LEVEL, fmt=LOG_FORMAT, queue_size=LOG_QUEUE_SIZE,
+        action_levels=LOG_ACTION_LEVELS, sample_rates=LOG_SAMPLE_RATES, slow_ms=LOG_SLOW_MS
+    )
+    # Initialize Database Connection
+    db_backend = ZooBackend()
+    dispatcher = RequestDispatcher(
+        workers=SERVER_WORKERS,
+        queue_size=SERVER_QUEUE_SIZE,
+        action_limits=ACTION_CONCURRENCY_LIMITS
+    )
+    metrics_server = None
+    if METRICS_PORT:
+        metrics_server = start_metrics_http_server(
+            METRICS_PORT, lambda: render_prometheus(db_backend), host=METRICS_HOST
+        )
+        print(f"[METRICS] Prometheus metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+    try:
+        if mode == "asyncio":
+            start_async_server(db_backend)
+        else:
+            start_threaded_server(db_backend)
     except KeyboardInterrupt:
         print("\n[STOPPING] Server is stopping...")
     finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        dispatcher.shutdown()
         db_backend.close()
-        server.close()
+        shutdown_logging()
         print("[STOPPED] Server stopped.")
 
 if __name__ == "__main__":
-    start_server()
+    parser = argparse.ArgumentParser(description="Zoo Management System server")
+    parser.add_argument(
+        "--mode", choices=["thread", "asyncio"], default=SERVER_MODE,
+        help="thread: 每條連線一個 thread; asyncio: 單一 event loop。兩者皆由固定大小的 worker pool 執行請求"
+    )
+    args = parser.parse_args()
+    start_server(args.mode)
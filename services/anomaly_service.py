@@ -0,0 +1,199 @@
+"""Weight and feeding anomaly detection shared by single-animal and batch checks."""
+
+from datetime import datetime
+
+from config import *
+
+# 體重：當前體重 vs 前 5 次移動平均，偏差 >10% 視為異常
+WEIGHT_WINDOW = 5
+WEIGHT_MIN_RECORDS = 3
+WEIGHT_THRESHOLD_PCT = 10
+
+# 食量：最新一筆 vs 前 7 筆平均，偏差 >40% 視為異常
+FEEDING_WINDOW = 7
+FEEDING_THRESHOLD_PCT = 40
+
+
+def fetch_recent_weights(cur, a_id):
+    """單一動物最近 6 筆體重 (新到舊)"""
+    cur.execute(f"""
+        WITH RecentWeights AS (
+            SELECT
+                {COL_WEIGHT},
+                datetime,
+                ROW_NUMBER() OVER (ORDER BY datetime DESC) as rn
+            FROM {TABLE_ANIMAL_STATE}
+            WHERE a_id = %s AND {COL_WEIGHT} IS NOT NULL
+        )
+        SELECT {COL_WEIGHT}, rn FROM RecentWeights WHERE rn <= %s ORDER BY rn
+    """, (a_id, WEIGHT_WINDOW + 1))
+    return [float(r[0]) for r in cur.fetchall()]
+
+
+def fetch_recent_weights_bulk(cur, a_ids):
+    """多隻動物最近 6 筆體重，一次 window query (PARTITION BY a_id)，回傳 {a_id: [新到舊]}"""
+    cur.execute(f"""
+        WITH RecentWeights AS (
+            SELECT
+                a_id,
+                {COL_WEIGHT},
+                ROW_NUMBER() OVER (PARTITION BY a_id ORDER BY datetime DESC) as rn
+            FROM {TABLE_ANIMAL_STATE}
+            WHERE a_id = ANY(%s) AND {COL_WEIGHT} IS NOT NULL
+        )
+        SELECT a_id, array_agg({COL_WEIGHT} ORDER BY rn)
+        FROM RecentWeights
+        WHERE rn <= %s
+        GROUP BY a_id
+    """, (list(a_ids), WEIGHT_WINDOW + 1))
+    return {r[0]: [float(w) for w in r[1]] for r in cur.fetchall()}
+
+
+def fetch_feeding_stats(cur, a_id):
+    """單一動物最新食量與前 7 筆平均，資料不足時回傳 None"""
+    cur.execute(f"""
+        WITH RecentFeedings AS (
+            SELECT
+                {COL_AMOUNT},
+                feed_date,
+                ROW_NUMBER() OVER (ORDER BY feed_date DESC) as rn
+            FROM {TABLE_FEEDING}
+            WHERE a_id = %s AND {COL_AMOUNT} IS NOT NULL
+        ),
+        Stats AS (
+            SELECT
+                {COL_AMOUNT},
+                rn,
+                AVG({COL_AMOUNT}) OVER (
+                    ORDER BY rn
+                    ROWS BETWEEN 1 FOLLOWING AND {FEEDING_WINDOW} FOLLOWING
+                ) as recent_avg
+            FROM RecentFeedings
+        )
+        SELECT {COL_AMOUNT}, recent_avg FROM Stats WHERE rn = 1
+    """, (a_id,))
+    result = cur.fetchone()
+    if not result or result[1] is None:
+        return None
+    return float(result[0]), float(result[1])
+
+
+def fetch_feeding_stats_bulk(cur, a_ids):
+    """多隻動物的最新食量與前 7 筆平均，一次 window query，回傳 {a_id: (latest, recent_avg)}"""
+    cur.execute(f"""
+        WITH RecentFeedings AS (
+            SELECT
+                a_id,
+                {COL_AMOUNT},
+                ROW_NUMBER() OVER (PARTITION BY a_id ORDER BY feed_date DESC) as rn
+            FROM {TABLE_FEEDING}
+            WHERE a_id = ANY(%s) AND {COL_AMOUNT} IS NOT NULL
+        )
+        SELECT
+            a_id,
+            MAX({COL_AMOUNT}) FILTER (WHERE rn = 1) as latest,
+            AVG({COL_AMOUNT}) FILTER (WHERE rn BETWEEN 2 AND %s) as recent_avg
+        FROM RecentFeedings
+        WHERE rn <= %s
+        GROUP BY a_id
+    """, (list(a_ids), FEEDING_WINDOW + 1, FEEDING_WINDOW + 1))
+    return {
+        r[0]: (float(r[1]), float(r[2]))
+        for r in cur.fetchall()
+        if r[2] is not None
+    }
+
+
+def evaluate_weight(a_id, weights):
+    """
+    判斷體重異常。weights 為新到舊的最近體重。
+    回傳 (is_anomaly, msg, pct, alert)，alert 為待寫入 health_alerts 的文件或 None。
+    """
+    if len(weights) < WEIGHT_MIN_RECORDS:
+        return False, "資料不足（需至少 3 筆），無法分析", 0.0, None
+
+    current_weight = weights[0]
+    # 計算前 N-1 次的移動平均（排除當前）
+    prev_weights = weights[1:]
+    moving_avg = sum(prev_weights) / len(prev_weights)
+
+    if moving_avg == 0:
+        return False, "移動平均為0，無法計算變化率", 0.0, None
+
+    change_pct = ((current_weight - moving_avg) / moving_avg) * 100
+
+    if abs(change_pct) > WEIGHT_THRESHOLD_PCT:
+        alert = {
+            "animal_id": a_id,
+            "alert_type": "weight_anomaly",
+            "description": f"體重異常 {change_pct:.1f}% (近期平均 {moving_avg:.1f}kg, 當前 {current_weight:.1f}kg)",
+            "detected_value": current_weight,
+            "expected_range": f"{moving_avg*0.9:.1f}-{moving_avg*1.1:.1f}",
+            "created_at": datetime.now().isoformat(),
+            "status": ALERT_STATUS_PENDING
+        }
+        return True, f"偵測到異常: 體重偏離近期平均 {change_pct:.1f}%", change_pct, alert
+
+    return False, f"體重正常: 偏離近期平均 {change_pct:.1f}%", change_pct, None
+
+
+def evaluate_feeding(a_id, stats):
+    """
+    判斷食量異常。stats 為 (latest, recent_avg) 或 None (資料不足)。
+    回傳 (is_anomaly, msg, pct, alert)。
+    """
+    if stats is None:
+        return False, "食量資料不足（需至少 2 筆），無法分析", 0.0, None
+
+    latest_amount, recent_avg = stats
+
+    if recent_avg == 0:
+        return False, "近期平均食量為0，無法計算變化率", 0.0, None
+
+    change_pct = ((latest_amount - recent_avg) / recent_avg) * 100
+
+    if abs(change_pct) > FEEDING_THRESHOLD_PCT:
+        alert = {
+            "animal_id": a_id,
+            "alert_type": "food_anomaly",
+            "description": f"食量異常 {change_pct:.1f}% (近期平均 {recent_avg:.1f}kg, 當前 {latest_amount:.1f}kg)",
+            "detected_value": latest_amount,
+            "expected_range": f"{recent_avg*0.6:.1f}-{recent_avg*1.4:.1f}",
+            "created_at": datetime.now().isoformat(),
+            "status": ALERT_STATUS_PENDING
+        }
+        return True, f"偵測到異常: 食量偏離近期平均 {change_pct:.1f}%", change_pct, alert
+
+    return False, f"食量正常: 偏離近期平均 {change_pct:.1f}%", change_pct, None
+
+
+def check_animals(cur, animals, feeding=True):
+    """
+    以兩次 window query 檢查多隻動物的體重與食量異常。
+    animals: [(a_id, a_name)]；feeding=False 時只檢查體重 (批次體重匯入後使用)
+    回傳 (anomalies_found, alerts)，alerts 交由呼叫端一次 insert_many。
+    """
+    a_ids = [a_id for a_id, _ in animals]
+    if not a_ids:
+        return [], []
+
+    weights_by_animal = fetch_recent_weights_bulk(cur, a_ids)
+    feeding_by_animal = fetch_feeding_stats_bulk(cur, a_ids) if feeding else {}
+
+    anomalies_found = []
+    alerts = []
+    for a_id, a_name in animals:
+        checks = [("體重", evaluate_weight(a_id, weights_by_animal.get(a_id, [])))]
+        if feeding:
+            checks.append(("食量", evaluate_feeding(a_id, feeding_by_animal.get(a_id))))
+        for label, (is_anomaly, msg, pct, alert) in checks:
+            if is_anomaly:
+                anomalies_found.append({
+                    "id": a_id,
+                    "name": a_name,
+                    "type": label,
+                    "msg": msg,
+                    "pct": pct
+                })
+                alerts.append(alert)
+    return anomalies_found, alerts
@@ -0,0 +1,115 @@
+"""In-process read-through cache with TTL, size bound and tag invalidation."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe read-through 快取：
+    - 每筆資料於 ttl 秒後過期，超過 maxsize 時淘汰最久未使用者 (LRU)
+    - 每筆資料可標記多個 tag (通常是資料表名稱)，寫入路徑以 invalidate(tag) 清除
+    - 載入期間若相關 tag 被清除，載入結果不會寫回快取，避免回填舊資料
+    """
+
+    def __init__(self, maxsize=256, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()   # key -> (value, expires_at, tags)
+        self._tag_keys = {}          # tag -> set(key)
+        self._generations = {}       # tag -> 清除次數
+        self._epoch = 0              # clear() 次數
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._by_namespace = {}      # key[0] -> {"hits", "misses"}
+
+    def _count(self, key, field):
+        namespace = key[0] if isinstance(key, tuple) else key
+        stats = self._by_namespace.setdefault(namespace, {"hits": 0, "misses": 0})
+        stats[field] += 1
+
+    def get_or_load(self, key, loader, *args, tags=()):
+        """命中時回傳快取值，否則呼叫 loader(*args) 並寫入快取；loader 的例外會直接拋出且不快取"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > now:
+                self._data.move_to_end(key)
+                self._hits += 1
+                self._count(key, "hits")
+                return entry[0]
+            self._misses += 1
+            self._count(key, "misses")
+            epoch = self._epoch
+            generations = {tag: self._generations.get(tag, 0) for tag in tags}
+
+        value = loader(*args)
+
+        with self._lock:
+            if epoch != self._epoch or any(
+                self._generations.get(tag, 0) != gen for tag, gen in generations.items()
+            ):
+                return value
+            self._data[key] = (value, time.monotonic() + self.ttl, tuple(tags))
+            self._data.move_to_end(key)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, _, old_tags) = self._data.popitem(last=False)
+                self._forget(old_key, old_tags)
+                self._evictions += 1
+        return value
+
+    def peek(self, key, default=None):
+        """只讀取未過期的快取值，未命中時回傳 default，不呼叫 loader (可在 event loop 上使用)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+        return default
+
+    def _forget(self, key, tags):
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def invalidate(self, *tags):
+        """清除帶有任一 tag 的所有資料"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, set()):
+                    entry = self._data.pop(key, None)
+                    if entry is not None:
+                        self._forget(key, entry[2])
+                        self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self._tag_keys.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "by_namespace": {k: dict(v) for k, v in self._by_namespace.items()},
+            }
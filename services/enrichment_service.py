@@ -0,0 +1,35 @@
+"""Attach PostgreSQL names to MongoDB report documents in one query per entity."""
+
+from config import *
+
+# kind -> (table, id column, name column)
+NAME_SOURCES = {
+    "employee": (TABLE_EMPLOYEES, COL_EMPLOYEE_ID, COL_NAME),
+    "animal": (TABLE_ANIMAL, COL_ANIMAL_ID, COL_ANIMAL_NAME),
+}
+
+
+def resolve_names(backend, kind, ids):
+    """以單一 = ANY(%s) 查詢取得 {id: name}，查無的 ID 不會出現在結果中"""
+    ids = sorted({str(i) for i in ids if i})
+    if not ids or not backend.pg_pool:
+        return {}
+
+    table, id_col, name_col = NAME_SOURCES[kind]
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT {id_col}, {name_col} FROM {table} WHERE {id_col} = ANY(%s)", (ids,))
+        return dict(cur.fetchall())
+
+
+def enrich_names(backend, docs, kind, id_field, name_field, default=""):
+    """
+    將 docs 中 id_field 對應的名稱寫入 name_field (原地修改並回傳 docs)。
+    所有 ID 先收集後一次查詢；沒有 id_field 的文件不處理，查無名稱者填入 default。
+    """
+    names = resolve_names(backend, kind, (doc.get(id_field) for doc in docs))
+    for doc in docs:
+        doc_id = doc.get(id_field)
+        if doc_id:
+            doc[name_field] = names.get(str(doc_id), default)
+    return docs
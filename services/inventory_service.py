@@ -0,0 +1,87 @@
+"""Stock balance queries and ledger reconciliation for ZooBackend."""
+
+from decimal import Decimal
+
+from config import *
+
+
+def get_current_stock(cur, f_id):
+    """從 feed_stock_balance 讀取單一飼料的目前庫存 (Decimal)，使用呼叫端的交易"""
+    cur.execute(f"SELECT current_stock FROM {TABLE_STOCK_BALANCE} WHERE {COL_FEED_ID} = %s", (f_id,))
+    row = cur.fetchone()
+    return Decimal(row[0]) if row and row[0] is not None else Decimal("0")
+
+
+def lock_feeds(cur, f_ids):
+    """
+    依 f_id 排序以 FOR UPDATE 鎖定多種飼料 (固定順序，並行的批次不會互相死結)，
+    回傳 {f_id: 目前庫存}；不存在的飼料不會出現在結果中。
+    """
+    f_ids = sorted(set(f_ids))
+    cur.execute(f"""
+        SELECT {COL_FEED_ID} FROM {TABLE_FEEDS}
+        WHERE {COL_FEED_ID} = ANY(%s)
+        ORDER BY {COL_FEED_ID}
+        FOR UPDATE
+    """, (f_ids,))
+    stocks = {row[0]: Decimal("0") for row in cur.fetchall()}
+    cur.execute(f"""
+        SELECT {COL_FEED_ID}, current_stock FROM {TABLE_STOCK_BALANCE}
+        WHERE {COL_FEED_ID} = ANY(%s)
+    """, (f_ids,))
+    for f_id, stock in cur.fetchall():
+        if f_id in stocks and stock is not None:
+            stocks[f_id] = Decimal(stock)
+    return stocks
+
+
+def reconcile_stock_balance(backend, fix=False):
+    """
+    比對 feed_stock_balance 與 feeding_inventory 帳本加總。
+    回傳不一致的飼料清單；fix=True 時以帳本為準覆寫餘額。
+    """
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        if fix:
+            # 修正期間擋住帳本寫入，避免覆寫掉並行交易的 trigger 更新
+            cur.execute(f"LOCK TABLE {TABLE_INVENTORY} IN SHARE MODE")
+
+        cur.execute(f"""
+            SELECT
+                f.f_id,
+                COALESCE(b.current_stock, 0) AS balance,
+                COALESCE(l.ledger_stock, 0) AS ledger
+            FROM {TABLE_FEEDS} f
+            LEFT JOIN {TABLE_STOCK_BALANCE} b ON b.f_id = f.f_id
+            LEFT JOIN (
+                SELECT f_id, SUM({COL_QUANTITY_DELTA}) AS ledger_stock
+                FROM {TABLE_INVENTORY}
+                GROUP BY f_id
+            ) l ON l.f_id = f.f_id
+            WHERE COALESCE(b.current_stock, 0) <> COALESCE(l.ledger_stock, 0)
+            ORDER BY f.f_id
+        """)
+        mismatches = [
+            {
+                "f_id": r[0],
+                "balance": float(r[1]),
+                "ledger": float(r[2]),
+                "diff": float(r[1] - r[2]),
+            }
+            for r in cur.fetchall()
+        ]
+
+        if fix and mismatches:
+            cur.execute(f"""
+                INSERT INTO {TABLE_STOCK_BALANCE} (f_id, current_stock, updated_at)
+                SELECT f.f_id, COALESCE(SUM(i.{COL_QUANTITY_DELTA}), 0), NOW()
+                FROM {TABLE_FEEDS} f
+                LEFT JOIN {TABLE_INVENTORY} i ON i.f_id = f.f_id
+                WHERE f.f_id = ANY(%s)
+                GROUP BY f.f_id
+                ON CONFLICT (f_id) DO UPDATE
+                SET current_stock = EXCLUDED.current_stock,
+                    updated_at = NOW()
+            """, ([m["f_id"] for m in mismatches],))
+        conn.commit()
+        return mismatches
@@ -0,0 +1,160 @@
+"""Bounded background writer that batches MongoDB log inserts."""
+
+import queue
+import threading
+import time
+
+from pymongo.errors import BulkWriteError
+
+_STOP = object()
+
+
+class BufferedMongoWriter:
+    """
+    在背景 thread 以 insert_many 批次寫入 MongoDB：
+    - 累積 batch_size 筆或距上次寫入超過 flush_interval 秒即寫入
+    - 佇列有上限 (max_pending)；佇列滿時 write() 最多等待 put_timeout 秒 (backpressure)，
+      仍無空間則在呼叫端同步 insert_one，不會丟棄紀錄
+    - 寫入失敗會重試，最終失敗的筆數印出並計入 stats()
+    - close() 會寫完佇列中所有紀錄後才返回
+    """
+
+    def __init__(self, collection, batch_size=100, flush_interval=1.0, max_pending=10000,
+                 put_timeout=0.5, retries=3, name="mongo-log-writer"):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Metrics
+        self._written = 0
+        self._batches = 0
+        self._blocked = 0
+        self._sync_fallbacks = 0
+        self._failed = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, doc):
+        """排入一筆紀錄；writer 已關閉時直接同步寫入"""
+        if self._closed:
+            self._insert_sync(doc)
+            return
+        try:
+            self._queue.put_nowait(doc)
+            return
+        except queue.Full:
+            with self._lock:
+                self._blocked += 1
+        try:
+            self._queue.put(doc, timeout=self.put_timeout)
+        except queue.Full:
+            self._insert_sync(doc)
+
+    def _insert_sync(self, doc):
+        with self._lock:
+            self._sync_fallbacks += 1
+        try:
+            self.collection.insert_one(doc)
+            with self._lock:
+                self._written += 1
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            print(f"[ERROR] {self.collection.name} write failed: {e}")
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                # 取出 _STOP 前已排入的紀錄都在 batch 或佇列中
+                while True:
+                    try:
+                        rest = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if rest is not _STOP:
+                        batch.append(rest)
+                self._flush(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            for attempt in range(self.retries):
+                try:
+                    self.collection.insert_many(chunk, ordered=False)
+                    with self._lock:
+                        self._written += len(chunk)
+                        self._batches += 1
+                    break
+                except BulkWriteError as e:
+                    # 個別文件錯誤不重試；重複鍵 (重試前已寫入的文件) 視為成功
+                    errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+                    with self._lock:
+                        self._written += len(chunk) - len(errors)
+                        self._failed += len(errors)
+                        self._batches += 1
+                    if errors:
+                        print(f"[ERROR] {self.collection.name} batch write failed ({len(errors)} docs): {errors[0].get('errmsg')}")
+                    break
+                except Exception as e:
+                    if attempt == self.retries - 1:
+                        with self._lock:
+                            self._failed += len(chunk)
+                        print(f"[ERROR] {self.collection.name} batch write failed ({len(chunk)} docs): {e}")
+                    else:
+                        time.sleep(0.2 * (attempt + 1))
+
+    def close(self, timeout=None):
+        """停止受理並寫完佇列中的紀錄"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # 與 close() 同時進入佇列、在 _STOP 之後的紀錄
+            leftover = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    leftover.append(item)
+            self._flush(leftover)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "max_pending": self._queue.maxsize,
+                "written": self._written,
+                "batches": self._batches,
+                "blocked": self._blocked,
+                "sync_fallbacks": self._sync_fallbacks,
+                "failed": self._failed,
+            }
@@ -0,0 +1,175 @@
+"""MongoDB index declarations, bootstrap and query-plan verification."""
+
+import pymongo
+from bson.objectid import ObjectId
+
+from config import *
+
+ASC = pymongo.ASCENDING
+DESC = pymongo.DESCENDING
+
+# collection -> [(name, keys, options)]
+INDEXES = {
+    COLLECTION_HEALTH_ALERTS: [
+        # correct_record: {animal_id, status}
+        ("animal_status", [("animal_id", ASC), ("status", ASC)], {}),
+        # get_pending_health_alerts: {status: PENDING}.sort(created_at desc, _id desc)
+        # partial index 只包含待處理警示，CONFIRMED 累積再多也不影響大小
+        ("open_alerts", [("created_at", DESC), ("_id", DESC)],
+         {"partialFilterExpression": {"status": ALERT_STATUS_PENDING}}),
+    ],
+    COLLECTION_AUDIT_LOGS: [
+        # get_audit_logs: find().sort(timestamp desc, _id desc)
+        ("timestamp_desc", [("timestamp", DESC), ("_id", DESC)], {}),
+        # get_my_corrections: {original_creator_id, event_type}.sort(timestamp desc, _id desc)
+        ("creator_event_timestamp", [("original_creator_id", ASC), ("event_type", ASC), ("timestamp", DESC), ("_id", DESC)], {}),
+        # get_careless_employees: $match event_type + $group original_creator_id
+        ("event_creator", [("event_type", ASC), ("original_creator_id", ASC)], {}),
+    ],
+    COLLECTION_CARELESS_LOGS: [
+        # get_my_corrections: {employee_id}.sort(created_at desc, _id desc)
+        ("employee_created_at", [("employee_id", ASC), ("created_at", DESC), ("_id", DESC)], {}),
+    ],
+    COLLECTION_LOGIN_LOGS: [
+        # 登入紀錄保留 LOGIN_LOG_TTL_DAYS 天 (logged_at 為 BSON Date)
+        ("logged_at_ttl", [("logged_at", ASC)], {"expireAfterSeconds": LOGIN_LOG_TTL_DAYS * 86400}),
+    ],
+}
+
+# 已被取代的索引，ensure_indexes 會移除
+OBSOLETE_INDEXES = {
+    COLLECTION_HEALTH_ALERTS: ["status_created_at"],
+}
+
+# 分頁查詢第二頁之後的 keyset 條件 (見 services/pagination.py)
+_KEYSET = {"$or": [{"timestamp": {"$lt": "2025-01-01T00:00:00"}}, {"_id": {"$lt": ObjectId("f" * 24)}}]}
+
+# DB_utils.py 中的查詢形狀：(label, collection, filter, sort)，verify_query_plans 逐一 explain
+QUERY_SHAPES = [
+    ("correct_record pending alert", COLLECTION_HEALTH_ALERTS,
+     {"animal_id": "1", "status": ALERT_STATUS_PENDING}, None),
+    ("get_pending_health_alerts", COLLECTION_HEALTH_ALERTS,
+     {"status": ALERT_STATUS_PENDING}, [("created_at", DESC), ("_id", DESC)]),
+    ("get_audit_logs", COLLECTION_AUDIT_LOGS,
+     {}, [("timestamp", DESC), ("_id", DESC)]),
+    ("get_audit_logs next page", COLLECTION_AUDIT_LOGS,
+     {"$and": [{}, {"timestamp": {"$lte": "2025-01-01T00:00:00"}}, _KEYSET]}, [("timestamp", DESC), ("_id", DESC)]),
+    ("get_my_corrections audit", COLLECTION_AUDIT_LOGS,
+     {"original_creator_id": "E003", "event_type": "DATA_CORRECTION"}, [("timestamp", DESC), ("_id", DESC)]),
+    ("get_careless_employees", COLLECTION_AUDIT_LOGS,
+     {"event_type": "DATA_CORRECTION"}, None),
+    ("get_my_corrections careless", COLLECTION_CARELESS_LOGS,
+     {"employee_id": "E003"}, [("created_at", DESC), ("_id", DESC)]),
+]
+
+
+def ensure_indexes(db):
+    """
+    建立 INDEXES 中宣告的索引 (已存在則略過)，TTL 秒數變更時以 collMod 更新，
+    欄位不同時重建，並移除 OBSOLETE_INDEXES；回傳 [(collection, name)]
+    """
+    created = []
+    for collection, specs in INDEXES.items():
+        existing = db[collection].index_information()
+        for name in OBSOLETE_INDEXES.get(collection, []):
+            if name in existing:
+                db[collection].drop_index(name)
+        for name, keys, options in specs:
+            ttl = options.get("expireAfterSeconds")
+            if name in existing and [(k, int(d)) for k, d in existing[name]["key"]] != keys:
+                db[collection].drop_index(name)
+                del existing[name]
+            if name in existing:
+                if ttl is not None and existing[name].get("expireAfterSeconds") != ttl:
+                    db.command("collMod", collection, index={"name": name, "expireAfterSeconds": ttl})
+                created.append((collection, name))
+                continue
+            db[collection].create_index(keys, name=name, **options)
+            created.append((collection, name))
+    return created
+
+
+def backfill_login_timestamps(db):
+    """舊的 login_logs 只有 ISO 字串 timestamp，補上 logged_at 讓 TTL index 生效，回傳更新筆數"""
+    result = db[COLLECTION_LOGIN_LOGS].update_many(
+        {"logged_at": {"$exists": False}, "timestamp": {"$type": "string"}},
+        [{"$set": {"logged_at": {"$dateFromString": {"dateString": "$timestamp", "onError": "$$NOW"}}}}]
+    )
+    return result.modified_count
+
+
+def normalize_alert_statuses(db):
+    """
+    一次性轉換 health_alerts.status：大小寫統一為 ALERT_STATUSES，舊的 UNREAD 視為 PENDING。
+    回傳 (更新筆數, 無法辨識的 status 清單)
+    """
+    alerts = db[COLLECTION_HEALTH_ALERTS]
+    updated = alerts.update_many(
+        {"status": {"$type": "string", "$nin": list(ALERT_STATUSES)}},
+        [{"$set": {"status": {"$toUpper": "$status"}}}]
+    ).modified_count
+    updated += alerts.update_many(
+        {"status": "UNREAD"},
+        {"$set": {"status": ALERT_STATUS_PENDING}}
+    ).modified_count
+    unknown = alerts.distinct("status", {"status": {"$nin": list(ALERT_STATUSES)}})
+    return updated, unknown
+
+
+def normalize_log_timestamps(db):
+    """
+    一次性統一時間字串，讓字串排序等於時間排序 (分頁依此排序)：
+    - 舊格式 audit_logs 只有 created_at，補上 timestamp
+    - "YYYY-MM-DD HH:MM:SS" 改為 isoformat() 的 "YYYY-MM-DDTHH:MM:SS"
+    回傳更新筆數
+    """
+    updated = db[COLLECTION_AUDIT_LOGS].update_many(
+        {"timestamp": {"$exists": False}, "created_at": {"$type": "string"}},
+        [{"$set": {"timestamp": "$created_at"}}]
+    ).modified_count
+
+    fields = (
+        (COLLECTION_AUDIT_LOGS, "timestamp"),
+        (COLLECTION_CARELESS_LOGS, "created_at"),
+        (COLLECTION_HEALTH_ALERTS, "created_at"),
+    )
+    for collection, field in fields:
+        updated += db[collection].update_many(
+            {field: {"$regex": r"^\d{4}-\d{2}-\d{2} "}},
+            [{"$set": {field: {"$concat": [
+                {"$substrCP": [f"${field}", 0, 10]},
+                "T",
+                {"$substrCP": [f"${field}", 11, {"$strLenCP": f"${field}"}]},
+            ]}}}]
+        ).modified_count
+    return updated
+
+
+def _plan_stages(plan):
+    """遞迴收集 explain 結果中的所有 stage 名稱"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def verify_query_plans(db):
+    """
+    explain QUERY_SHAPES 中的每個查詢，回傳 [(label, stages, ok)]。
+    winning plan 出現 COLLSCAN 即視為失敗。
+    """
+    results = []
+    for label, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.limit(50).explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(plan)
+        results.append((label, stages, "COLLSCAN" not in stages))
+    return results
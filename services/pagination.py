@@ -0,0 +1,106 @@
+"""Keyset (cursor) pagination shared by the MongoDB and PostgreSQL reports."""
+
+import base64
+import json
+
+import pymongo
+from bson.objectid import ObjectId
+
+NEXT = "next"
+PREV = "prev"
+MAX_PAGE_SIZE = 200
+
+
+class Page(list):
+    """
+    一頁資料 (仍是 list，既有呼叫端不受影響)，另帶 next_cursor / prev_cursor。
+    cursor 為 None 表示該方向沒有更多資料。
+    """
+
+    def __init__(self, items=(), next_cursor=None, prev_cursor=None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def info(self):
+        return {"next_cursor": self.next_cursor, "prev_cursor": self.prev_cursor}
+
+
+def encode_cursor(key, direction):
+    """key 為 [排序值, 唯一 ID]，編碼成不透明的 token"""
+    raw = json.dumps({"k": key, "d": direction}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    """回傳 (direction, key)；token 格式錯誤時拋出 ValueError"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+        direction, key = data["d"], data["k"]
+    except Exception:
+        raise ValueError("無效的分頁 cursor")
+    if direction not in (NEXT, PREV) or not isinstance(key, list) or len(key) != 2:
+        raise ValueError("無效的分頁 cursor")
+    return direction, key
+
+
+def parse_page_args(cursor, page_size, default_size):
+    """驗證 action 傳入的 cursor / page_size，回傳 (cursor, page_size)；不合法時拋出 ValueError"""
+    if cursor:
+        decode_cursor(cursor)
+    if page_size is None:
+        return cursor or None, default_size
+    try:
+        page_size = int(page_size)
+    except (TypeError, ValueError):
+        raise ValueError("page_size 必須為整數")
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size 必須介於 1 到 {MAX_PAGE_SIZE}")
+    return cursor or None, page_size
+
+
+def build_page(rows, page_size, direction, had_cursor, key_of):
+    """
+    rows 為多取一筆 (page_size + 1) 的查詢結果，依查詢方向排序。
+    PREV 方向的結果會反轉回顯示順序 (新到舊)。
+    """
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == PREV:
+        rows.reverse()
+    if not rows:
+        return Page()
+
+    if direction == NEXT:
+        next_cursor = encode_cursor(key_of(rows[-1]), NEXT) if has_more else None
+        prev_cursor = encode_cursor(key_of(rows[0]), PREV) if had_cursor else None
+    else:
+        next_cursor = encode_cursor(key_of(rows[-1]), NEXT)
+        prev_cursor = encode_cursor(key_of(rows[0]), PREV) if has_more else None
+    return Page(rows, next_cursor, prev_cursor)
+
+
+def mongo_page(collection, query, sort_field, cursor=None, page_size=50):
+    """
+    依 (sort_field, _id) 由新到舊分頁。需要 (…, sort_field -1, _id -1) 的索引
+    (見 services/mongo_indexes.py)，反方向翻頁時反向走同一個索引。
+    """
+    direction, key = decode_cursor(cursor) if cursor else (NEXT, None)
+    order = pymongo.DESCENDING if direction == NEXT else pymongo.ASCENDING
+
+    if key is not None:
+        value, last_id = key
+        strict, inclusive = ("$lt", "$lte") if direction == NEXT else ("$gt", "$gte")
+        query = {"$and": [
+            query,
+            {sort_field: {inclusive: value}},
+            {"$or": [{sort_field: {strict: value}}, {"_id": {strict: ObjectId(last_id)}}]},
+        ]}
+
+    docs = list(
+        collection.find(query)
+        .sort([(sort_field, order), ("_id", order)])
+        .limit(page_size + 1)
+    )
+    return build_page(docs, page_size, direction, key is not None,
+                      lambda doc: [doc.get(sort_field), str(doc["_id"])])
@@ -0,0 +1,212 @@
+"""Blocking, sized and health-checked PostgreSQL connection pool."""
+
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """在 timeout 內等不到可用連線。"""
+
+
+class BlockingConnectionPool:
+    """
+    取代 ThreadedConnectionPool：
+    - 連線用盡時 getconn 會等待 (最多 timeout 秒)，而不是直接拋出 PoolError
+    - 取出時檢查連線是否仍存活、是否殘留未結束的交易
+    - 歸還時若仍在交易中 (例如只讀查詢沒有 commit) 自動 rollback
+    - 依呼叫者 (caller) 統計等待時間與持有時間
+    """
+
+    def __init__(self, minconn, maxconn, timeout=10.0, validate_idle_after=30.0, **conn_kwargs):
+        """
+        :param timeout: getconn 預設最長等待秒數。
+        :param validate_idle_after: 閒置超過此秒數的連線於取出時以 SELECT 1 確認存活。
+        :param conn_kwargs: 傳給 psycopg2.connect 的參數。
+        """
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError("minconn/maxconn 設定錯誤")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_idle_after = validate_idle_after
+        self.closed = False
+        self._conn_kwargs = conn_kwargs
+        self._cond = threading.Condition()
+        self._idle = []       # [(conn, returned_at)]
+        self._in_use = {}     # id(conn) -> (caller, checked_out_at)
+        self._size = 0        # 已建立 (閒置 + 使用中) 的連線數
+
+        # Metrics
+        self._caller_stats = {}
+        self._timeouts = 0
+        self._auto_rollbacks = 0
+        self._reconnects = 0
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        return psycopg2.connect(**self._conn_kwargs)
+
+    def _stats_for(self, caller):
+        stats = self._caller_stats.get(caller)
+        if stats is None:
+            stats = {
+                "checkouts": 0, "timeouts": 0, "auto_rollbacks": 0,
+                "wait_total": 0.0, "wait_max": 0.0,
+                "hold_total": 0.0, "hold_max": 0.0,
+            }
+            self._caller_stats[caller] = stats
+        return stats
+
+    def getconn(self, caller="-", timeout=None):
+        """取出一條連線；等待超過 timeout 秒時拋出 PoolTimeout。"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while True:
+                if self.closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    # 先保留名額，實際建立連線在鎖外進行
+                    self._size += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._stats_for(caller)["timeouts"] += 1
+                    raise PoolTimeout(f"等待資料庫連線逾時 ({timeout}s, pool size {self.maxconn})")
+                self._cond.wait(remaining)
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            else:
+                conn = self._validate(conn, returned_at)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        now = time.monotonic()
+        wait = now - started
+        with self._cond:
+            self._in_use[id(conn)] = (caller, now)
+            stats = self._stats_for(caller)
+            stats["checkouts"] += 1
+            stats["wait_total"] += wait
+            stats["wait_max"] = max(stats["wait_max"], wait)
+        return conn
+
+    def _validate(self, conn, returned_at):
+        """確認閒置連線可用；失效時改建新連線。"""
+        try:
+            if conn.closed:
+                raise psycopg2.OperationalError("connection already closed")
+
+            status = conn.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                raise psycopg2.OperationalError("connection state unknown")
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+
+            if time.monotonic() - returned_at > self.validate_idle_after:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                cur.close()
+                conn.rollback()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._cond:
+                self._reconnects += 1
+            return self._connect()
+
+    def putconn(self, conn, close=False):
+        """歸還連線；殘留的交易一律 rollback，無法 rollback 的連線直接關閉。"""
+        now = time.monotonic()
+        with self._cond:
+            caller, checked_out_at = self._in_use.pop(id(conn), ("-", now))
+
+        rolled_back = False
+        if not conn.closed and not close:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                    rolled_back = True
+            except Exception:
+                close = True
+
+        with self._cond:
+            hold = now - checked_out_at
+            stats = self._stats_for(caller)
+            stats["hold_total"] += hold
+            stats["hold_max"] = max(stats["hold_max"], hold)
+            if rolled_back:
+                stats["auto_rollbacks"] += 1
+                self._auto_rollbacks += 1
+
+            if close or conn.closed or self.closed:
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        """回傳連線池大小與各 caller 的等待/持有時間 (毫秒)"""
+        with self._cond:
+            callers = {}
+            for caller, s in self._caller_stats.items():
+                n = s["checkouts"]
+                callers[caller] = {
+                    "checkouts": n,
+                    "timeouts": s["timeouts"],
+                    "auto_rollbacks": s["auto_rollbacks"],
+                    "avg_wait_ms": round(s["wait_total"] / n * 1000, 3) if n else 0.0,
+                    "max_wait_ms": round(s["wait_max"] * 1000, 3),
+                    "avg_hold_ms": round(s["hold_total"] / n * 1000, 3) if n else 0.0,
+                    "max_hold_ms": round(s["hold_max"] * 1000, 3),
+                }
+            return {
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "timeouts": self._timeouts,
+                "auto_rollbacks": self._auto_rollbacks,
+                "reconnects": self._reconnects,
+                "callers": callers,
+            }
@@ -1,6 +1,27 @@
 """Read-only reference and report queries for ZooBackend."""
 
 from config import *
+from services.pagination import NEXT, Page, build_page, decode_cursor
+
+
+# 參考資料 (物種、飼料、工作、動物、飲食設定、代碼表) 只在管理員編輯時變動，
+# 經 backend.reference_cache 快取；對應的寫入路徑會以資料表名稱 (tag) 清除。
+
+def _cached(backend, key, tags, loader, *args):
+    """Read-through 快取，回傳 list 副本避免呼叫端修改到快取內容"""
+    return list(backend.reference_cache.get_or_load(key, loader, backend, *args, tags=tags))
+
+
+def _query_all_tasks(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT t_id, t_name
+            FROM {TABLE_TASK}
+            ORDER BY t_id
+        """)
+        rows = cur.fetchall()
+        return [{"t_id": r[0], "t_name": r[1]} for r in rows]
 
 
 def get_all_tasks(backend):
@@ -9,107 +30,119 @@ def get_all_tasks(backend):
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(f"""
-                SELECT t_id, t_name
-                FROM {TABLE_TASK}
-                ORDER BY t_id
-            """)
-            rows = cur.fetchall()
-            return [{"t_id": r[0], "t_name": r[1]} for r in rows]
+        return _cached(backend, ("all_tasks",), (TABLE_TASK,), _query_all_tasks)
     except Exception as e:
         print(f"Error fetching tasks: {e}")
         return []
 
 
+def _query_all_animals(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT a.a_id, a.a_name, a.species, s.required_skill
+            FROM {TABLE_ANIMAL} a
+            JOIN {TABLE_SPECIES} s ON a.species = s.s_name
+            ORDER BY a.a_id
+        """)
+        rows = cur.fetchall()
+        return [{"a_id": r[0], "a_name": r[1], "species": r[2], "required_skill": r[3]} for r in rows]
+
+
 def get_all_animals(backend):
     """查詢所有動物"""
     if not backend.pg_pool:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(f"""
-                SELECT a.a_id, a.a_name, a.species, s.required_skill
-                FROM {TABLE_ANIMAL} a
-                JOIN {TABLE_SPECIES} s ON a.species = s.s_name
-                ORDER BY a.a_id
-            """)
-            rows = cur.fetchall()
-            return [{"a_id": r[0], "a_name": r[1], "species": r[2], "required_skill": r[3]} for r in rows]
+        return _cached(backend, ("all_animals",), (TABLE_ANIMAL, TABLE_SPECIES), _query_all_animals)
     except Exception as e:
         print(f"Error fetching animals: {e}")
         return []
 
 
+def _query_animal_diet(backend, species):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT d.f_id, f.feed_name, f.category
+            FROM {TABLE_ANIMAL_DIET} d
+            JOIN {TABLE_FEEDS} f ON d.f_id = f.f_id
+            WHERE d.species = %s
+            ORDER BY f.category, f.f_id
+        """, (species,))
+        return cur.fetchall()
+
+
 def get_animal_diet(backend, species):
     """查詢某物種可食用的飼料"""
     if not backend.pg_pool:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT d.f_id, f.feed_name, f.category
-                FROM animal_diet d
-                JOIN feeds f ON d.f_id = f.f_id
-                WHERE d.species = %s
-                ORDER BY f.category, f.f_id
-            """, (species,))
-            return cur.fetchall()
+        return _cached(backend, ("animal_diet", species), (TABLE_ANIMAL_DIET, TABLE_FEEDS), _query_animal_diet, species)
     except Exception as e:
         print(f"Error fetching animal diet: {e}")
         return []
 
 
+def _query_all_diet_settings(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT d.species, d.f_id, f.feed_name, f.category
+            FROM {TABLE_ANIMAL_DIET} d
+            JOIN {TABLE_FEEDS} f ON d.f_id = f.f_id
+            ORDER BY d.species, f.category, f.f_id
+        """)
+        return cur.fetchall()
+
+
 def get_all_diet_settings(backend):
     """查詢所有物種的飲食設定"""
     if not backend.pg_pool:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT d.species, d.f_id, f.feed_name, f.category
-                FROM animal_diet d
-                JOIN feeds f ON d.f_id = f.f_id
-                ORDER BY d.species, f.category, f.f_id
-            """)
-            return cur.fetchall()
+        return _cached(backend, ("all_diet_settings",), (TABLE_ANIMAL_DIET, TABLE_FEEDS), _query_all_diet_settings)
     except Exception as e:
         print(f"Error fetching diet settings: {e}")
         return []
 
 
+def _query_all_species(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT s_name FROM {TABLE_SPECIES} ORDER BY s_name")
+        return [r[0] for r in cur.fetchall()]
+
+
 def get_all_species(backend):
     """取得所有物種列表"""
     if not backend.pg_pool:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(f"SELECT s_name FROM {TABLE_SPECIES} ORDER BY s_name")
-            return [r[0] for r in cur.fetchall()]
+        return _cached(backend, ("all_species",), (TABLE_SPECIES,), _query_all_species)
     except Exception as e:
         print(f"Error fetching species: {e}")
         return []
 
 
+def _query_all_feeds(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT f_id, feed_name, category FROM {TABLE_FEEDS} ORDER BY category, f_id")
+        return cur.fetchall()
+
+
 def get_all_feeds(backend):
     """取得所有飼料列表"""
     if not backend.pg_pool:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT f_id, feed_name, category FROM feeds ORDER BY category, f_id")
-            return cur.fetchall()
+        return _cached(backend, ("all_feeds",), (TABLE_FEEDS,), _query_all_feeds)
     except Exception as e:
         print(f"Error fetching feeds: {e}")
         return []
@@ -127,10 +160,9 @@ def get_inventory_report(backend):
                 SELECT
                     f.f_id,
                     f.feed_name,
-                    COALESCE(SUM(i.quantity_delta_kg), 0) as current_stock
+                    COALESCE(b.current_stock, 0) as current_stock
                 FROM {TABLE_FEEDS} f
-                LEFT JOIN {TABLE_INVENTORY} i ON i.f_id = f.f_id
-                GROUP BY f.f_id, f.feed_name
+                LEFT JOIN {TABLE_STOCK_BALANCE} b ON b.f_id = f.f_id
                 ORDER BY current_stock ASC
             """)
             results = []
@@ -180,62 +212,108 @@ def get_animal_trends(backend, a_id):
         return {}, {}
 
 
+def iter_animal_state_history(backend, a_id=None, chunk_size=500):
+    """
+    依 (datetime, record_id) 逐批產生體重/狀態歷史，每批最多 chunk_size 筆。
+    使用 server-side (named) cursor，資料庫端逐批傳送，不會一次載入整張表；
+    generator 存活期間佔用一條連線，關閉 (close) 時歸還。
+    """
+    if not backend.pg_pool:
+        return
+
+    where, params = "", ()
+    if a_id:
+        where, params = "WHERE a_id = %s", (a_id,)
+
+    with backend.get_db_connection(caller="iter_animal_state_history") as conn:
+        cur = conn.cursor(name="animal_state_history")
+        cur.itersize = chunk_size
+        try:
+            cur.execute(f"""
+                SELECT record_id, a_id, datetime, {COL_WEIGHT}, state_id, recorded_by
+                FROM {TABLE_ANIMAL_STATE}
+                {where}
+                ORDER BY datetime, record_id
+            """, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+            conn.rollback()
+
+
+REFERENCE_QUERIES = {
+    TABLE_ANIMAL: f"SELECT a_id, a_name, species FROM {TABLE_ANIMAL} ORDER BY a_id",
+    TABLE_FEEDS: f"SELECT f_id, feed_name, category FROM {TABLE_FEEDS} ORDER BY f_id",
+    TABLE_TASK: f"SELECT t_id, t_name FROM {TABLE_TASK} ORDER BY t_id",
+    TABLE_EMPLOYEES: f"SELECT e_id, e_name, role FROM {TABLE_EMPLOYEES} ORDER BY e_id",
+    TABLE_STATUS_TYPE: f"SELECT s_id, s_name, description FROM {TABLE_STATUS_TYPE} ORDER BY s_id",
+}
+
+
+def _query_reference_data(backend, table_name):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(REFERENCE_QUERIES[table_name])
+        return cur.fetchall()
+
+
 def get_reference_data(backend, table_name):
     """查詢代碼表 (Reference Lookup)"""
     if not backend.pg_pool:
         return []
 
-    queries = {
-        "animal": f"SELECT a_id, a_name, species FROM {TABLE_ANIMAL} ORDER BY a_id",
-        "feeds": f"SELECT f_id, feed_name, category FROM {TABLE_FEEDS} ORDER BY f_id",
-        "task": f"SELECT t_id, t_name FROM {TABLE_TASK} ORDER BY t_id",
-        "employee": f"SELECT e_id, e_name, role FROM {TABLE_EMPLOYEES} ORDER BY e_id",
-        "status_type": f"SELECT s_id, s_name, description FROM {TABLE_STATUS_TYPE} ORDER BY s_id",
-    }
-    query = queries.get(table_name)
-    if not query:
+    if table_name not in REFERENCE_QUERIES:
         return []
 
     try:
-        with backend.get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(query)
-            return cur.fetchall()
+        return _cached(backend, ("reference_data", table_name), (table_name,), _query_reference_data, table_name)
     except Exception as e:
         print(f"Error fetching reference data: {e}")
         return []
 
 
-def get_recent_records(backend, table_name, filter_id):
-    """取得最近的紀錄，輔助修正功能"""
+def get_recent_records(backend, table_name, filter_id, cursor=None, page_size=10):
+    """取得最近的紀錄，輔助修正功能；依 (時間, ID) 由新到舊以 cursor 分頁"""
     if not backend.pg_pool:
-        return []
+        return Page()
 
     if table_name == TABLE_FEEDING:
-        query = f"""
-            SELECT r.{COL_FEEDING_ID}, r.feed_date, f.feed_name, r.{COL_AMOUNT}
-            FROM {TABLE_FEEDING} r
-            JOIN {TABLE_FEEDS} f ON r.f_id = f.f_id
-            WHERE r.a_id = %s
-            ORDER BY r.feed_date DESC
-            LIMIT 10
-        """
+        columns = f"r.{COL_FEEDING_ID}, r.feed_date, f.feed_name, r.{COL_AMOUNT}"
+        source = f"{TABLE_FEEDING} r JOIN {TABLE_FEEDS} f ON r.f_id = f.f_id"
+        time_col, id_col = "r.feed_date", f"r.{COL_FEEDING_ID}"
     elif table_name == TABLE_ANIMAL_STATE:
-        query = f"""
-            SELECT record_id, datetime, {COL_WEIGHT}
-            FROM {TABLE_ANIMAL_STATE}
-            WHERE a_id = %s
-            ORDER BY datetime DESC
-            LIMIT 10
-        """
+        columns = f"record_id, datetime, {COL_WEIGHT}"
+        source = TABLE_ANIMAL_STATE
+        time_col, id_col = "datetime", "record_id"
     else:
-        return []
+        return Page()
 
     try:
+        direction, key = decode_cursor(cursor) if cursor else (NEXT, None)
+        order = "DESC" if direction == NEXT else "ASC"
+        params = [filter_id]
+        keyset = ""
+        if key is not None:
+            keyset = f"AND ({time_col}, {id_col}) {'<' if direction == NEXT else '>'} (%s, %s)"
+            params.extend(key)
+        params.append(page_size + 1)
+
         with backend.get_db_connection() as conn:
             cur = conn.cursor()
-            cur.execute(query, (filter_id,))
-            return cur.fetchall()
+            cur.execute(f"""
+                SELECT {columns}
+                FROM {source}
+                WHERE a_id = %s {keyset}
+                ORDER BY {time_col} {order}, {id_col} {order}
+                LIMIT %s
+            """, params)
+            rows = cur.fetchall()
+        return build_page(rows, page_size, direction, key is not None,
+                          lambda r: [r[1].isoformat(), r[0]])
     except Exception as e:
         print(f"Error fetching recent records: {e}")
-        return []
+        return Page()
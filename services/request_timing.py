@@ -0,0 +1,92 @@
+"""Per-request timing accumulators, kept in a thread-local while a worker runs an action."""
+
+import threading
+import time
+
+import psycopg2.extensions
+from pymongo import monitoring
+
+_local = threading.local()
+
+
+class RequestTimings:
+    """單一請求在資料庫上花費的時間 (秒)"""
+    __slots__ = ("pool_wait", "db", "sql", "mongo")
+
+    def __init__(self):
+        self.pool_wait = 0.0  # 等待連線池
+        self.db = 0.0         # 持有 PostgreSQL 連線
+        self.sql = 0.0        # PostgreSQL execute (TimedCursor)
+        self.mongo = 0.0      # MongoDB 指令 (MongoCommandTimer)
+
+    def as_ms(self):
+        return {
+            "pool_wait_ms": round(self.pool_wait * 1000, 3),
+            "db_ms": round(self.db * 1000, 3),
+            "sql_ms": round(self.sql * 1000, 3),
+            "mongo_ms": round(self.mongo * 1000, 3),
+        }
+
+
+def start():
+    """開始記錄目前 thread 的請求，回傳 RequestTimings"""
+    timings = RequestTimings()
+    _local.timings = timings
+    return timings
+
+
+def finish():
+    """結束記錄，回傳該請求的 RequestTimings (未開始時為 None)"""
+    timings = getattr(_local, "timings", None)
+    _local.timings = None
+    return timings
+
+
+def add(field, seconds):
+    """累加到目前請求；不在請求中 (例如啟動或背景 thread) 時忽略"""
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        setattr(timings, field, getattr(timings, field) + seconds)
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """以 cursor_factory 套用到連線池的所有連線，execute 的時間計入目前請求的 sql"""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            add("sql", time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            add("sql", time.perf_counter() - started)
+
+    def fetchmany(self, size=None):
+        # named (server-side) cursor 的 fetch 才會向資料庫取資料，例如串流匯出
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            if self.name:
+                add("sql", time.perf_counter() - started)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """
+    註冊於 MongoClient(event_listeners=...)；pymongo 在執行指令的 thread 上同步呼叫，
+    指令耗時計入目前請求的 mongo。
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        add("mongo", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        add("mongo", event.duration_micros / 1e6)
@@ -0,0 +1,189 @@
+"""Shift/skill permission checks with a per-employee permission cache."""
+
+import threading
+from datetime import datetime, timedelta
+
+from config import *
+
+
+class PermissionProfile:
+    """某位員工在一段時間內的值班時段與證照快照"""
+
+    def __init__(self, windows, skills, db_now, expires_at):
+        self.windows = windows        # [(a_id, shift_start, shift_end)]
+        self.skills = skills          # set(skill_name)
+        # 以資料庫時鐘判斷班表 (與原本 NOW() BETWEEN ... 相同)，記錄與本機時鐘的差距
+        self.clock_offset = db_now - datetime.now()
+        self.expires_at = expires_at
+
+    def now(self):
+        return datetime.now() + self.clock_offset
+
+    def on_shift(self, a_id, at):
+        return any(w_a_id == a_id and start <= at <= end for w_a_id, start, end in self.windows)
+
+
+class ShiftPermissionCache:
+    """
+    快取每位員工的值班時段與證照：
+    - 目前有值班時，快取到該班結束 (shift_end) 為止；未值班時快取 ttl 秒
+    - assign_task / add_employee_skill 會清除該員工的快取
+    - 載入期間若該員工被清除，載入結果不會寫回快取
+    """
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._generations = {}   # e_id -> 清除次數
+        self._epoch = 0          # 全部清除次數
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, e_id):
+        """回傳 (profile, generation)；未命中時 profile 為 None，載入後以 generation 呼叫 put"""
+        with self._lock:
+            profile = self._profiles.get(e_id)
+            if profile is not None and profile.now() < profile.expires_at:
+                self._hits += 1
+                return profile, None
+            self._profiles.pop(e_id, None)
+            self._misses += 1
+            return None, (self._epoch, self._generations.get(e_id, 0))
+
+    def put(self, e_id, profile, generation):
+        with self._lock:
+            if (self._epoch, self._generations.get(e_id, 0)) == generation:
+                self._profiles[e_id] = profile
+
+    def invalidate(self, e_id=None):
+        """清除單一員工 (或全部) 的權限快取"""
+        with self._lock:
+            if e_id is None:
+                self._invalidations += len(self._profiles)
+                self._epoch += 1
+                self._profiles.clear()
+                return
+            self._generations[e_id] = self._generations.get(e_id, 0) + 1
+            if self._profiles.pop(e_id, None) is not None:
+                self._invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._profiles),
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+                "invalidations": self._invalidations,
+            }
+
+
+def _query_required_skills(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT a.{COL_ANIMAL_ID}, s.required_skill
+            FROM {TABLE_ANIMAL} a
+            JOIN {TABLE_SPECIES} s ON a.species = s.s_name
+        """)
+        return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def get_required_skill(backend, a_id):
+    """動物所需證照 (經參考資料快取)，查無動物時視為 General"""
+    skills = backend.reference_cache.get_or_load(
+        ("required_skills",), _query_required_skills, backend,
+        tags=(TABLE_ANIMAL, TABLE_SPECIES)
+    )
+    return skills.get(a_id) or 'General'
+
+
+def load_permission_profile(backend, e_id, ttl):
+    """以單一連線讀取員工所有尚未結束的值班時段與所有證照"""
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT LOCALTIMESTAMP")
+        db_now = cur.fetchone()[0]
+
+        cur.execute(f"""
+            SELECT {COL_ANIMAL_ID}, shift_start, shift_end
+            FROM {TABLE_EMPLOYEE_SHIFT}
+            WHERE {COL_EMPLOYEE_ID} = %s
+              AND {COL_ANIMAL_ID} IS NOT NULL
+              AND shift_end >= %s
+        """, (e_id, db_now))
+        windows = cur.fetchall()
+
+        cur.execute(f"SELECT skill_name FROM {TABLE_EMPLOYEE_SKILLS} WHERE e_id = %s", (e_id,))
+        skills = {r[0] for r in cur.fetchall()}
+
+    # 值班中：快取到目前班次結束；未值班：快取 ttl 秒 (之後開始的班次已包含在 windows 中)
+    active_ends = [end for _, start, end in windows if start <= db_now <= end]
+    expires_at = max(active_ends) if active_ends else db_now + timedelta(seconds=ttl)
+    return PermissionProfile(windows, skills, db_now, expires_at)
+
+
+def check_shift_permission(backend, e_id, a_id):
+    """
+    檢查權限:
+    1. 是否有排班負責該動物? (Shift Check)
+    2. 是否擁有該動物所需的專業證照? (Skill Check)
+    同一班次內重複檢查直接使用快取，不需查詢資料庫。
+    """
+    # Admin bypass
+    if e_id == "E001":
+        return True, "管理員權限"
+
+    if not backend.pg_pool:
+        return False, "資料庫連線池未初始化"
+
+    try:
+        return _check_profile(backend, _get_profile(backend, e_id), a_id, None)
+    except Exception as e:
+        return False, f"權限檢查失敗: {e}"
+
+
+def check_shift_permissions(backend, e_id, a_ids):
+    """
+    一次檢查多隻動物，回傳 {a_id: (allowed, msg)}。
+    員工的值班時段與證照只載入一次 (或取自快取)，並以同一個時間點判斷所有動物。
+    """
+    a_ids = set(a_ids)
+    if e_id == "E001":
+        return {a_id: (True, "管理員權限") for a_id in a_ids}
+
+    if not backend.pg_pool:
+        return {a_id: (False, "資料庫連線池未初始化") for a_id in a_ids}
+
+    try:
+        profile = _get_profile(backend, e_id)
+        at = profile.now()
+        return {a_id: _check_profile(backend, profile, a_id, at) for a_id in a_ids}
+    except Exception as e:
+        return {a_id: (False, f"權限檢查失敗: {e}") for a_id in a_ids}
+
+
+def _get_profile(backend, e_id):
+    cache = backend.permission_cache
+    profile, generation = cache.get(e_id)
+    if profile is None:
+        profile = load_permission_profile(backend, e_id, cache.ttl)
+        cache.put(e_id, profile, generation)
+    return profile
+
+
+def _check_profile(backend, profile, a_id, at):
+    # 1. Shift Check
+    if not profile.on_shift(a_id, profile.now() if at is None else at):
+        return False, "無操作權限: 非值班時間或非負責動物"
+
+    # 2. Skill Check
+    req_skill = get_required_skill(backend, a_id)
+    if req_skill != 'General' and req_skill not in profile.skills:
+        return False, f"權限不足: 缺乏 '{req_skill}' 專業證照"
+
+    return True, "權限驗證通過"
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark per-animal vs set-based anomaly detection on the zoo.sql dataset.
+
+Read-only: both paths compute anomalies without writing health_alerts, so
+the comparison measures PostgreSQL round trips only. The per-animal path is
+a verbatim copy of the pre-change queries and thresholds, and the script
+fails if the set-based results disagree with it on any animal.
+
+    python test/bench_anomalies.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import COL_AMOUNT, COL_WEIGHT, TABLE_ANIMAL_STATE, TABLE_FEEDING
+from DB_utils import ZooBackend
+from services import anomaly_service
+
+
+def load_animals(backend):
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT a_id, a_name FROM animal WHERE life_status = 'Alive' ORDER BY a_id")
+        return cur.fetchall()
+
+
+# 以下兩個函式逐字保留改版前 ZooBackend.check_weight_anomaly / check_feeding_anomaly 的查詢與判斷
+# (去掉 health_alerts 寫入)，作為比對基準，避免與 anomaly_service 自己比較
+
+
+def legacy_weight_check(cur, a_id):
+    query = f"""
+        WITH RecentWeights AS (
+            SELECT 
+                {COL_WEIGHT},
+                datetime,
+                ROW_NUMBER() OVER (ORDER BY datetime DESC) as rn
+            FROM {TABLE_ANIMAL_STATE}
+            WHERE a_id = %s AND {COL_WEIGHT} IS NOT NULL
+        )
+        SELECT {COL_WEIGHT}, rn FROM RecentWeights WHERE rn <= 6 ORDER BY rn
+    """
+    cur.execute(query, (a_id,))
+    results = cur.fetchall()
+
+    if len(results) < 3:
+        return False, "資料不足（需至少 3 筆），無法分析", 0.0
+
+    current_weight = float(results[0][0])
+    prev_weights = [float(r[0]) for r in results[1:]]
+    moving_avg = sum(prev_weights) / len(prev_weights)
+
+    if moving_avg == 0:
+        return False, "移動平均為0，無法計算變化率", 0.0
+
+    change_pct = ((current_weight - moving_avg) / moving_avg) * 100
+    if abs(change_pct) > 10:
+        return True, f"偵測到異常: 體重偏離近期平均 {change_pct:.1f}%", change_pct
+    return False, f"體重正常: 偏離近期平均 {change_pct:.1f}%", change_pct
+
+
+def legacy_feeding_check(cur, a_id):
+    query = f"""
+        WITH RecentFeedings AS (
+            SELECT 
+                {COL_AMOUNT},
+                feed_date,
+                ROW_NUMBER() OVER (ORDER BY feed_date DESC) as rn
+            FROM {TABLE_FEEDING}
+            WHERE a_id = %s AND {COL_AMOUNT} IS NOT NULL
+        ),
+        Stats AS (
+            SELECT 
+                {COL_AMOUNT},
+                rn,
+                AVG({COL_AMOUNT}) OVER (
+                    ORDER BY rn 
+                    ROWS BETWEEN 1 FOLLOWING AND 7 FOLLOWING
+                ) as recent_avg
+            FROM RecentFeedings
+        )
+        SELECT {COL_AMOUNT}, recent_avg FROM Stats WHERE rn = 1
+    """
+    cur.execute(query, (a_id,))
+    result = cur.fetchone()
+
+    if not result or result[1] is None:
+        return False, "食量資料不足（需至少 2 筆），無法分析", 0.0
+
+    latest_amount = float(result[0])
+    recent_avg = float(result[1])
+
+    if recent_avg == 0:
+        return False, "近期平均食量為0，無法計算變化率", 0.0
+
+    change_pct = ((latest_amount - recent_avg) / recent_avg) * 100
+    if abs(change_pct) > 40:
+        return True, f"偵測到異常: 食量偏離近期平均 {change_pct:.1f}%", change_pct
+    return False, f"食量正常: 偏離近期平均 {change_pct:.1f}%", change_pct
+
+
+def per_animal(backend, animals):
+    """原本的做法：每隻動物各取兩次連線、各跑一次 window query"""
+    anomalies = []
+    for a_id, a_name in animals:
+        with backend.get_db_connection() as conn:
+            is_anomaly, msg, pct = legacy_weight_check(conn.cursor(), a_id)
+        if is_anomaly:
+            anomalies.append({"id": a_id, "name": a_name, "type": "體重", "msg": msg, "pct": pct})
+
+        with backend.get_db_connection() as conn:
+            is_anomaly, msg, pct = legacy_feeding_check(conn.cursor(), a_id)
+        if is_anomaly:
+            anomalies.append({"id": a_id, "name": a_name, "type": "食量", "msg": msg, "pct": pct})
+    return anomalies
+
+
+def set_based(backend, animals):
+    with backend.get_db_connection() as conn:
+        anomalies, _ = anomaly_service.check_animals(conn.cursor(), animals)
+    return anomalies
+
+
+def timed(fn, backend, animals, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(backend, animals)
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backend = ZooBackend()
+    try:
+        animals = load_animals(backend)
+        print(f"Animals: {len(animals)}")
+
+        legacy, legacy_samples = timed(per_animal, backend, animals, args.repeat)
+        batch, batch_samples = timed(set_based, backend, animals, args.repeat)
+
+        if legacy != batch:
+            print("[FAIL] Set-based results differ from per-animal results.")
+            sys.exit(1)
+        print(f"[OK] Results match ({len(batch)} anomalies)")
+
+        legacy_ms = statistics.median(legacy_samples) * 1000
+        batch_ms = statistics.median(batch_samples) * 1000
+        print(f"per-animal : median {legacy_ms:8.1f} ms ({2 * len(animals)} queries)")
+        print(f"set-based  : median {batch_ms:8.1f} ms (2 queries)")
+        if batch_ms > 0:
+            print(f"speedup    : {legacy_ms / batch_ms:.1f}x")
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
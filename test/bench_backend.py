@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for ZooBackend hot paths on a database seeded from zoo.sql.
+
+Times each backend method directly (no socket server) and saves the samples
+with machine metadata as JSON, so DB_utils.py changes can be compared run to
+run. Rows written by add_feeding_record / add_animal_state (E003 on A002,
+newer than the IDs seen at start) and the health alerts the run itself
+inserted are deleted afterwards; other writes to the database are left alone.
+
+    python scripts/refresh_demo_data.py          # E003 needs a current shift for A002
+    python test/bench_backend.py --repeat 50 --output before.json
+    # ... change DB_utils.py ...
+    python test/bench_backend.py --repeat 50 --output after.json --compare before.json
+
+    # compare two saved runs; exits 1 when a median regresses beyond --threshold %
+    python test/bench_backend.py --compare before.json after.json --threshold 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+KEEPER = "E003"   # Carnivore 證照，refresh_demo_data 排班負責 A002
+ANIMAL = "A002"
+FEEDING_AMOUNT = "0.01"  # 清除時以此辨識測試寫入的餵食紀錄
+
+
+def check_ok(result):
+    """(success, ...) 形式的回傳值，失敗時中止 (例如沒有排班)"""
+    if isinstance(result, tuple) and result and result[0] is False:
+        raise RuntimeError(result[1])
+    return result
+
+
+def build_cases(backend):
+    """name → 無參數函式；寫入類使用 A002 可食用的第一種飼料與最近一筆體重"""
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT d.f_id FROM animal_diet d JOIN animal a ON a.species = d.species
+            WHERE a.a_id = %s ORDER BY d.f_id LIMIT 1
+        """, (ANIMAL,))
+        row = cur.fetchone()
+        f_id = row[0] if row else "F001"
+        cur.execute("SELECT weight FROM animal_state_record WHERE a_id = %s ORDER BY datetime DESC LIMIT 1", (ANIMAL,))
+        row = cur.fetchone()
+        weight = float(row[0]) if row else 200.0
+
+    return {
+        "add_feeding_record": lambda: check_ok(backend.add_feeding_record(ANIMAL, f_id, FEEDING_AMOUNT, KEEPER)),
+        "add_animal_state": lambda: check_ok(backend.add_animal_state(ANIMAL, weight, KEEPER)),
+        "check_shift_permission": lambda: check_ok(backend.check_shift_permission(KEEPER, ANIMAL)),
+        "check_weight_anomaly": lambda: backend.check_weight_anomaly(ANIMAL),
+        "batch_check_anomalies": backend.batch_check_anomalies,
+        "get_inventory_report": backend.get_inventory_report,
+        "get_all_employees": backend.get_all_employees,
+        "get_careless_employees": backend.get_careless_employees,
+    }
+
+
+class RecordingAlerts:
+    """包裝 health_alerts collection，記下本次執行寫入的警示 _id，清除時只刪這些"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.ids = []
+
+    def insert_one(self, document, *args, **kwargs):
+        result = self._collection.insert_one(document, *args, **kwargs)
+        self.ids.append(result.inserted_id)
+        return result
+
+    def insert_many(self, documents, *args, **kwargs):
+        result = self._collection.insert_many(documents, *args, **kwargs)
+        self.ids.extend(result.inserted_ids)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class RecordingDatabase:
+    """backend.mongo_db 的替身：health_alerts 經由 RecordingAlerts，其餘照常"""
+
+    def __init__(self, db):
+        from config import COLLECTION_HEALTH_ALERTS
+
+        self._db = db
+        self._alerts_name = COLLECTION_HEALTH_ALERTS
+        self.alerts = RecordingAlerts(db[COLLECTION_HEALTH_ALERTS])
+
+    def __getitem__(self, name):
+        return self.alerts if name == self._alerts_name else self._db[name]
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+# ID 為 varchar (sequence 產生的數字字串)，需轉成數字比較；非數字的舊 ID 不會被比到
+NUMERIC_ID = "CASE WHEN {col} ~ '^[0-9]+$' THEN CAST({col} AS BIGINT) END"
+
+
+def snapshot_ids(backend):
+    """執行前各表的最大數字 ID，事後只清除此後由 KEEPER 對 ANIMAL 寫入的測試資料"""
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT COALESCE(MAX({NUMERIC_ID.format(col='feeding_id')}), 0) FROM feeding_records")
+        feeding_id = cur.fetchone()[0]
+        cur.execute(f"SELECT COALESCE(MAX({NUMERIC_ID.format(col='record_id')}), 0) FROM animal_state_record")
+        record_id = cur.fetchone()[0]
+    return {"feeding_id": feeding_id, "record_id": record_id}
+
+
+def cleanup(backend, before):
+    """刪除本次執行寫入的餵食/體重紀錄 (庫存餘額由 trigger 還原) 與記錄到的健康警示"""
+    bench_feedings = f"""
+        SELECT feeding_id FROM feeding_records
+        WHERE {NUMERIC_ID.format(col='feeding_id')} > %s
+          AND a_id = %s AND fed_by = %s AND feeding_amount_kg = %s
+    """
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        params = (before["feeding_id"], ANIMAL, KEEPER, FEEDING_AMOUNT)
+        cur.execute(f"DELETE FROM feeding_inventory WHERE feeding_id IN ({bench_feedings})", params)
+        cur.execute(f"DELETE FROM feeding_records WHERE feeding_id IN ({bench_feedings})", params)
+        feedings = cur.rowcount
+        cur.execute(f"""
+            DELETE FROM animal_state_record
+            WHERE {NUMERIC_ID.format(col='record_id')} > %s AND a_id = %s AND recorded_by = %s
+        """, (before["record_id"], ANIMAL, KEEPER))
+        states = cur.rowcount
+        conn.commit()
+    alerts = 0
+    if isinstance(backend.mongo_db, RecordingDatabase) and backend.mongo_db.alerts.ids:
+        alerts = backend.mongo_db.alerts.delete_many({"_id": {"$in": backend.mongo_db.alerts.ids}}).deleted_count
+    print(f"Cleanup: {feedings} feedings, {states} weight records, {alerts} alerts removed")
+
+
+def clear_caches(backend):
+    backend.reference_cache.clear()
+    backend.permission_cache.invalidate()
+
+
+def run_case(fn, repeat, warmup, cold, backend):
+    for _ in range(warmup):
+        if cold:
+            clear_caches(backend)
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches(backend)
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "n": len(ordered),
+        "min_ms": ms(ordered[0]),
+        "median_ms": ms(statistics.median(ordered)),
+        "p95_ms": ms(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]),
+        "mean_ms": ms(statistics.fmean(ordered)),
+        "stdev_ms": ms(statistics.stdev(ordered)) if len(ordered) > 1 else 0.0,
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+        dirty = subprocess.run(["git", "status", "--porcelain", "-uno", "--", "*.py"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except Exception:
+        return None
+
+
+def machine_metadata(backend, args):
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "args": {"repeat": args.repeat, "warmup": args.warmup, "cold": args.cold},
+    }
+    try:
+        with backend.get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SHOW server_version")
+            meta["postgres"] = cur.fetchone()[0]
+        if backend.mongo_client is not None:
+            meta["mongodb"] = backend.mongo_client.server_info().get("version")
+    except Exception as e:
+        meta["server_info_error"] = str(e)
+    return meta
+
+
+def print_results(results):
+    print(f"{'case':<24} {'median ms':>10} {'p95 ms':>9} {'min ms':>9} {'stdev':>8}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['median_ms']:>10.3f} {r['p95_ms']:>9.3f} {r['min_ms']:>9.3f} {r['stdev_ms']:>8.3f}")
+
+
+def compare(base, new, threshold):
+    """以 median 比較兩次結果，回傳是否有超過 threshold% 的退步"""
+    print(f"\nBase {base['meta'].get('git')} ({base['meta'].get('timestamp')}) → "
+          f"new {new['meta'].get('git')} ({new['meta'].get('timestamp')}), threshold {threshold:.0f}%")
+    if base["meta"].get("hostname") != new["meta"].get("hostname"):
+        print("[WARN] Runs come from different machines; differences may not be meaningful")
+    print(f"{'case':<24} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    regressed = []
+    for name, r in new["results"].items():
+        old = base["results"].get(name)
+        if old is None:
+            print(f"{name:<24} {'-':>10} {r['median_ms']:>10.3f} {'new':>8}")
+            continue
+        change = (r["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:<24} {old['median_ms']:>10.3f} {r['median_ms']:>10.3f} {change:>+7.1f}%{flag}")
+    if regressed:
+        print(f"\n[FAIL] {len(regressed)} regression(s): {', '.join(regressed)}")
+    else:
+        print("\n[OK] No regressions")
+    return bool(regressed)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cases", help="只執行指定項目 (逗號分隔)")
+    parser.add_argument("--cold", action="store_true", help="每次執行前清除參考資料與權限快取")
+    parser.add_argument("--output", help="結果存為 JSON")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="BASE [NEW]：只給 BASE 時與本次結果比較，給兩個檔案時不執行測量")
+    parser.add_argument("--threshold", type=float, default=10.0, help="median 退步超過此百分比視為 regression")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        sys.exit(1 if compare(load(args.compare[0]), load(args.compare[1]), args.threshold) else 0)
+
+    from DB_utils import ZooBackend
+
+    backend = ZooBackend()
+    if backend.mongo_db is not None:
+        backend.mongo_db = RecordingDatabase(backend.mongo_db)
+    before = None
+    try:
+        cases = build_cases(backend)
+        if args.cases:
+            cases = {name: cases[name] for name in args.cases.split(",")}
+        before = snapshot_ids(backend)
+        results = {}
+        for name, fn in cases.items():
+            results[name] = summarize(run_case(fn, args.repeat, args.warmup, args.cold, backend))
+            print(f"  {name}: median {results[name]['median_ms']:.3f} ms")
+        run = {"meta": machine_metadata(backend, args), "results": results}
+    except RuntimeError as e:
+        print(f"[FAIL] {e} (run scripts/refresh_demo_data.py first)")
+        sys.exit(1)
+    finally:
+        if before is not None:
+            cleanup(backend, before)
+        backend.close()
+
+    print()
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved {args.output}")
+    if args.compare and compare(load(args.compare[0]), run, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
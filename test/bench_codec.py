@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark the wire codecs on representative response payloads.
+
+No database needed. Every codec must decode to the same values as the old
+json.dumps(default=str) encoding (msgpack may differ only in bytes vs str,
+which these payloads do not contain); the script fails otherwise.
+
+    python test/bench_codec.py [--seconds 0.5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from network.codec import CODECS
+
+
+def legacy_dumps(obj):
+    """原本 server.py / client.py 的編碼方式"""
+    return json.dumps(obj, default=str).encode('utf-8')
+
+
+def payloads():
+    """與 get_recent_records、get_animal_trends、get_employee_schedule 及串流 chunk 相同形狀的回應"""
+    base = datetime(2025, 3, 1, 8, 30, 0, 123456)
+    recent_records = {
+        "success": True,
+        "data": [(1000 + i, base - timedelta(hours=i), "肉類飼料", Decimal("12.50") + i) for i in range(10)],
+        "page": {"next_cursor": "eyJrIjpbIjIwMjUtMDMtMDEiLDEwMDBdLCJkIjoibmV4dCJ9", "prev_cursor": None},
+    }
+    animal_trends = {
+        "success": True,
+        "weights": [(base - timedelta(days=i), Decimal("185.25")) for i in range(5)],
+        "feedings": [(date(2025, 3, 1) - timedelta(days=i), "乾草", Decimal("8.00")) for i in range(5)],
+    }
+    employee_schedule = {
+        "success": True,
+        "data": [(base + timedelta(days=i), base + timedelta(days=i, hours=8), "餵食", f"A{i:03d}") for i in range(10)],
+    }
+    stream_chunk = {
+        "stream": "chunk",
+        "data": [(i, f"A{i % 200:03d}", base - timedelta(minutes=i), Decimal("120.00") + i % 50, 1, "E003")
+                 for i in range(500)],
+    }
+    audit_logs = {
+        "success": True,
+        "data": [{
+            "_id": f"65f0c0ffee{i:014d}", "event_type": "DATA_CORRECTION", "operator_id": "E001",
+            "operator_name": "園長", "timestamp": (base - timedelta(minutes=i)).isoformat(),
+            "changes": {"old_value": Decimal("10.00"), "new_value": Decimal("12.00")},
+        } for i in range(50)],
+        "page": {"next_cursor": None, "prev_cursor": None},
+    }
+    return {
+        "recent_records": recent_records,
+        "animal_trends": animal_trends,
+        "employee_schedule": employee_schedule,
+        "stream_chunk_500": stream_chunk,
+        "audit_logs_50": audit_logs,
+    }
+
+
+def throughput(fn, arg, seconds):
+    """在 seconds 秒內重複呼叫 fn(arg)，回傳每秒次數"""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(20):
+            fn(arg)
+        count += 20
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=0.5, help="每項測量的時間")
+    args = parser.parse_args()
+
+    print(f"Codecs: {', '.join(CODECS)}")
+    failed = False
+    for label, payload in payloads().items():
+        expected = json.loads(legacy_dumps(payload))
+        legacy_encode = throughput(legacy_dumps, payload, args.seconds)
+        print(f"\n{label}  (legacy json default=str: {legacy_encode:,.0f} enc/s)")
+        print(f"  {'codec':<8} {'bytes':>8} {'enc/s':>12} {'dec/s':>12} {'enc MB/s':>9} {'vs legacy':>9}")
+
+        for name, codec in CODECS.items():
+            encoded = codec.dumps(payload)
+            if codec.loads(encoded) != expected:
+                print(f"  [FAIL] {name} decodes differently from the legacy encoding")
+                failed = True
+                continue
+            encode_rate = throughput(codec.dumps, payload, args.seconds)
+            decode_rate = throughput(codec.loads, encoded, args.seconds)
+            mb_per_s = encode_rate * len(encoded) / 1e6
+            print(f"  {name:<8} {len(encoded):>8} {encode_rate:>12,.0f} {decode_rate:>12,.0f} "
+                  f"{mb_per_s:>9.1f} {encode_rate / legacy_encode:>8.2f}x")
+
+    if failed:
+        sys.exit(1)
+    print("\n[OK] All codecs match the legacy wire values")
+
+
+if __name__ == "__main__":
+    main()
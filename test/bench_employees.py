@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark the N+1 employee listing vs the single aggregated query.
+
+Read-only. The script fails if the two paths return different employees or
+skills (skill order is ignored; the old path had no ORDER BY).
+
+    python test/bench_employees.py [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from DB_utils import ZooBackend
+
+
+def n_plus_one(backend):
+    """原本的做法：先取所有員工，再逐一查詢每位員工的證照"""
+    with backend.get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT e_id, e_name, role, status FROM employee ORDER BY e_id")
+        rows = cur.fetchall()
+        employees = []
+        for r in rows:
+            cur.execute("SELECT skill_name FROM employee_skills WHERE e_id = %s", (r[0],))
+            employees.append({
+                "e_id": r[0],
+                "e_name": r[1],
+                "role": r[2],
+                "e_status": r[3],
+                "skills": [s[0] for s in cur.fetchall()]
+            })
+        return employees
+
+
+def aggregated(backend):
+    return backend.get_all_employees()
+
+
+def normalize(employees):
+    return [dict(e, skills=sorted(e["skills"])) for e in employees]
+
+
+def timed(fn, backend, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(backend)
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = ZooBackend()
+    try:
+        legacy, legacy_samples = timed(n_plus_one, backend, args.repeat)
+        batch, batch_samples = timed(aggregated, backend, args.repeat)
+        print(f"Employees: {len(legacy)}")
+
+        if normalize(legacy) != normalize(batch):
+            print("[FAIL] Aggregated results differ from N+1 results.")
+            sys.exit(1)
+        print("[OK] Results match")
+
+        # 篩選與分頁需與在 Python 端篩選的結果一致
+        active = [e for e in normalize(legacy) if e["e_status"] == "active"]
+        if normalize(backend.get_all_employees(status="active")) != active:
+            print("[FAIL] status filter differs.")
+            sys.exit(1)
+        carnivore = [e for e in normalize(legacy) if "Carnivore" in e["skills"]]
+        if normalize(backend.get_all_employees(skill="Carnivore")) != carnivore:
+            print("[FAIL] skill filter differs.")
+            sys.exit(1)
+        if normalize(backend.get_all_employees(limit=5, offset=5)) != normalize(legacy)[5:10]:
+            print("[FAIL] pagination differs.")
+            sys.exit(1)
+        print("[OK] Filters and pagination match")
+
+        legacy_ms = statistics.median(legacy_samples) * 1000
+        batch_ms = statistics.median(batch_samples) * 1000
+        print(f"N+1        : median {legacy_ms:8.1f} ms ({len(legacy) + 1} queries)")
+        print(f"aggregated : median {batch_ms:8.1f} ms (1 query)")
+        if batch_ms > 0:
+            print(f"speedup    : {legacy_ms / batch_ms:.1f}x")
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Load-generation benchmark for the socket server.
+
+Opens N simulated keeper and admin connections (client.NetworkClient, same
+protocol negotiation as the real client) and replays a weighted action mix
+with think times. Reports throughput and p50/p95/p99 latency per action as
+seen by the client, plus the server-side pool/SQL/Mongo breakdown from
+get_server_metrics (queried as the first --admin-ids employee).
+
+NOT read-only: add_feeding and add_animal_state write records (default
+amounts are tiny). Run `python scripts/refresh_demo_data.py` first so the
+keepers have current shifts, and restore the database afterwards if needed.
+
+    # against a running server.py
+    python test/bench_load.py --keepers 8 --admins 2 --duration 30
+
+    # local stand-in: starts server.py in-process on a free port,
+    # needs only the Postgres/Mongo containers from docker-compose.yml
+    python test/bench_load.py --local asyncio --keepers 16 --duration 30
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from client import NetworkClient
+from config import TABLE_ANIMAL_STATE, TABLE_FEEDING
+
+KEEPER_MIX = "get_my_animals=4,add_feeding=3,add_animal_state=2,get_recent_records=2,get_employee_schedule=1,login=1"
+ADMIN_MIX = ("get_inventory_report=3,get_animal_trends=3,get_high_risk_animals=2,get_audit_logs=2,"
+             "batch_check_anomalies=1,login=1")
+
+
+def parse_mix(text):
+    """"action=權重,..." → [(action, 權重)]"""
+    mix = []
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(sorted_values, q):
+    """nearest-rank 分位數"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """收集各 action 的延遲與結果 (warmup 期間不記錄)"""
+
+    def __init__(self, record_after):
+        self.record_after = record_after
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, action, started, latency, outcome):
+        if started < self.record_after:
+            return
+        with self._lock:
+            entry = self.samples.setdefault(action, {"latencies": [], "ok": 0, "fail": 0, "busy": 0, "error": 0})
+            entry["latencies"].append(latency)
+            entry[outcome] += 1
+
+
+class VirtualUser(threading.Thread):
+    """一條長連線，依權重隨機選擇 action，每次請求之間等待 think time"""
+
+    def __init__(self, role, e_id, args, mix, recorder, deadline, seed):
+        super().__init__(name=f"{role}-{e_id}", daemon=True)
+        self.role = role
+        self.e_id = e_id
+        self.args = args
+        self.actions = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.recorder = recorder
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        self.client = NetworkClient()
+        self.client.host, self.client.port = args.host, args.port
+        self.animals = []    # (a_id, species)
+        self.diets = {}      # species -> [f_id]
+        self.weights_kg = {} # a_id -> 最近體重，add_animal_state 沿用以免觸發異常警示
+        self.skipped = 0
+
+    def request(self, action, data=None):
+        started = time.perf_counter()
+        try:
+            response = self.client.send_request(action, data or {})
+        except Exception:
+            response = None
+        latency = time.perf_counter() - started
+        if response is None:
+            outcome = "error"
+        elif response.get("busy"):
+            outcome = "busy"
+        elif response.get("success") is False:
+            outcome = "error" if str(response.get("message", "")).startswith(("Server Error", "無法連線", "伺服器連線中斷")) else "fail"
+        else:
+            outcome = "ok"
+        self.recorder.record(action, started, latency, outcome)
+        return response or {}
+
+    def prepare(self):
+        """session 開始：登入並取得後續請求需要的動物與飼料"""
+        self.request("login", {"e_id": self.e_id, "password": self.args.password})
+        if self.role == "keeper":
+            self.refresh_animals()
+        else:
+            rows = self.request("get_all_animals").get("data") or []
+            self.animals = [(row[0], None) for row in rows]
+
+    def refresh_animals(self):
+        rows = self.request("get_my_animals", {"e_id": self.e_id}).get("data") or []
+        self.animals = [(row[0], row[2]) for row in rows]
+        for a_id, species in self.animals:
+            if species not in self.diets:
+                feeds = self.request("get_animal_diet", {"species": species}).get("data") or []
+                self.diets[species] = [feed[0] for feed in feeds]
+
+    def pick_animal(self):
+        return self.random.choice(self.animals) if self.animals else (None, None)
+
+    def run_action(self, action):
+        a_id, species = self.pick_animal()
+        if action == "login":
+            self.request("login", {"e_id": self.e_id, "password": self.args.password})
+        elif action == "get_my_animals":
+            self.refresh_animals()
+        elif action == "add_feeding":
+            feeds = self.diets.get(species)
+            if not feeds:
+                self.skipped += 1
+                return
+            self.request("add_feeding", {
+                "a_id": a_id, "f_id": self.random.choice(feeds),
+                "amount": self.args.feed_amount, "user_id": self.e_id,
+            })
+        elif action == "add_animal_state":
+            if a_id is None:
+                self.skipped += 1
+                return
+            if a_id not in self.weights_kg:
+                rows = self.request("get_recent_records", {"table_name": TABLE_ANIMAL_STATE, "filter_id": a_id}).get("data") or []
+                self.weights_kg[a_id] = float(rows[0][2]) if rows and rows[0][2] is not None else 100.0
+            self.request("add_animal_state", {"a_id": a_id, "weight": self.weights_kg[a_id], "user_id": self.e_id, "state_id": 1})
+        elif action == "get_recent_records":
+            if a_id is None:
+                self.skipped += 1
+                return
+            self.request("get_recent_records", {"table_name": TABLE_FEEDING, "filter_id": a_id})
+        elif action == "get_employee_schedule":
+            self.request(action, {"e_id": self.e_id})
+        elif action == "get_animal_trends":
+            if a_id is None:
+                self.skipped += 1
+                return
+            self.request("get_animal_trends", {"a_id": a_id})
+        else:
+            self.request(action)
+
+    def run(self):
+        try:
+            self.prepare()
+            while time.perf_counter() < self.deadline:
+                self.run_action(self.random.choices(self.actions, self.weights)[0])
+                think = self.args.think_ms / 1000
+                if think > 0:
+                    time.sleep(self.random.uniform(0.5, 1.5) * think)
+        finally:
+            self.client.disconnect()
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(mode):
+    """於本 process 啟動 server.py (背景 thread)，只需要 docker-compose 的 Postgres/Mongo"""
+    import server
+    from config import ACTION_CONCURRENCY_LIMITS, SERVER_QUEUE_SIZE, SERVER_WORKERS
+    from DB_utils import ZooBackend
+    from network.dispatcher import RequestDispatcher
+    from network.request_log import setup_logging
+
+    setup_logging(level="WARNING")  # 請求紀錄會干擾報表輸出，只保留警告
+    backend = ZooBackend()
+    server.dispatcher = RequestDispatcher(
+        workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE, action_limits=ACTION_CONCURRENCY_LIMITS
+    )
+    server.PORT = free_port()
+    target = server.start_async_server if mode == "asyncio" else server.start_threaded_server
+    threading.Thread(target=target, args=(backend,), name="bench-server", daemon=True).start()
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            socket.create_connection((server.HOST, server.PORT), timeout=0.2).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return server.HOST, server.PORT
+
+
+def report(recorder, elapsed, users, server_metrics):
+    total = sum(len(entry["latencies"]) for entry in recorder.samples.values())
+    print(f"\nMeasured {elapsed:.1f}s, {total} requests, {total / elapsed:,.1f} req/s")
+    print(f"{'action':<24} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'fail':>5} {'busy':>5} {'err':>5}")
+    results = {}
+    for action, entry in sorted(recorder.samples.items()):
+        latencies = sorted(entry["latencies"])
+        row = {
+            "count": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2),
+            "fail": entry["fail"], "busy": entry["busy"], "error": entry["error"],
+        }
+        results[action] = row
+        print(f"{action:<24} {row['count']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} {row['fail']:>5} {row['busy']:>5} {row['error']:>5}")
+
+    skipped = sum(user.skipped for user in users)
+    if skipped:
+        print(f"\n[WARN] {skipped} writes skipped: keeper had no current animals or diet (run scripts/refresh_demo_data.py)")
+
+    if server_metrics:
+        print(f"\n{'server p95 ms':<22} {'latency':>8} {'pool':>8} {'sql':>8} {'mongo':>8}")
+        for action in sorted(results):
+            entry = server_metrics.get(action)
+            if entry:
+                print(f"  {action:<20} {entry['latency']['p95_ms']:>8.1f} {entry['pool_wait']['p95_ms']:>8.1f} "
+                      f"{entry['sql']['p95_ms']:>8.1f} {entry['mongo']['p95_ms']:>8.1f}")
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 2), "actions": results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=60000)
+    parser.add_argument("--local", choices=["thread", "asyncio"], help="在本 process 啟動 server.py (指定模式)")
+    parser.add_argument("--keepers", type=int, default=8, help="keeper 連線數")
+    parser.add_argument("--admins", type=int, default=2, help="admin 連線數")
+    parser.add_argument("--keeper-ids", default="E003,E004,E002", help="keeper 帳號，依序輪流使用")
+    parser.add_argument("--admin-ids", default="E001")
+    parser.add_argument("--password", default="zoo123")
+    parser.add_argument("--keeper-mix", default=KEEPER_MIX, help="action=權重,...")
+    parser.add_argument("--admin-mix", default=ADMIN_MIX)
+    parser.add_argument("--think-ms", type=float, default=100, help="請求間平均等待 (0.5~1.5 倍隨機)")
+    parser.add_argument("--duration", type=float, default=30, help="秒")
+    parser.add_argument("--warmup", type=float, default=3, help="前幾秒不計入統計")
+    parser.add_argument("--feed-amount", type=float, default=0.01, help="add_feeding 每次的 kg")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="結果另存為 JSON 檔")
+    args = parser.parse_args()
+
+    if args.local:
+        args.host, args.port = start_local_server(args.local)
+        print(f"Local {args.local} server on {args.host}:{args.port}")
+
+    probe = NetworkClient()
+    probe.host, probe.port = args.host, args.port
+    if not probe.connect():
+        print(f"[FAIL] Cannot connect to {args.host}:{args.port}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    recorder = Recorder(start + args.warmup)
+    deadline = start + args.warmup + args.duration
+    keeper_ids = args.keeper_ids.split(",")
+    admin_ids = args.admin_ids.split(",")
+    users = [
+        VirtualUser("keeper", keeper_ids[i % len(keeper_ids)], args, parse_mix(args.keeper_mix), recorder, deadline, args.seed + i)
+        for i in range(args.keepers)
+    ] + [
+        VirtualUser("admin", admin_ids[i % len(admin_ids)], args, parse_mix(args.admin_mix), recorder, deadline, args.seed + 1000 + i)
+        for i in range(args.admins)
+    ]
+    print(f"{args.keepers} keepers + {args.admins} admins, think {args.think_ms:.0f} ms, "
+          f"{args.warmup:.0f}s warmup + {args.duration:.0f}s")
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = max(time.perf_counter() - recorder.record_after, 1e-9)
+
+    metrics = probe.send_request("get_server_metrics", {"user_id": admin_ids[0]})
+    probe.disconnect()
+    result = report(recorder, elapsed, users, metrics.get("data", {}).get("actions") if metrics.get("success") else None)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), **result}, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved {args.json}")
+    if not result["requests"] or any(row["error"] for row in result["actions"].values()):
+        print("\n[FAIL] No requests measured or server errors occurred")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
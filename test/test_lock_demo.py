@@ -193,6 +193,19 @@ def demo_lock_timeout():
     
     print("\n[結論] 交易 B 必須等待交易 A 釋放 Lock 後才能繼續執行。")
 
+def reapply_migrations():
+    """pg_restore --clean 會移除 sequence 預設值，還原後需重新套用 migrations"""
+    from scripts.migrate import apply_migrations
+
+    backend = ZooBackend()
+    try:
+        applied = apply_migrations(backend)
+        print(f"[還原] 已重新套用 {len(applied)} 個 migration")
+    except Exception as e:
+        print(f"[還原] 警告: 套用 migration 失敗，請執行 python scripts/migrate.py ({e})")
+    finally:
+        backend.close()
+
 def restore_database():
     """還原資料庫"""
     import subprocess
@@ -223,6 +236,7 @@ def restore_database():
         
         if result.returncode == 0:
             print("[還原] 資料庫已還原至初始狀態")
+            reapply_migrations()
         else:
             print(f"[還原] 警告: {result.stderr[:100] if result.stderr else '未知錯誤'}")
             
@@ -16,6 +16,8 @@ if ROOT not in sys.path:
 
 from DB_utils import ZooBackend
 from config import COLLECTION_HEALTH_ALERTS, COLLECTION_LOGIN_LOGS
+from services.inventory_service import reconcile_stock_balance
+from services.mongo_indexes import verify_query_plans
 
 
 class SmokeFailure(Exception):
@@ -82,6 +84,13 @@ def main():
         inventory = backend.get_inventory_report()
         check(isinstance(inventory, list) and len(inventory) > 0, "Inventory report", f"{len(inventory)} feeds")
 
+        drifted = reconcile_stock_balance(backend)
+        check(
+            not drifted,
+            "Stock balance matches ledger",
+            f"{len(drifted)} feeds drifted; run scripts/reconcile_stock.py" if drifted else "",
+        )
+
         allowed, msg = backend.check_shift_permission("E003", current_animals[0][0])
         check(allowed, "E003 permission check", msg)
 
@@ -91,6 +100,13 @@ def main():
         login_log_count = backend.mongo_db[COLLECTION_LOGIN_LOGS].count_documents({})
         check(login_log_count >= 0, "Mongo login_logs readable", f"{login_log_count} docs")
 
+        collscans = [label for label, _, ok in verify_query_plans(backend.mongo_db) if not ok]
+        check(
+            not collscans,
+            "Mongo queries use indexes",
+            f"collection scan: {', '.join(collscans)}; run scripts/migrate.py" if collscans else "",
+        )
+
         print("\nSmoke checks passed.")
     finally:
         backend.close()